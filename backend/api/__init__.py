@@ -19,12 +19,15 @@ from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
 from datetime import timedelta
 from flask_session import Session
+from .json_provider import FastJSONProvider
 
 db = SQLAlchemy()
 jwt = JWTManager()
 
 def create_app():
     app = Flask(__name__)
+    # encode responses with orjson when it is installed
+    app.json = FastJSONProvider(app)
 
     # Allow requests from localhost (React app during development)
     CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
@@ -41,8 +44,15 @@ def create_app():
     from .programs import programs
     from .feedback import feedback
     from .models import User
-    from .user import user
+    from .user import user, load_claims_changes
     from .calendars.google_calendar import google_calendar_bp 
+    from .booking_limits import rebuild_booking_counts_command  # also registers the booking counter flush hook
+    from .archive import archive_appointments_command
+    from .metadata_cache import configure_metadata_caches
+    from .invalidation import configure_invalidation
+    from .user_search import user_search_index
+    from .compression import configure_compression
+    from .etags import load_entity_versions
     
     ##create MySQL database##    
     load_dotenv()
@@ -55,11 +65,26 @@ def create_app():
     app.config["JWT_TOKEN_LOCATION"] = ["cookies"]
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')
     app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=3)
+    # compute open appointment slots on request instead of storing a posted Appointment per slot
+    app.config['LAZY_APPOINTMENT_SLOTS'] = os.environ.get('LAZY_APPOINTMENT_SLOTS', 'false').lower() == 'true'
+    # appointments that started more than this many days ago are moved to the history tables by `flask archive-appointments`
+    app.config['APPOINTMENT_ARCHIVE_DAYS'] = int(os.environ.get('APPOINTMENT_ARCHIVE_DAYS', 120))
+    # bound and lifetime in seconds of the per-process program and course metadata caches
+    app.config['METADATA_CACHE_SIZE'] = int(os.environ.get('METADATA_CACHE_SIZE', 2048))
+    app.config['METADATA_CACHE_TTL'] = int(os.environ.get('METADATA_CACHE_TTL', 300))
+    # how workers tell each other to drop cached data: sqlite (workers on one host), redis, or memory (a single worker)
+    app.config['INVALIDATION_TRANSPORT'] = os.environ.get('INVALIDATION_TRANSPORT', 'sqlite')
+    app.config['INVALIDATION_SQLITE_PATH'] = os.environ.get('INVALIDATION_SQLITE_PATH', os.path.join(app.instance_path, 'invalidation.db'))
+    app.config['INVALIDATION_REDIS_URL'] = os.environ.get('INVALIDATION_REDIS_URL', 'redis://localhost:6379/0')
+    # JSON and text responses of at least this many bytes are gzip or brotli compressed, except for the listed blueprints
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    app.config['COMPRESSION_EXCLUDED_BLUEPRINTS'] = [name for name in os.environ.get('COMPRESSION_EXCLUDED_BLUEPRINTS', '').split(',') if name]
     jwt.init_app(app)  # Initialize the JWTManager with the Flask app
     
     # Bind the SQLAlchemy instance to this Flask app
     db.init_app(app)
     migrate = Migrate(app, db)
+    configure_compression(app)  # before the blueprints add their app-wide hooks, so it compresses their final response
 
     app.register_blueprint(auth, url_prefix='/')
     app.register_blueprint(admin, url_prefix='/')
@@ -69,9 +94,15 @@ def create_app():
     app.register_blueprint(feedback, url_prefix='/')
     app.register_blueprint(user, url_prefix='/')
     app.register_blueprint(google_calendar_bp, url_prefix='/api')
+    app.cli.add_command(archive_appointments_command)
+    app.cli.add_command(rebuild_booking_counts_command)
+    configure_metadata_caches(app.config)
+    configure_invalidation(app.config)
+    user_search_index.reset()
     
     with app.app_context():
         db.create_all()
+        load_entity_versions()
 
         def create_admin():
             admin = User.query.filter_by(name='admin', account_type='admin').first()
@@ -87,5 +118,6 @@ def create_app():
                 db.session.commit()
 
         create_admin()  # Call the function directly
+        load_claims_changes(app.config["JWT_ACCESS_TOKEN_EXPIRES"])
             
     return app
@@ -10,11 +10,18 @@
 """
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy import select
 from .models import User, ProgramDetails, db
 from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required, set_access_cookies, get_jwt
 from datetime import datetime, timedelta, timezone
+from functools import wraps
 from . import db
-from .user import get_user_data
+from .user import get_user_data, get_account_type, record_claims_change, filter_users, get_user_filters, page_users, count_users
+from .programs import delete_program_rows, invalidate_program_times, invalidate_program_metadata
+from .compression import compression_stats
+from .metadata_cache import metadata_caches, user_count_cache, program_times_cache
+from .invalidation import invalidation_bus
+from .etags import bump_versions, conditional, USERS
 
 admin = Blueprint('admin', __name__)
 allowed_account_types = ["admin", "instructor", "student"]
@@ -41,86 +48,67 @@ def refresh_expiring_jwts(response):
 
 # check if user_id is an admin
 def is_admin(user_id):
-    user = User.query.filter_by(id=user_id).first()
-    if user.account_type != 'admin':
-        return False
-    return True
+    return get_account_type(user_id) == 'admin'
+
+# answer with a 401 unless the request's JWT belongs to an admin, checked before the view and its ETag
+def admin_required(view):
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not is_admin(get_jwt_identity()):
+            return jsonify({"msg": "Admin access required"}), 401
+        return view(*args, **kwargs)
+    return wrapper
 
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ""               Endpoint Functions                ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 
+# list one page of the users matching the request's filters under result_key, see page_users for the paging parameters
+def list_users(result_key, columns, account_type=None):
+    try:
+        filters = get_user_filters(request.args, account_type)
+        query = filter_users(select(*columns), **filters)
+        rows, next_cursor = page_users(query, request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid paging parameters: {e}"}), 400
+
+    return jsonify({result_key: [dict(row._mapping) for row in rows], "next_cursor": next_cursor})
+
 # Get a list of all users and return their basic information
 @admin.route('/admin/all-users', methods=['GET'])
+@admin_required
 def get_all_users():
-    users = User.query.all()
-    user_list = []
-    
-    for user in users:
-        user_data = {
-            'id': user.id,
-            'name': user.name,
-            'email': user.email,
-            'account_type': user.account_type,
-            'status': user.status,
-        }
-        user_list.append(user_data)
-    
-    return jsonify({"user_list": user_list})
+    return list_users("user_list", (User.id, User.name, User.email, User.account_type, User.status))
 
 
 # Get a list of admin users in the system
 @admin.route('/admin/admins', methods=['GET'])
+@admin_required
 def get_all_admins():
-    admins = User.query.filter_by(account_type='admin')
-    admin_list = []
-    
-    for admin in admins:
-        admin_data = {
-            'id': admin.id,
-            'name': admin.name,
-            'email': admin.email,
-            'status': admin.status
-        }
-        admin_list.append(admin_data)
-    
-    return jsonify({"admins": admin_list})
+    return list_users("admins", (User.id, User.name, User.email, User.status), account_type='admin')
 
 
 # Get a list of all student users in the system
 @admin.route('/admin/students', methods=['GET'])
+@admin_required
 def get_all_students():
-    students = User.query.filter_by(account_type='student')
-    student_list = []
-    
-    for student in students:
-        student_data = {
-            'id': student.id,
-            'name': student.name,
-            'email': student.email,
-            'status': student.status
-        }
-        student_list.append(student_data)
-    
-    return jsonify({"students": student_list})
+    return list_users("students", (User.id, User.name, User.email, User.status), account_type='student')
 
 
 # Get a list of all instructor users in the system
 @admin.route('/admin/instructors', methods=['GET'])
+@admin_required
 def get_all_instructors():
-    instructors = User.query.filter_by(account_type='instructor')
-    instructor_list = []
-    
-    for instructor in instructors:
-        instructor_data = {
-            'id': instructor.id,
-            'name': instructor.name,
-            'email': instructor.email,
-            'status': instructor.status
-        }
-        instructor_list.append(instructor_data)
-        
-    return jsonify({"instructors": instructor_list})
+    return list_users("instructors", (User.id, User.name, User.email, User.status), account_type='instructor')
+
+
+# Get the number of users matching the account_type, status, and q filters of the user listings
+@admin.route('/admin/users/count', methods=['GET'])
+@admin_required
+@conditional(lambda: [USERS])
+def get_user_count():
+    return jsonify({"count": count_users(**get_user_filters(request.args))})
 
 
 # Change the account type of a user to the specified new account type
@@ -147,7 +135,10 @@ def change_account_type():
             return jsonify({"error": "User not found"}), 404
 
         user.account_type = new_account_type
+        claims_change = record_claims_change(user.id)
         db.session.commit()
+        invalidation_bus.publish('claims', claims_change)
+        bump_versions(('user', user.id), USERS)
         return jsonify({"message": "Account type changed successfully"}), 200
     
     # other exceptions 
@@ -179,7 +170,10 @@ def change_account_status():
             return jsonify({"error": f"Account status '{new_account_status}' not allowed"}), 400
         
         user.status = new_account_status
+        claims_change = record_claims_change(user.id)
         db.session.commit()
+        invalidation_bus.publish('claims', claims_change)
+        bump_versions(('user', user.id), USERS)
         return jsonify({"message": "Account status changed successfully"}), 200
     
     # other exceptions 
@@ -202,6 +196,7 @@ def update_profile(user_id):
             user.name = data['name']
 
         db.session.commit()
+        bump_versions(('user', user.id), USERS)
         response = get_user_data(user_id)
         return jsonify(response), 200
 
@@ -233,6 +228,8 @@ def create_program():
         )
         db.session.add(new_program)
         db.session.commit()
+        invalidate_program_metadata(new_program.id)
+        bump_versions(('programs', new_program.instructor_id))
         return jsonify({"msg": "Program created", "program": new_program.id}), 201
     except Exception as e:
         db.session.rollback()
@@ -252,6 +249,9 @@ def update_program(program_id):
     program.description = data.get('description', program.description)
     program.duration = data.get('duration', program.duration)
     db.session.commit()
+    invalidate_program_times(program.instructor_id)
+    invalidate_program_metadata(program.id)
+    bump_versions(('programs', program.instructor_id))
     return jsonify({"msg": "Program updated"}), 200
 
 # delete the program using its ID
@@ -263,6 +263,22 @@ def delete_program(program_id):
         return jsonify({"msg": "Admin access required"}), 401
 
     program = ProgramDetails.query.get_or_404(program_id)
-    db.session.delete(program)
+    instructor_id = program.instructor_id
+    delete_program_rows(program.id)
     db.session.commit()
-    return jsonify({"msg": "Program deleted"}), 200
\ No newline at end of file
+    invalidate_program_times(instructor_id)
+    invalidate_program_metadata(program_id)
+    bump_versions(('programs', instructor_id))
+    return jsonify({"msg": "Program deleted"}), 200
+    
+# hit/miss counters of the program and course metadata caches, used to size them
+@admin.route('/admin/metadata-cache', methods=['GET'])
+@admin_required
+def get_metadata_cache_stats():
+    return jsonify({"caches": [cache.stats() for cache in metadata_caches + (user_count_cache, program_times_cache)]}), 200
+
+# compressed and uncompressed byte counters of the responses sent by this worker
+@admin.route('/admin/compression', methods=['GET'])
+@admin_required
+def get_compression_stats():
+    return jsonify(compression_stats.stats()), 200
\ No newline at end of file
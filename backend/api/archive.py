@@ -0,0 +1,201 @@
+"""
+ * archive.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the archival job that moves finished appointments, with their
+ * comments and feedback, from the hot Appointment table into the history
+ * tables and deletes the expired slots nobody booked, and the queries that
+ * read past appointments from both
+ *
+ * Known Bugs:
+ * - Archived appointments are no longer counted by the rebuild-booking-counts
+ *   command, so a rebuild drops the counters of periods older than the horizon.
+ *   Those periods are in the past and never checked against meeting limits.
+ *
+"""
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, union_all, literal
+from sqlalchemy.orm import aliased
+from .models import Appointment, AppointmentHistory, AppointmentComment, AppointmentCommentHistory, \
+    Feedback, FeedbackHistory, Availability, User, ProgramDetails, CourseDetails
+from . import db
+
+# appointment columns copied as-is into AppointmentHistory
+ARCHIVED_APPOINTMENT_COLUMNS = (
+    'id', 'host_id', 'course_id', 'attendee_id', 'availability_id', 'appointment_date', 'start_time', 'end_time',
+    'appointment_day', 'start_clock', 'end_clock', 'start_at', 'event_id', 'physical_location', 'meeting_url',
+    'notes', 'status',
+)
+
+# columns returned for every row of an appointment listing
+LISTING_COLUMNS = (
+    'id', 'host_id', 'attendee_id', 'course_id', 'appointment_date', 'start_time', 'end_time', 'event_id',
+    'status', 'notes', 'physical_location', 'meeting_url', 'start_at',
+)
+
+# statuses shown in the past appointments tab, only these are moved into the history tables
+PAST_STATUSES = ('reserved', 'completed', 'rejected', 'missed', 'canceled')
+
+# page size of the past appointments tab when the request doesn't set one, and the largest allowed
+PAST_PAGE_SIZE = 50
+MAX_PAST_PAGE_SIZE = 200
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# get the start of the archive horizon, appointments that start before it are archived
+def get_archive_cutoff(horizon_days=None):
+    if horizon_days is None:
+        horizon_days = current_app.config.get('APPOINTMENT_ARCHIVE_DAYS', 120)
+    return datetime.utcnow() - timedelta(days=horizon_days)
+
+# move the finished appointments that start before the cutoff, and their comments and feedback, into the history tables
+def archive_appointments(cutoff, batch_size=1000):
+    archived = 0
+
+    while True:
+        appointment_ids = db.session.execute(
+            select(Appointment.id).where(Appointment.start_at < cutoff, Appointment.status.in_(PAST_STATUSES))
+            .order_by(Appointment.id).limit(batch_size)
+        ).scalars().all()
+        if not appointment_ids:
+            break
+
+        # copy the batch, keeping the ids so comments and feedback still point at their appointment
+        db.session.execute(insert(AppointmentHistory).from_select(
+            list(ARCHIVED_APPOINTMENT_COLUMNS) + ['program_id', 'archived_at'],
+            select(*[getattr(Appointment, column) for column in ARCHIVED_APPOINTMENT_COLUMNS],
+                   Availability.program_id, literal(datetime.utcnow()))
+            .outerjoin(Availability, Appointment.availability_id == Availability.id)
+            .where(Appointment.id.in_(appointment_ids))
+        ))
+        for model, history_model in ((AppointmentComment, AppointmentCommentHistory), (Feedback, FeedbackHistory)):
+            columns = [column.key for column in model.__table__.columns]
+            db.session.execute(insert(history_model).from_select(
+                columns,
+                select(*[getattr(model, column) for column in columns]).where(model.appointment_id.in_(appointment_ids))
+            ))
+
+        delete_appointment_rows(appointment_ids)
+
+        # one transaction per batch keeps the locks on the hot table short
+        db.session.commit()
+        archived += len(appointment_ids)
+
+    return archived
+
+# delete the posted, inactive, and pending slots that start before the cutoff, which never became a meeting
+def delete_expired_slots(cutoff, batch_size=1000):
+    deleted = 0
+
+    while True:
+        appointment_ids = db.session.execute(
+            select(Appointment.id).where(Appointment.start_at < cutoff, Appointment.status.not_in(PAST_STATUSES))
+            .order_by(Appointment.id).limit(batch_size)
+        ).scalars().all()
+        if not appointment_ids:
+            break
+
+        delete_appointment_rows(appointment_ids)
+        db.session.commit()
+        deleted += len(appointment_ids)
+
+    return deleted
+
+# delete appointments and their comments and feedback from the hot tables, the caller commits
+def delete_appointment_rows(appointment_ids):
+    # the appointments are past their date, so the booking counters are left untouched
+    db.session.execute(delete(AppointmentComment).where(AppointmentComment.appointment_id.in_(appointment_ids)),
+                       execution_options={'synchronize_session': False})
+    db.session.execute(delete(Feedback).where(Feedback.appointment_id.in_(appointment_ids)),
+                       execution_options={'synchronize_session': False})
+    db.session.execute(delete(Appointment).where(Appointment.id.in_(appointment_ids)),
+                       execution_options={'synchronize_session': False})
+
+# select the listing columns of one user's appointments from the hot or the history table, joined
+# with the program name, the course name and the other person of the appointment in the same query
+def select_appointment_rows(model, user_column, user_id):
+    person_column = 'attendee_id' if user_column == 'host_id' else 'host_id'
+    person = aliased(User)
+    program_id = Availability.program_id if model is Appointment else AppointmentHistory.program_id
+
+    query = select(
+        *[getattr(model, column).label(column) for column in LISTING_COLUMNS],
+        program_id.label('program_id'),
+        ProgramDetails.name.label('program_name'),
+        CourseDetails.name.label('course_name'),
+        person.id.label('person_id'),
+        person.name.label('person_name'),
+        person.title.label('person_title'),
+        person.pronouns.label('person_pronouns'),
+        person.email.label('person_email'),
+    )
+    if model is Appointment:
+        query = query.outerjoin(Availability, Appointment.availability_id == Availability.id)
+
+    return query.outerjoin(ProgramDetails, ProgramDetails.id == program_id) \
+        .outerjoin(CourseDetails, CourseDetails.id == model.course_id) \
+        .outerjoin(person, person.id == getattr(model, person_column)) \
+        .where(getattr(model, user_column) == user_id)
+
+# get one page of a user's past appointments from the hot and the history tables, newest first,
+# returning the rows and the number of the next page, or None on the last page
+def get_past_appointments(user_column, user_id, statuses, current_time_utc, page=1, per_page=PAST_PAGE_SIZE):
+    page = max(page, 1)
+    per_page = min(max(per_page, 1), MAX_PAST_PAGE_SIZE)
+
+    recent = select_appointment_rows(Appointment, user_column, user_id).where(
+        Appointment.start_at < current_time_utc,
+        Appointment.status.in_(statuses)
+    )
+    archived = select_appointment_rows(AppointmentHistory, user_column, user_id).where(
+        AppointmentHistory.status.in_(statuses)
+    )
+
+    past = union_all(recent, archived).subquery()
+
+    # fetch one extra row to know if there is a next page
+    query = select(past).order_by(past.c.start_at.desc(), past.c.id.desc()) \
+        .limit(per_page + 1).offset((page - 1) * per_page)
+
+    rows = db.session.execute(query).all()
+    next_page = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_page = page + 1
+
+    return rows, next_page
+
+# get the comments of an appointment from the hot or the history table, or None if the appointment doesn't exist
+def get_appointment_comments(appointment_id):
+    if db.session.get(Appointment, appointment_id):
+        model = AppointmentComment
+    elif db.session.get(AppointmentHistory, appointment_id):
+        model = AppointmentCommentHistory
+    else:
+        return None
+
+    return db.session.execute(
+        select(model.id, model.user_id, model.appointment_comment, model.created_at,
+               User.name, User.title, User.pronouns)
+        .join(User, model.user_id == User.id)
+        .where(model.appointment_id == appointment_id)
+        .order_by(model.created_at, model.id)
+    ).all()
+
+# move finished appointments older than the horizon into the history tables and delete the unbooked ones,
+# e.g. nightly from cron
+@click.command('archive-appointments')
+@click.option('--days', type=int, default=None, help='Archive appointments that started more than this many days ago.')
+@with_appcontext
+def archive_appointments_command(days):
+    cutoff = get_archive_cutoff(days)
+    archived = archive_appointments(cutoff)
+    deleted = delete_expired_slots(cutoff)
+    click.echo(f"Archived {archived} appointments and deleted {deleted} unbooked slots "
+               f"that started before {cutoff:%Y-%m-%d %H:%M} UTC")
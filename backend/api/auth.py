@@ -12,8 +12,10 @@
 
 from flask import Blueprint, request, jsonify
 from .models import User
+from .user import get_current_user
+from .etags import bump_versions, USERS
 from werkzeug.security import generate_password_hash, check_password_hash
-from . import db
+from . import db, jwt
 from email_validator import EmailNotValidError, validate_email
 from flask_jwt_extended import create_access_token, unset_jwt_cookies, \
     get_jwt_identity, jwt_required, set_access_cookies, get_jwt
@@ -39,11 +41,20 @@ def refresh_expiring_jwts(response):
 ""             Backend Only Functions              ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 
+# embed the role in every token, including refreshed ones, so role checks need no database round trip
+@jwt.additional_claims_loader
+def add_account_claims(identity):
+    user = db.session.get(User, int(identity))
+    if not user:
+        return {}
+    return {'account_type': user.account_type, 'status': user.status}
+
 # add a new user tuple to the User Table
 def create_account(email, name, account_type, status, password):
     new_user = User(email=email, name=name, account_type=account_type, status=status, password=generate_password_hash(password, method='scrypt', salt_length=2))
     db.session.add(new_user)
     db.session.commit()
+    bump_versions(('user', new_user.id), USERS)
     return new_user.id
 
 """""""""""""""""""""""""""""""""""""""""""""""""""""
@@ -119,7 +130,7 @@ def login():
     user = User.query.filter_by(email=email).first()
     if user:
         if check_password_hash(user.password, password):
-            access_token = create_access_token(identity=user.id)
+            access_token = create_access_token(identity=str(user.id))
             response = jsonify({"msg": "login successful"})
             set_access_cookies(response, access_token)
             return response
@@ -139,8 +150,7 @@ def logout():
 @auth.route('/profile', methods=['GET'])
 @jwt_required()
 def get_user_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if user:
         return jsonify({
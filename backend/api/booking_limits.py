@@ -0,0 +1,208 @@
+"""
+ * booking_limits.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the per-host booking counters used to enforce the daily,
+ * weekly, and monthly meeting limits of a program
+ *
+ * Known Bugs:
+ * - Counters are only maintained for changes made through the ORM session.
+ *   Bulk query.update()/query.delete() statements on Appointment must call
+ *   apply_booking_deltas() themselves, or run the rebuild-booking-counts
+ *   command afterwards.
+ *
+"""
+
+import click
+from collections import defaultdict
+from datetime import timedelta
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect, tuple_, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .models import Appointment, HostBookingCount, parse_schedule_strings
+from . import db
+
+# appointment statuses that count towards a host's meeting limits
+BOOKED_STATUSES = ('reserved', 'pending')
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# get the start and end dates of the week for a given date
+def get_week_range(day):
+    start_of_week = day - timedelta(days=day.weekday())
+    end_of_week = start_of_week + timedelta(days=6)
+    return start_of_week, end_of_week
+
+# get the first and last dates of the month for a given date
+def get_month_range(day):
+    start_of_month = day.replace(day=1)
+    next_month = (start_of_month + timedelta(days=32)).replace(day=1)
+    return start_of_month, next_month - timedelta(days=1)
+
+# get the first and last dates of a daily, weekly, or monthly scope
+def get_scope_range(day, scope):
+    if scope == 'weekly':
+        return get_week_range(day)
+    elif scope == 'monthly':
+        return get_month_range(day)
+    return day, day
+
+# get the counter keys (period_type, period_start) that a date falls into
+def get_period_keys(day):
+    return [(scope, get_scope_range(day, scope)[0]) for scope in ('daily', 'weekly', 'monthly')]
+
+# return the daily, weekly, and monthly reserved and pending counts of a host with one primary-key lookup,
+# lock=True locks the counter rows until the transaction ends and reads their latest committed counts
+def get_booking_counts(host_id, day, lock=False):
+    period_keys = get_period_keys(day)
+
+    query = select(HostBookingCount.period_type, HostBookingCount.booked_count).where(
+        HostBookingCount.host_id == host_id,
+        tuple_(HostBookingCount.period_type, HostBookingCount.period_start).in_(period_keys)
+    )
+    if lock:
+        query = query.with_for_update()
+
+    counts = {period_type: 0 for period_type, _ in period_keys}
+    for period_type, booked_count in db.session.execute(query):
+        counts[period_type] = booked_count
+    return counts
+
+# the first of the daily, weekly, and monthly scopes whose count went over the program's limit, or None
+def get_exceeded_scope(counts, program):
+    for scope in ('daily', 'weekly', 'monthly'):
+        limit = getattr(program, f'max_{scope}_meetings')
+        if limit is not None and counts[scope] > limit:
+            return scope
+    return None
+
+# add the given deltas, keyed by (host_id, day), to the counters of every period the day falls into
+def apply_booking_deltas(connection, deltas):
+    counter_deltas = defaultdict(int)
+    for (host_id, day), delta in deltas.items():
+        if host_id is None or day is None or delta == 0:
+            continue
+        for period_type, period_start in get_period_keys(day):
+            counter_deltas[(host_id, period_type, period_start)] += delta
+
+    counter_deltas = {key: delta for key, delta in counter_deltas.items() if delta != 0}
+    if not counter_deltas:
+        return
+
+    # one multi-row upsert for every counter, so the statement count doesn't grow with the periods touched
+    # and the first two bookings of a period can't both try to insert its counter
+    table = HostBookingCount.__table__
+    rows = [dict(host_id=host_id, period_type=period_type, period_start=period_start, booked_count=delta)
+            for (host_id, period_type, period_start), delta in counter_deltas.items()]
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        statement = mysql_insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(booked_count=table.c.booked_count + statement.inserted.booked_count)
+    elif dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.host_id, table.c.period_type, table.c.period_start],
+            set_={'booked_count': table.c.booked_count + statement.excluded.booked_count},
+        )
+    else:
+        for row in rows:
+            apply_booking_delta(connection, table, dict(row, booked_count=max(row['booked_count'], 0)), row['booked_count'])
+        return
+    connection.execute(statement)
+
+    # a release of a period without a counter inserted it below zero
+    released_hosts = {row['host_id'] for row in rows if row['booked_count'] < 0}
+    if released_hosts:
+        connection.execute(
+            table.update().where(table.c.host_id.in_(released_hosts), table.c.booked_count < 0).values(booked_count=0)
+        )
+
+# increment a counter in place on databases without an upsert, inserting it when it doesn't exist yet
+def apply_booking_delta(connection, table, values, delta):
+    key = (table.c.host_id == values['host_id']) & (table.c.period_type == values['period_type']) & \
+        (table.c.period_start == values['period_start'])
+    if connection.execute(table.update().where(key).values(booked_count=table.c.booked_count + delta)).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(table.insert().values(**values))
+    except IntegrityError:
+        # another transaction inserted it first
+        connection.execute(table.update().where(key).values(booked_count=table.c.booked_count + delta))
+
+# rebuild every counter from the Appointment table
+def rebuild_booking_counts(connection):
+    appointment = Appointment.__table__
+    rows = connection.execute(
+        select(appointment.c.host_id, appointment.c.appointment_date, func.count())
+        .where(appointment.c.status.in_(BOOKED_STATUSES))
+        .group_by(appointment.c.host_id, appointment.c.appointment_date)
+    ).all()
+
+    deltas = defaultdict(int)
+    for host_id, appointment_date, count in rows:
+        day = parse_schedule_strings(appointment_date, None, None)[0]
+        deltas[(host_id, day)] += count
+
+    connection.execute(HostBookingCount.__table__.delete())
+    apply_booking_deltas(connection, deltas)
+
+# rebuild the counters after appointments were changed outside the ORM session, e.g. by hand in the database
+@click.command('rebuild-booking-counts')
+@with_appcontext
+def rebuild_booking_counts_command():
+    rebuild_booking_counts(db.session.connection())
+    db.session.commit()
+    click.echo(f"Rebuilt {HostBookingCount.query.count()} booking counters")
+
+# return the (host_id, day, is_booked) an appointment counted as before and after its pending changes
+def get_booking_state_change(appointment):
+    state = inspect(appointment)
+
+    def old_and_new(attribute):
+        history = state.attrs[attribute].history
+        new_value = getattr(appointment, attribute)
+        old_value = history.deleted[0] if history.deleted else new_value
+        return old_value, new_value
+
+    old_host_id, new_host_id = old_and_new('host_id')
+    old_date, new_date = old_and_new('appointment_date')
+    old_status, new_status = old_and_new('status')
+
+    old_state = (old_host_id, parse_schedule_strings(old_date, None, None)[0], old_status in BOOKED_STATUSES)
+    new_state = (new_host_id, parse_schedule_strings(new_date, None, None)[0], new_status in BOOKED_STATUSES)
+    return old_state, new_state
+
+# keep the counters in the same transaction as every appointment status transition
+@event.listens_for(db.session, 'before_flush')
+def update_booking_counts(session, flush_context, instances):
+    deltas = defaultdict(int)
+
+    for appointment in session.new:
+        if isinstance(appointment, Appointment) and appointment.status in BOOKED_STATUSES:
+            day = parse_schedule_strings(appointment.appointment_date, None, None)[0]
+            deltas[(appointment.host_id, day)] += 1
+
+    for appointment in session.deleted:
+        if isinstance(appointment, Appointment):
+            (host_id, day, was_booked), _ = get_booking_state_change(appointment)
+            if was_booked:
+                deltas[(host_id, day)] -= 1
+
+    for appointment in session.dirty:
+        if isinstance(appointment, Appointment) and session.is_modified(appointment):
+            old_state, new_state = get_booking_state_change(appointment)
+            if old_state != new_state:
+                if old_state[2]:
+                    deltas[(old_state[0], old_state[1])] -= 1
+                if new_state[2]:
+                    deltas[(new_state[0], new_state[1])] += 1
+
+    if any(deltas.values()):
+        apply_booking_deltas(session.connection(), deltas)
@@ -0,0 +1,164 @@
+"""
+ * compression.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the after-request hook that compresses JSON and text responses
+ * with brotli or gzip, whichever the client prefers, including the
+ * streamed listings, and the byte counters behind /admin/compression
+ *
+ * Known Bugs:
+ * - brotli is only offered when the brotli package is installed.
+ * - Counters are kept per worker process.
+ *
+"""
+
+import gzip
+import zlib
+from threading import Lock
+from flask import request, current_app
+
+try:
+    import brotli  # optional dependency, only gzip is offered without it
+except ImportError:
+    brotli = None
+
+# responses smaller than this many bytes are sent as they are, compressing them saves less than the headers cost
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # higher qualities cost more CPU per request than they save on the wire
+
+# repetitive payloads worth compressing, images and files are already compressed
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'text/html', 'text/plain', 'text/css', 'text/calendar',
+}
+
+class CompressionStats:
+    # bytes before and after compression per encoding, to check how much a slow client saves
+    def __init__(self):
+        self.lock = Lock()
+        self.reset_stats()
+
+    # count one more chunk or response body compressed with encoding
+    def add(self, encoding, uncompressed_bytes, compressed_bytes, response=False):
+        with self.lock:
+            counters = self.encodings.setdefault(encoding, {'responses': 0, 'uncompressed_bytes': 0, 'compressed_bytes': 0})
+            counters['responses'] += int(response)
+            counters['uncompressed_bytes'] += uncompressed_bytes
+            counters['compressed_bytes'] += compressed_bytes
+
+    # count a compressible response sent as it is because it was under the size threshold
+    def add_small(self, size):
+        with self.lock:
+            self.small_responses += 1
+            self.small_bytes += size
+
+    # byte counters and the compressed/uncompressed ratio of every encoding
+    def stats(self):
+        with self.lock:
+            return {
+                'encodings': {
+                    encoding: dict(counters, ratio=counters['compressed_bytes'] / counters['uncompressed_bytes']
+                                   if counters['uncompressed_bytes'] else None)
+                    for encoding, counters in self.encodings.items()
+                },
+                'small_responses': self.small_responses,
+                'small_bytes': self.small_bytes,
+            }
+
+    # reset every counter
+    def reset_stats(self):
+        with self.lock:
+            self.encodings = {}
+            self.small_responses = 0
+            self.small_bytes = 0
+
+compression_stats = CompressionStats()
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# encodings this worker can produce, in the order they are preferred when the client rates them equally
+def get_supported_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+# the encoding to compress the current response with, or None when the client accepts none of ours
+def choose_encoding():
+    return request.accept_encodings.best_match(get_supported_encodings())
+
+# compress a whole body at once
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+# compress a streamed body chunk by chunk, flushing after each chunk so the client still gets rows as they are read
+def compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+        compress, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+    compression_stats.add(encoding, 0, 0, response=True)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if not chunk:
+                continue
+            compressed = compress(chunk) + flush()
+            compression_stats.add(encoding, len(chunk), len(compressed))
+            yield compressed
+
+        compressed = finish()
+        compression_stats.add(encoding, 0, len(compressed))
+        yield compressed
+    finally:
+        # close the wrapped stream too when the client disconnects, which ends its request context
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+# whether the current response may be compressed at all, whatever its size
+def is_compressible(response):
+    if request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.cache_control.no_transform:
+        return False
+    return request.blueprint not in current_app.config.get('COMPRESSION_EXCLUDED_BLUEPRINTS', ())
+
+# compress responses of every blueprint not listed in COMPRESSION_EXCLUDED_BLUEPRINTS
+def compress_response(response):
+    if not is_compressible(response):
+        return response
+
+    # caches must keep the compressed and uncompressed bodies apart
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        # the size of a streamed body isn't known up front, so it is always compressed
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE):
+            compression_stats.add_small(len(data))
+            return response
+        compressed = compress_body(data, encoding)
+        compression_stats.add(encoding, len(data), len(compressed), response=True)
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+# register the hook on the app, read COMPRESSION_MIN_SIZE and COMPRESSION_EXCLUDED_BLUEPRINTS from its config
+def configure_compression(app):
+    # registered before the blueprints, app-wide after-request hooks run in reverse order, so this one runs last
+    app.after_request(compress_response)
+    compression_stats.reset_stats()
@@ -0,0 +1,124 @@
+"""
+ * etags.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the per-entity version counters bumped by write endpoints and
+ * the decorator that turns them into weak ETags, so a catalog or profile
+ * endpoint can answer If-None-Match with a 304 without reading the
+ * database
+ *
+ * Known Bugs:
+ * - The counters are written after the change itself is committed, a
+ *   worker that dies in between leaves the old ETags valid until the
+ *   entity's next write.
+ *
+"""
+
+import hashlib
+from functools import wraps
+from flask import request, make_response, current_app
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .invalidation import invalidation_bus
+from .models import EntityVersion
+from . import db
+
+# (kind, id) -> number of writes to the entity, e.g. ('course', '5'), ('programs', '2'), ('user', '7'),
+# kept in the EntityVersion table and mirrored here so revalidating doesn't read the database
+entity_versions = {}
+
+# every write also bumps the catalog version, which covers responses built from many entities
+CATALOG = ('catalog', None)
+# bumped whenever a user is added or changes account type, status, or name, which covers user counts
+USERS = ('users', None)
+
+# version counters are keyed by string ids, so URL arguments and integer ids from writes match
+def entity_key(kind, key):
+    return (kind, None if key is None else str(key))
+
+# add one to the stored version of an entity, inserting its row on the first write
+def increment_version(connection, kind, key):
+    table = EntityVersion.__table__
+    values = dict(kind=kind, key=key, version=1)
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        statement = mysql_insert(table).values(**values).on_duplicate_key_update(version=table.c.version + 1)
+    elif dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        statement = insert(table).values(**values).on_conflict_do_update(
+            index_elements=[table.c.kind, table.c.key], set_={'version': table.c.version + 1},
+        )
+    else:
+        # no upsert, update in place and insert when the row doesn't exist yet
+        where = (table.c.kind == kind) & (table.c.key == key)
+        if connection.execute(table.update().where(where).values(version=table.c.version + 1)).rowcount:
+            return
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert().values(**values))
+        except IntegrityError:
+            # another worker inserted it first
+            connection.execute(table.update().where(where).values(version=table.c.version + 1))
+        return
+    connection.execute(statement)
+
+# bump the versions of the changed entities in the database and every worker, call after committing the write
+def bump_versions(*entities):
+    # stored with '' for the entities without an id, and in a fixed order so concurrent bumps lock rows alike
+    keys = sorted({(kind, key or '') for kind, key in (entity_key(kind, key) for kind, key in entities + (CATALOG,))})
+    table = EntityVersion.__table__
+    connection = db.session.connection()
+    for kind, key in keys:
+        increment_version(connection, kind, key)
+    rows = connection.execute(
+        select(table.c.kind, table.c.key, table.c.version).where(tuple_(table.c.kind, table.c.key).in_(keys))
+    ).all()
+    db.session.commit()
+    invalidation_bus.publish('versions', [[kind, key or None, version] for kind, key, version in rows])
+
+# apply a version bump published by this or another worker, bumps arriving out of order never go back
+def apply_version_bump(entities):
+    for kind, key, version in entities:
+        entity_versions[(kind, key)] = max(entity_versions.get((kind, key), 0), version)
+
+invalidation_bus.subscribe('versions', apply_version_bump)
+
+# replace the mirrored versions with the stored ones, called once at startup inside an app context
+def load_entity_versions():
+    entity_versions.clear()
+    for kind, key, version in db.session.execute(select(EntityVersion.kind, EntityVersion.key, EntityVersion.version)):
+        entity_versions[(kind, key or None)] = version
+
+# weak ETag of a response built from the given entities, the same in every worker
+def make_etag(entities, user_id=None):
+    versions = [(key, entity_versions.get(key, 0)) for key in (entity_key(kind, key) for kind, key in entities)]
+    return hashlib.sha1(repr((user_id, versions)).encode()).hexdigest()[:20]
+
+# answer GET requests with a 304 while the versions of the entities returned by get_entities(**view_args) are unchanged,
+# get_entities returns None when it can't tell, e.g. for a missing course, and the view then runs as usual
+def conditional(get_entities, cache_control='private, no-cache', per_user=False):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            entities = get_entities(**kwargs)
+            if entities is None:
+                return view(*args, **kwargs)
+
+            # read the versions before the view reads the database, so a write in between only costs a refetch
+            etag = make_etag(entities, get_jwt_identity() if per_user else None)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
@@ -9,15 +9,24 @@
  *
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
 from flask_jwt_extended import create_access_token, set_access_cookies,\
     jwt_required, get_jwt_identity, get_jwt
-from .models import User, Feedback, Appointment
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import aliased
+from itertools import chain
+from .models import User, Feedback, FeedbackHistory, Appointment, AppointmentHistory, Availability, ProgramDetails
 from datetime import datetime, timedelta, timezone
 from . import db
+from .user import get_current_user
 
 feedback = Blueprint('feedback', __name__)
 
+# number of feedback rows fetched from the database at a time when streaming /feedback/all
+FEEDBACK_CHUNK_SIZE = 500
+# largest page a paginated /feedback/all request gets, larger limits are lowered to it
+MAX_FEEDBACK_PAGE_SIZE = 1000
+
 
 @feedback.after_request
 def refresh_expiring_jwts(response):
@@ -33,6 +42,92 @@ def refresh_expiring_jwts(response):
         # Case where there is not a valid JWT. Just return the original response
         return response
 
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# read an optional integer query parameter, None when it is missing
+def get_int_arg(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+# select feedback with its appointment, program, student, and instructor from the live or the history tables
+def select_feedback_rows(feedback_model, appointment_model, host_id, program_id, start_day, end_day, after):
+    student = aliased(User)
+    host = aliased(User)
+    appointment_program_id = Availability.program_id if appointment_model is Appointment else appointment_model.program_id
+
+    query = select(
+        feedback_model.id.label('id'),
+        feedback_model.appointment_id.label('appointment_id'),
+        feedback_model.attendee_rating.label('attendee_rating'),
+        feedback_model.attendee_notes.label('attendee_notes'),
+        feedback_model.host_rating.label('host_rating'),
+        feedback_model.host_notes.label('host_notes'),
+        student.name.label('attendee_name'),
+        host.name.label('host_name'),
+        ProgramDetails.name.label('program_name'),
+        appointment_model.start_time.label('start_time'),
+        appointment_model.end_time.label('end_time'),
+        appointment_model.appointment_date.label('appointment_date'),
+        appointment_model.meeting_url.label('meeting_url'),
+        appointment_model.notes.label('notes'),
+        appointment_model.attendee_id.label('appointment_attendee_id'),
+        appointment_model.host_id.label('appointment_host_id'),
+        appointment_model.status.label('status'),
+    ).join(appointment_model, feedback_model.appointment_id == appointment_model.id)
+
+    if appointment_model is Appointment:
+        query = query.outerjoin(Availability, Appointment.availability_id == Availability.id)
+
+    query = query.outerjoin(ProgramDetails, ProgramDetails.id == appointment_program_id) \
+        .outerjoin(student, student.id == feedback_model.attendee_id) \
+        .outerjoin(host, host.id == feedback_model.host_id)
+
+    # optional filters
+    if host_id is not None:
+        query = query.where(appointment_model.host_id == host_id)
+    if program_id is not None:
+        query = query.where(appointment_program_id == program_id)
+    if start_day is not None:
+        query = query.where(appointment_model.appointment_day >= start_day)
+    if end_day is not None:
+        query = query.where(appointment_model.appointment_day <= end_day)
+    if after is not None:
+        query = query.where(feedback_model.id > after)
+
+    return query
+
+# convert a row of select_feedback_rows to the object returned by /feedback/all
+def feedback_to_object(row):
+    return {
+        "id": row.id,
+        "appointment_type": row.program_name,
+        "attendee_id": row.attendee_name,
+        "attendee_rating": row.attendee_rating,
+        "attendee_notes": row.attendee_notes,
+        "host_id": row.host_name,
+        "host_rating": row.host_rating,
+        "host_notes": row.host_notes,
+        "appointment_id": row.appointment_id,
+        "appointment_data": {
+            "start_time": row.start_time,
+            "end_time": row.end_time,
+            "appointment_date": row.appointment_date,
+            "meeting_url": row.meeting_url,
+            "notes": row.notes,
+            "attendee_id": row.appointment_attendee_id,
+            "host_id": row.appointment_host_id,
+            "type": row.program_name,
+            "status": row.status
+        }
+    }
+
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ""               Endpoint Functions                ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
@@ -48,7 +143,7 @@ def add_feedback():
     # Fetch the existing feedback for the appointment
     existing_feedback = Feedback.query.filter_by(appointment_id=appointment_id).first()
 
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or user.account_type not in ['student', 'instructor']:
         return jsonify({"error": "Only students and instructors can add feedback"}), 401
     
@@ -83,50 +178,82 @@ def add_feedback():
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
 
-# fetch all feedback in the Feedback Table
-# expensive performance**
+# fetch all feedback in the Feedback and FeedbackHistory Tables as a streamed JSON array
+# optional filters: host_id, program_id, start_date, end_date (YYYY-MM-DD)
+# optional keyset pagination: limit, and after=<next_cursor of the previous page>
 @feedback.route('/feedback/all', methods=['GET'])
 @jwt_required()
 def get_all_feedback():
-    feedbacks = Feedback.query.all()
-    if not feedbacks:
-        return jsonify({"error": "No feedback found"}), 404
-
-    feedback_list = []
-    for feedback in feedbacks:
-        student = User.query.get(feedback.attendee_id)
-        host = User.query.get(feedback.host_id)
-        appointment = Appointment.query.get(feedback.appointment_id)
-        feedback_data = {
-            "id": feedback.id,
-            "appointment_type": appointment.program_id,
-            "attendee_id": student.name,
-            "attendee_rating": feedback.attendee_rating,
-            "attendee_notes": feedback.attendee_notes,
-            "host_id": host.name,
-            "host_rating": feedback.host_rating,
-            "host_notes": feedback.host_notes,
-            "appointment_id": feedback.appointment_id,
-            "appointment_data": {
-                "start_time": appointment.start_time,
-                "end_time": appointment.end_time,
-                "appointment_date": appointment.appointment_date,
-                "meeting_url": appointment.meeting_url,
-                "notes": appointment.notes,                
-                "attendee_id": appointment.attendee_id,
-                "host_id": appointment.host_id,
-                "type": appointment.type,
-                "status": appointment.status
-            }
-        }
-        feedback_list.append(feedback_data)
+    # a malformed filter or cursor is an error, not a request for every row or the first page
+    try:
+        host_id = get_int_arg('host_id')
+        program_id = get_int_arg('program_id')
+        after = get_int_arg('after')
+        limit = get_int_arg('limit')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        start_day = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_day = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        return jsonify({"error": "Invalid date format, expected YYYY-MM-DD"}), 400
+
+    if limit is not None and limit <= 0:
+        return jsonify({"error": "limit must be a positive number"}), 400
+    if limit is not None:
+        limit = min(limit, MAX_FEEDBACK_PAGE_SIZE)
 
-    return jsonify(feedback_list=feedback_list), 200
+    # live and archived feedback share ids, so one keyset over both keeps pages stable
+    branches = [
+        select_feedback_rows(Feedback, Appointment, host_id, program_id, start_day, end_day, after),
+        select_feedback_rows(FeedbackHistory, AppointmentHistory, host_id, program_id, start_day, end_day, after),
+    ]
+    if limit is not None:
+        # each table only needs to read one page past the cursor along its primary key
+        branches = [select(branch.order_by(branch.selected_columns.id).limit(limit).subquery()) for branch in branches]
+    feedback_rows = union_all(*branches).subquery()
+    query = select(feedback_rows).order_by(feedback_rows.c.id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    # fetch rows from the database cursor in chunks instead of loading all of them
+    rows = iter(db.session.execute(query.execution_options(yield_per=FEEDBACK_CHUNK_SIZE)))
+    first_row = next(rows, None)
+    if first_row is None:
+        # an empty filtered page is still a valid page
+        if all(value is None for value in (host_id, program_id, start_day, end_day, after)):
+            return jsonify({"error": "No feedback found"}), 404
+    else:
+        rows = chain([first_row], rows)
+
+    page = {'count': 0, 'last_id': None}
+
+    def feedback_objects():
+        for row in rows:
+            page['count'] += 1
+            page['last_id'] = row.id
+            yield feedback_to_object(row)
+
+    def generate():
+        yield b'{"feedback_list": '
+        yield from current_app.json.stream_array(feedback_objects(), FEEDBACK_CHUNK_SIZE)
+
+        # a full page means there may be more rows after the last id
+        next_cursor = page['last_id'] if limit is not None and page['count'] == limit else None
+        yield b', "next_cursor": ' + current_app.json.dumps_bytes(next_cursor) + b'}'
+
+    return Response(stream_with_context(generate()), status=200, mimetype='application/json')
 
 # fetch all feedback for an appointment
 @feedback.route('/feedback/<int:appointment_id>', methods=['GET'])
 def get_feedback(appointment_id):
     feedback = Feedback.query.filter_by(appointment_id=appointment_id).first()
+    if not feedback:
+        # the appointment may have been archived with its feedback
+        feedback = FeedbackHistory.query.filter_by(appointment_id=appointment_id).first()
     if not feedback:
         return jsonify({"message": "No feedback found for this appointment"}), 200
 
@@ -16,14 +16,19 @@
 """
 
 from flask import Blueprint, request, jsonify
-from .models import User, Availability, Appointment, AppointmentComment, CourseDetails, CourseMembers, ProgramDetails
+from .models import User, Availability, Appointment, AppointmentComment, CourseDetails, CourseMembers, ProgramDetails, \
+    parse_schedule_strings
 from flask_jwt_extended import jwt_required, get_jwt_identity, set_access_cookies, get_jwt, create_access_token
-from sqlalchemy import extract, func, or_, and_
+from sqlalchemy import and_
 from . import db
 from datetime import datetime, timedelta, timezone
-from .student import get_week_range
-from .programs import get_program_name, get_course_name
-from .user import is_instructor
+from .booking_limits import get_booking_counts
+from .virtual_slots import get_slot_times, lazy_slots_enabled
+from .interval_index import AvailabilityIntervalIndex
+from .archive import select_appointment_rows, get_past_appointments, get_appointment_comments, \
+    PAST_PAGE_SIZE, PAST_STATUSES
+from .programs import get_course_name, get_course_programs, get_program_metadata, serialize_instructor_program
+from .user import is_instructor, get_current_user
 from .calendars.google_calendar import GoogleCalendarService  
 
 instructor = Blueprint('instructor', __name__)
@@ -50,61 +55,14 @@ def refresh_expiring_jwts(response):
 # return type and isDropins for a program
 def get_program_name_and_isDropins(program_id): 
     try: 
-        program = ProgramDetails.query.filter_by(id=program_id).first()
+        program = get_program_metadata(program_id)
 
         if program:
-            returned_attributes = {'name': program.name, 'isDropins': program.isDropins}
+            returned_attributes = {'name': program['name'], 'isDropins': program['isDropins']}
             return returned_attributes
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
-# return the global programs for a instructor
-def get_global_programs(user_id):
-    try:
-        if is_instructor(user_id):
-            global_programs = ProgramDetails.query.filter(
-                and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id == user_id)
-            ).all()
-
-            if global_programs:
-                formatted_programs = []
-
-                for program in global_programs:
-                    # convert attributes to a object
-                    program_info = {
-                        'id': program.id,
-                        'name': program.name,
-                        'description': program.description,
-                        'duration': program.duration,
-                        'physical_location': program.physical_location,
-                        'meeting_url': program.meeting_url,
-                        'auto_approve_appointments': program.auto_approve_appointments,
-                        'max_daily_meetings': program.max_daily_meetings,
-                        'max_weekly_meetings': program.max_weekly_meetings,
-                        'max_monthly_meetings': program.max_monthly_meetings,
-                        'isDropins': program.isDropins,
-                        'isRangeBased': program.isRangeBased,
-                    }
-                    # add object to list
-                    formatted_programs.append(program_info)
-
-                # add id and course_name to object
-                formatted_programs = {
-                    'id': None,
-                    'course_name': 'All Courses',
-                    'programs': formatted_programs
-                }
-
-                return formatted_programs
-            else:
-                # no global programs found
-                return None
-        else:
-            # instructor not found
-            return None
-    except Exception as e:
-        return None
-
 # check if date is in correct format
 def is_valid_date(date):
     try:
@@ -134,130 +92,217 @@ def is_start_time_before_end_time(start_time, end_time):
     except ValueError:
         return False
 
-# validate availability information before before creating it as an availability tuple for the Availability Table
-def validate_availability_data(instructor_id, course_id, availability_id, date, start_time, end_time, isDropins):
+# validate a batch of availability entries against the data fetched once for the whole batch
+def validate_availability_batch(instructor_id, course_id, entries, isDropins):
     course_id = int(course_id) if course_id and course_id != "null" else None
-    
-    required_fields = [instructor_id, availability_id, date, start_time, end_time]
-
-    # Check if any required field is missing
-    if not all(required_fields):
-        return jsonify({"error": "provide all the required fields"}), 404
 
-    # Validate instructor
     instructor = User.query.filter_by(id=instructor_id, account_type='instructor').first()
-    if not instructor:
-        return jsonify({"error": "instructor not found!"}), 404
-    
-    if not isDropins:
-        if course_id != None:
-            courseTuple = CourseDetails.query.filter_by(id=course_id, instructor_id=instructor.id).first()
-            if not courseTuple:
-                return jsonify({"error": "course not found!"}), 404
-
-    # Validate availability_type
-    programTuple = ProgramDetails.query.filter_by(id=availability_id).first()
-    if not programTuple:
-        return jsonify({"error": f"availability id '{availability_id}' not found"}), 400
-
-    # Validate date
-    is_date_valid = is_valid_date(date)
-    if not is_date_valid:
-        return jsonify({"error": "provide a valid 'YYYY-MM-DD' date format that is not in the past"}), 400
-
-    # Validate start_time and end_time
-    if not is_valid_time(start_time) or not is_valid_time(end_time) or not is_start_time_before_end_time(start_time, end_time):
-        return jsonify({"error": "provide valid 'HH:MM' time formats, ensure that start_time is before end_time, and that they are at least 30 mins apart"}), 400
-
-    return None  # Data is valid
-
-# check if availability already exists in Availability table
-def is_existing_availability(instructor_id, program_id, date, start_time, end_time):
-    existing_availabilities = Availability.query.filter_by(user_id=instructor_id, program_id=program_id, date=date).all()
-    
-    for existing_availability in existing_availabilities:
-        if (start_time < existing_availability.end_time and end_time > existing_availability.start_time):
-            return True  # There is a time overlap
-
-    return False  # No time overlap found
-
-# add a availability tuple to the Availabilty Table
-def add_instructor_availability(course_id, instructor_id, data, physical_location, meeting_url, duration, isDropins):
-    try:
-        program_id = data.get('id')
-        date = data.get('date')
-        start_time = data.get('start_time')
-        end_time = data.get('end_time')
-        
-        # Validate the data
-        validation_result = validate_availability_data(instructor_id, course_id, program_id, date, start_time, end_time, isDropins)
-        if validation_result:
-            print(f"Validation Result: {validation_result}")
-            return validation_result
-        
-        # Check if the same availability already exists for the instructor
-        if is_existing_availability(instructor_id, program_id, date, start_time, end_time):
-            print(f"Existing Availability Found: {instructor_id}, {program_id}, {date}, {start_time}, {end_time}")
-            return jsonify({"error": "availability time conflict or it already exists for this instructor"}), 400
-        
-        current_time = datetime.now() - timedelta(hours=8)
-        availability_datetime = datetime.strptime(date + ' ' + start_time, '%Y-%m-%d %H:%M')
-        if availability_datetime > current_time:
-            # Add the new availability
-            new_availability = Availability(
-                user_id=instructor_id,
-                program_id=program_id,
-                date=date,
-                start_time=start_time,
-                end_time=end_time, 
-                status='active'
-            )
-            db.session.add(new_availability) 
-            db.session.commit()
-
-            print(f"New availability added: {new_availability}")
-            
-            # Generate appointment events
-            if not isDropins:
-                generate_appointments(instructor_id, date, start_time, end_time, physical_location, meeting_url, new_availability.id, duration)
-            return jsonify({"message": "availability added successfully"}), 201
+    course_found = isDropins or course_id is None or \
+        CourseDetails.query.filter_by(id=course_id, instructor_id=instructor_id).first() is not None
+    programs = ProgramDetails.query.filter(ProgramDetails.id.in_([entry.get('id') for entry in entries])).all()
+    program_ids = {str(program.id) for program in programs}
+
+    # index the instructor's windows in every program over the batch's date span
+    days = [day for day in (parse_schedule_strings(entry.get('date'), None, None)[0] for entry in entries) if day]
+    interval_index = AvailabilityIntervalIndex.for_instructor(instructor_id, min(days), max(days)) if days else AvailabilityIntervalIndex()
+    program_names = {str(program.id): program.name for program in programs}
+
+    current_time = datetime.now() - timedelta(hours=8)
+    errors = []
+    for entry in entries:
+        program_id = entry.get('id')
+        date = entry.get('date')
+        start_time = entry.get('start_time')
+        end_time = entry.get('end_time')
+
+        if not all([instructor_id, program_id, date, start_time, end_time]):
+            errors.append(("provide all the required fields", 404))
+        elif not instructor:
+            errors.append(("instructor not found!", 404))
+        elif not course_found:
+            errors.append(("course not found!", 404))
+        elif str(program_id) not in program_ids:
+            errors.append((f"availability id '{program_id}' not found", 400))
+        elif not is_valid_date(date):
+            errors.append(("provide a valid 'YYYY-MM-DD' date format that is not in the past", 400))
+        elif not is_valid_time(start_time) or not is_valid_time(end_time) or not is_start_time_before_end_time(start_time, end_time):
+            errors.append(("provide valid 'HH:MM' time formats, ensure that start_time is before end_time, and that they are at least 30 mins apart", 400))
+        elif datetime.strptime(date + ' ' + start_time, '%Y-%m-%d %H:%M') <= current_time:
+            errors.append(("appointment datetime must be in the future", 400))
         else:
-            return jsonify({"error": "appointment datetime must be in the future"}), 400
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
-        
-# Generate appointment events at 30-minute intervals within the specified time range.
-def generate_appointments(instructor_id, date, start_time, end_time, physical_location, meeting_url, availability_id, duration):
-    try:
-        start_datetime = datetime.strptime(start_time, "%H:%M")
-        end_datetime = datetime.strptime(end_time, "%H:%M")
+            day, start_clock, end_clock, _ = parse_schedule_strings(date, start_time, end_time)
+
+            # overlaps an existing window or an earlier entry of the batch
+            conflict = interval_index.find_conflict(day, start_clock, end_clock)
+            if conflict is None:
+                interval_index.add(day, start_clock, end_clock, {
+                    'availability_id': None,
+                    'program_id': int(program_id),
+                    'name': program_names[str(program_id)],
+                    'date': date,
+                })
+                errors.append(None)
+            elif str(conflict['program_id']) == str(program_id):
+                errors.append(("availability time conflict or it already exists for this instructor", 400, conflict))
+            else:
+                errors.append((f"availability time conflicts with {conflict['name']} on {conflict['date']} "
+                               f"from {conflict['start_time']} to {conflict['end_time']}", 400, conflict))
+
+    return errors
+
+# insert availability rows in one statement and return their ids in the same order
+def insert_availability_rows(instructor_id, availability_rows):
+    table = Availability.__table__
+    if db.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        return db.session.execute(
+            table.insert().returning(table.c.id, sort_by_parameter_order=True), availability_rows
+        ).scalars().all()
+
+    # MySQL has no RETURNING, so look the rows up again, validation leaves one active window per key,
+    # and removed windows with the same key are skipped
+    db.session.execute(table.insert(), availability_rows)
+    days = [row['availability_day'] for row in availability_rows]
+    inserted_availabilities = db.session.query(
+        Availability.id, Availability.program_id, Availability.date, Availability.start_time, Availability.end_time
+    ).filter(
+        Availability.user_id == instructor_id,
+        Availability.status == 'active',
+        Availability.program_id.in_({row['program_id'] for row in availability_rows}),
+        Availability.availability_day.between(min(days), max(days))
+    ).order_by(Availability.id.desc()).all()
+
+    availability_ids = {}
+    for id, program_id, date, start_time, end_time in inserted_availabilities:
+        availability_ids.setdefault((program_id, date, start_time, end_time), id)
+    return [availability_ids[(row['program_id'], row['date'], row['start_time'], row['end_time'])] for row in availability_rows]
+
+# add a batch of availability tuples and their appointment slots with bulk inserts in a single transaction
+def add_instructor_availabilities(course_id, instructor_id, entries, physical_location, meeting_url, duration, isDropins):
+    errors = validate_availability_batch(instructor_id, course_id, entries, isDropins)
+
+    results = []
+    accepted_entries = []
+    for index, (entry, error) in enumerate(zip(entries, errors)):
+        result = {
+            'index': index,
+            'date': entry.get('date'),
+            'start_time': entry.get('start_time'),
+            'end_time': entry.get('end_time'),
+        }
+        if error:
+            result.update({'status': error[1], 'error': error[0]})
+            if len(error) > 2:
+                result['conflict'] = error[2]
+        else:
+            result.update({'status': 201, 'message': 'availability added successfully'})
+            accepted_entries.append(entry)
+        results.append(result)
 
-        while start_datetime < end_datetime:
-            event_end_datetime = start_datetime + timedelta(minutes=duration) if duration else end_datetime
-
-            new_appointment = Appointment(
-                host_id=instructor_id,
-                appointment_date=date,
-                start_time=start_datetime.strftime("%H:%M"),
-                end_time=event_end_datetime.strftime("%H:%M"),
-                status="posted",
-                physical_location=physical_location,
-                meeting_url=meeting_url,
-                availability_id=availability_id,
-                event_id=None  # No Google Calendar event created yet
-            )
-            db.session.add(new_appointment)
-            start_datetime = event_end_datetime  # Move to next time slot
-        
+    if not accepted_entries:
         db.session.commit()
-        print("Appointments generated successfully")
-        return jsonify({"message": "appointments generated successfully"}), 201
-    
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error in generate_appointments: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        return results
+
+    # insert all availabilities in one statement
+    availability_rows = []
+    for entry in accepted_entries:
+        day, start_clock, end_clock, start_at = parse_schedule_strings(entry['date'], entry['start_time'], entry['end_time'])
+        availability_rows.append({
+            'user_id': instructor_id,
+            'program_id': int(entry['id']),
+            'date': entry['date'],
+            'start_time': entry['start_time'],
+            'end_time': entry['end_time'],
+            'availability_day': day,
+            'start_clock': start_clock,
+            'end_clock': end_clock,
+            'start_at': start_at,
+            'status': 'active',
+        })
+    db.session.flush()
+    availability_ids = insert_availability_rows(instructor_id, availability_rows)
+
+    # generate all appointment slots in one statement, open slots are computed on request in lazy slots mode
+    if not isDropins and not lazy_slots_enabled():
+        appointment_rows = []
+        for row, availability_id in zip(availability_rows, availability_ids):
+            for slot_start_time, slot_end_time in get_slot_times(row['start_time'], row['end_time'], duration):
+                day, start_clock, end_clock, start_at = parse_schedule_strings(row['date'], slot_start_time, slot_end_time)
+                appointment_rows.append({
+                    'host_id': instructor_id,
+                    'appointment_date': row['date'],
+                    'start_time': slot_start_time,
+                    'end_time': slot_end_time,
+                    'appointment_day': day,
+                    'start_clock': start_clock,
+                    'end_clock': end_clock,
+                    'start_at': start_at,
+                    'status': 'posted',
+                    'physical_location': physical_location,
+                    'meeting_url': meeting_url,
+                    'availability_id': availability_id,
+                    'event_id': None,
+                })
+        if appointment_rows:
+            db.session.execute(Appointment.__table__.insert(), appointment_rows)
+
+    db.session.commit()
+    return results
+
+# replace a program's availabilities with the submitted set, only touching windows that were added or removed
+def sync_instructor_availabilities(course_id, instructor_id, program_id, entries, physical_location, meeting_url, duration, isDropins):
+    # key every window by (program_id, date, start_time, end_time)
+    def window_key(program_id, date, start_time, end_time):
+        return (str(program_id), date, start_time, end_time)
+
+    stored_availabilities = db.session.query(
+        Availability.id, Availability.program_id, Availability.date, Availability.start_time, Availability.end_time
+    ).filter(
+        Availability.user_id == instructor_id,
+        Availability.program_id == program_id,
+        Availability.status != 'removed'
+    ).all()
+    stored_ids = {window_key(*row[1:]): row[0] for row in stored_availabilities}
+
+    submitted_keys = [window_key(entry.get('id'), entry.get('date'), entry.get('start_time'), entry.get('end_time')) for entry in entries]
+    removed_ids = [id for key, id in stored_ids.items() if key not in set(submitted_keys)]
+
+    # deactivate removed windows and their open appointments, reserved appointments are kept
+    if removed_ids:
+        Availability.query.filter(Availability.id.in_(removed_ids)).update(
+            {Availability.status: 'removed'}, synchronize_session=False
+        )
+        Appointment.query.filter(Appointment.availability_id.in_(removed_ids), Appointment.status == 'posted').update(
+            {Appointment.status: 'inactive'}, synchronize_session=False
+        )
+
+    # add windows that aren't stored yet
+    new_entries = []
+    seen_keys = set()
+    for entry, key in zip(entries, submitted_keys):
+        if key not in stored_ids and key not in seen_keys:
+            new_entries.append(entry)
+        seen_keys.add(key)
+    new_results = iter(add_instructor_availabilities(course_id, instructor_id, new_entries, physical_location, meeting_url, duration, isDropins))
+
+    # merge the results back into the submitted order
+    results = []
+    seen_keys = set()
+    for index, (entry, key) in enumerate(zip(entries, submitted_keys)):
+        if key in stored_ids or key in seen_keys:
+            result = {
+                'date': entry.get('date'),
+                'start_time': entry.get('start_time'),
+                'end_time': entry.get('end_time'),
+                'status': 200,
+                'message': 'availability unchanged',
+            }
+        else:
+            result = next(new_results)
+        result['index'] = index
+        results.append(result)
+        seen_keys.add(key)
+
+    return results
 
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ""               Endpoint Functions                ""
@@ -272,57 +317,27 @@ def get_instructor_courses():
 
         if is_instructor(user_id):
             instructor_courses = CourseDetails.query.join(CourseMembers, CourseDetails.id == CourseMembers.course_id).filter_by(user_id=user_id).all()
-            converted_courses = [{'course_id': course.id, 'course_name': course.name} for course in instructor_courses]
 
             if instructor_courses:
+                # every program of the courses and the instructor's global programs in one query
+                course_programs, global_programs = get_course_programs(
+                    [course.id for course in instructor_courses], [int(user_id)]
+                )
 
                 # return list of all courses
-                courses_list = []
-
-                for entry in converted_courses:
-                    course_id = entry['course_id']
-
-                    programs_in_course = ProgramDetails.query.filter_by(course_id=course_id).all()
-
-                    # list of all programs in a course
-                    programs_in_course_list = []
-
-                    for program in programs_in_course:
-                        # convert attributes to a object
-                        program_info = {
-                            'id': program.id,
-                            'name': program.name,
-                            'description': program.description,
-                            'duration': program.duration,
-                            'physical_location': program.physical_location,
-                            'meeting_url': program.meeting_url,
-                            'auto_approve_appointments': program.auto_approve_appointments,
-                            'max_daily_meetings': program.max_daily_meetings,
-                            'max_weekly_meetings': program.max_weekly_meetings,
-                            'max_monthly_meetings': program.max_monthly_meetings,
-                            'isDropins': program.isDropins,
-                            'isRangeBased': program.isRangeBased,
-                        }
-                        
-                        # append object to list
-                        programs_in_course_list.append(program_info)
-
-                    # format data to append to courses_list
-                    formatTuple = {
-                        'id': course_id,
-                        'course_name': entry['course_name'],
-                        'programs': programs_in_course_list
-                    }
-
-                    # append to courses_list
-                    courses_list.append(formatTuple)
-
-                # fetch global programs for instructor
-                global_programs = get_global_programs(user_id)
-
-                # if global programs found, append to courses_list
-                if global_programs is not None:
-                    courses_list.append(global_programs)
+                courses_list = [{
+                    'id': course.id,
+                    'course_name': course.name,
+                    'programs': [serialize_instructor_program(program) for program in course_programs[course.id]]
+                } for course in instructor_courses]
+
+                # if global programs found, append them as the All Courses entry
+                if global_programs[int(user_id)]:
+                    courses_list.append({
+                        'id': None,
+                        'course_name': 'All Courses',
+                        'programs': [serialize_instructor_program(program) for program in global_programs[int(user_id)]]
+                    })
 
                 # courses found
                 return jsonify(courses_list), 200
@@ -342,7 +357,7 @@ def get_instructor_programs_with_descriptions():
         user_id = get_jwt_identity()
 
         if is_instructor(user_id):
-            instructor = User.query.get(user_id)
+            instructor = get_current_user()
             programs = ProgramDetails.query.filter(ProgramDetails.instructor_id==instructor.id).all()
 
             # return list of all programs with their id, name, and description
@@ -368,71 +383,50 @@ def get_instructor_appointments():
             return jsonify({"error": "Instructor not found"}), 404
         
         meeting_type = request.args.get('type', 'all')
-        current_time_pst = datetime.now(timezone.utc) - timedelta(hours=8)  # Adjust for PST
-        current_date_str = current_time_pst.strftime('%Y-%m-%d')
-        current_time_str = current_time_pst.strftime('%H:%M')
+        current_time_utc = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        appointments_query = Appointment.query.filter(Appointment.host_id == instructor_id)
+        next_page = None
 
         # filter appointments based on meeting type
-        if meeting_type in ['upcoming', 'past', 'pending']:
+        if meeting_type == 'past':
+            # past appointments are read from both the hot and the history tables
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', PAST_PAGE_SIZE, type=int)
+            appointments, next_page = get_past_appointments(
+                'host_id', instructor_id, PAST_STATUSES, current_time_utc, page, per_page
+            )
+        else:
+            appointments_query = select_appointment_rows(Appointment, 'host_id', instructor_id)
             if meeting_type == 'upcoming':
-                appointments_query = appointments_query.filter(
-                    or_(
-                        Appointment.appointment_date > current_date_str,
-                        and_(
-                            Appointment.appointment_date == current_date_str,
-                            Appointment.start_time >= current_time_str
-                        )
-                    ),
+                appointments_query = appointments_query.where(
+                    Appointment.start_at >= current_time_utc,
                     Appointment.status == 'reserved'
                 )
-            elif meeting_type == 'past':
-                appointments_query = appointments_query.filter(
-                    or_(
-                        Appointment.appointment_date < current_date_str,
-                        and_(
-                            Appointment.appointment_date == current_date_str,
-                            Appointment.start_time < current_time_str
-                        )
-                    ),
-                    Appointment.status.in_(['reserved', 'completed', 'rejected', 'missed', 'canceled'])
-                )
             elif meeting_type == 'pending':
-                appointments_query = appointments_query.filter(
-                    or_(
-                        Appointment.appointment_date > current_date_str,
-                        and_(
-                            Appointment.appointment_date == current_date_str,
-                            Appointment.start_time >= current_time_str
-                        )
-                    ),
+                appointments_query = appointments_query.where(
+                    Appointment.start_at >= current_time_utc,
                     Appointment.status == 'pending'
                 )
+            appointments = db.session.execute(appointments_query).all()
 
         instructor_appointments = []
-        appointments = appointments_query.all()
 
         # iterate through appointments
+        # the attendee, program name and course name come from the same joined query
         for appt in appointments:
-            attendee = User.query.get(appt.attendee_id) if appt.attendee_id else None
             # create an object for the attendee's information
             attendee_info = {
-                "name": attendee.name,
-                "pronouns": attendee.pronouns,
-                "email": attendee.email,
-            } if attendee else {}
-
-            # get program name and course name
-            program_name = get_program_name(appt.availability.program_details.id)
-            course_name = get_course_name(appt.course_id)
+                "name": appt.person_name,
+                "pronouns": appt.person_pronouns,
+                "email": appt.person_email,
+            } if appt.person_id is not None else {}
 
             # add appointment information to instructor_appointments
             instructor_appointments.append({
                 "appointment_id": appt.id,
-                "program_id": appt.availability.program_details.id,
-                "name": program_name,
-                "course_name": course_name,
+                "program_id": appt.program_id,
+                "name": appt.program_name,
+                "course_name": appt.course_name,
                 "date": appt.appointment_date,
                 "start_time": appt.start_time,
                 "end_time": appt.end_time,
@@ -444,6 +438,8 @@ def get_instructor_appointments():
                 "attendee": attendee_info,
             })
 
+        if next_page is not None:
+            return jsonify(instructor_appointments=instructor_appointments, next_page=next_page), 200
         return jsonify(instructor_appointments=instructor_appointments), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -523,18 +519,18 @@ def get_comments(appointment_id):
         if not is_instructor(user_id):
             return jsonify({"error": "Instructor not found"}), 404
 
-        appointment = Appointment.query.get(appointment_id)
+        # archived appointments keep their comments in the history table
+        comments = get_appointment_comments(appointment_id)
 
-        if appointment:
-            comments = AppointmentComment.query.filter_by(appointment_id=appointment_id).join(User, AppointmentComment.user_id == User.id).all()
+        if comments is not None:
             comments_list = []
             for comment in comments:
                 # convert attributes to a object
                 comment_info = {
                     'id': comment.id,
-                    'name': comment.user.name,
-                    'title': comment.user.title,
-                    'pronouns': comment.user.pronouns,
+                    'name': comment.name,
+                    'title': comment.title,
+                    'pronouns': comment.pronouns,
                     'user_id': comment.user_id,
                     'appointment_comment': comment.appointment_comment,
                     'created_at': comment.created_at
@@ -595,7 +591,8 @@ def get_instructor_availabilities(course_id):
             availability_data = Availability.query.join(ProgramDetails, Availability.program_id == ProgramDetails.id).filter(
                 and_(
                     Availability.user_id == user_id,
-                    Availability.date > str(current_date),
+                    Availability.availability_day > current_date,
+                    Availability.status != 'removed',
                     ProgramDetails.course_id == course_id
                 )
             ).all()
@@ -603,7 +600,7 @@ def get_instructor_availabilities(course_id):
             availability_list = []
             for availability in availability_data:
                 program = get_program_name_and_isDropins(availability.program_id)
-                course_name = get_course_name(availability.program_details.course_id)
+                course_name = get_course_name(get_program_metadata(availability.program_id)['course_id'])
 
                 # convert attributes to a object
                 availability_info = {
@@ -641,23 +638,15 @@ def post_instructor_availabilities(course_id):
             isDropins = data.get('isDropins')
             program_id = data.get('program_id')
 
-            availabilities_to_delete = Availability.query.filter_by(program_id=program_id).all()
-
-            # delete all past availabilities for the program
-            for availability in availabilities_to_delete:
-                appointments_to_delete = Appointment.query.filter_by(availability_id=availability.id).all()
-
-                # delete all past appointments for the availability
-                for appointment in appointments_to_delete:
-                    db.session.delete(appointment)
+            # add new windows and deactivate removed ones, unchanged windows and their bookings are left alone
+            results = sync_instructor_availabilities(course_id, user_id, program_id, allAvailabilties, physical_location, meeting_url, duration, isDropins)
 
-                db.session.delete(availability)
-
-            # add availabilities to the Availability Table
-            for availabilityEntry in allAvailabilties:
-                result = add_instructor_availability(course_id, user_id, availabilityEntry, physical_location, meeting_url, duration, isDropins)
-                print(f"Result of adding availability: {result}")
-            return jsonify({"message": "all availability added successfully"}), 201
+            succeeded = [result['status'] in (200, 201) for result in results]
+            if all(succeeded):
+                return jsonify({"message": "all availability added successfully", "results": results}), 201
+            if not any(succeeded):
+                return jsonify({"error": "no availability could be added", "results": results}), 400
+            return jsonify({"message": "some availability could not be added", "results": results}), 201
         else:
             return jsonify({"error": "Instructor not found"}), 404
     except Exception as e:
@@ -682,9 +671,6 @@ def update_availability_status():
         availability = Availability.query.filter_by(id=availability_id, user_id=user_id).first()
 
         if availability:
-            parsed_appointment_date = datetime.strptime(availability.date, '%Y-%m-%d')
-            start_of_week, end_of_week = get_week_range(availability.date)
-
             # set all appointments to inactive if availability is set to inactive
             if status == 'inactive':
                 availability.status = status
@@ -694,27 +680,11 @@ def update_availability_status():
                 db.session.commit()
             # set all appointments to posted if availability is set to active and limits are not reached
             elif status == 'active':
-                # calculate monthly count of reserved and pending appointments
-                monthly_count = Appointment.query.filter(
-                    Appointment.host_id == user_id,
-                    extract('month', func.date(Appointment.appointment_date)) == parsed_appointment_date.month,
-                    extract('year', func.date(Appointment.appointment_date)) == parsed_appointment_date.year,
-                    Appointment.status.in_(['reserved', 'pending'])
-                ).count()
-
-                # calculate weekly count of reserved and pending appointments
-                weekly_count = Appointment.query.filter(
-                    Appointment.host_id == user_id,
-                    func.date(Appointment.appointment_date).between(start_of_week, end_of_week),
-                    Appointment.status.in_(['reserved', 'pending'])
-                ).count()
-
-                # calculate daily count of reserved and pending appointments
-                daily_count = Appointment.query.filter(
-                    Appointment.host_id == user_id,
-                    func.date(Appointment.appointment_date) == parsed_appointment_date,
-                    Appointment.status.in_(['reserved', 'pending'])
-                ).count()
+                # get monthly, weekly, and daily count of reserved and pending appointments
+                booking_counts = get_booking_counts(user_id, availability.availability_day)
+                monthly_count = booking_counts['monthly']
+                weekly_count = booking_counts['weekly']
+                daily_count = booking_counts['daily']
 
                 program = ProgramDetails.query.filter_by(id=availability.program_id).first()
 
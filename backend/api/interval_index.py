@@ -0,0 +1,93 @@
+"""
+ * interval_index.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the sorted interval index used to detect availability overlaps
+ * across all of an instructor's programs
+ *
+ * Known Bugs:
+ * - Windows are kept in per-day Python lists, so add() still shifts the
+ *   later windows of its day (a memmove) and find_conflict() is a binary
+ *   search. A day holds at most 48 accepted windows (they are at least 30
+ *   minutes long and can't overlap), which keeps the shift shorter than the
+ *   bookkeeping a balanced tree would need.
+ *
+"""
+
+from bisect import bisect_left, bisect_right
+from .models import Availability, ProgramDetails
+from . import db
+
+class AvailabilityIntervalIndex:
+
+    """""""""""""""""""""""""""""""""""""""""""""""""""""
+    ""             Backend Only Functions              ""
+    """""""""""""""""""""""""""""""""""""""""""""""""""""
+
+    # Initialization function to set up an empty index, windows are grouped by day and sorted by start
+    def __init__(self):
+        self.starts = {}  # day -> sorted start times
+        self.windows = {}  # day -> windows in the same order as starts
+        self.max_ends = {}  # day -> latest end time of windows[0..i]
+
+    # Build the index from a single range query over the instructor's availabilities between two dates
+    @classmethod
+    def for_instructor(cls, instructor_id, start_day, end_day):
+        index = cls()
+
+        rows = db.session.query(
+            Availability.id, Availability.program_id, ProgramDetails.name, Availability.date,
+            Availability.availability_day, Availability.start_clock, Availability.end_clock
+        ).join(ProgramDetails, Availability.program_id == ProgramDetails.id).filter(
+            Availability.user_id == instructor_id,
+            Availability.availability_day.between(start_day, end_day),
+            Availability.status != 'removed'
+        ).order_by(Availability.availability_day, Availability.start_clock).all()
+
+        for availability_id, program_id, name, date, day, start_clock, end_clock in rows:
+            index.add(day, start_clock, end_clock, {
+                'availability_id': availability_id,
+                'program_id': program_id,
+                'name': name,
+                'date': date,
+            })
+        return index
+
+    # Add a window to the index
+    def add(self, day, start_clock, end_clock, details):
+        starts = self.starts.setdefault(day, [])
+        windows = self.windows.setdefault(day, [])
+        max_ends = self.max_ends.setdefault(day, [])
+
+        position = bisect_left(starts, start_clock)
+        starts.insert(position, start_clock)
+        windows.insert(position, (start_clock, end_clock, details))
+        max_ends.insert(position, end_clock)
+
+        # carry the running latest end over the new window, then raise the later running ends below its end.
+        # they never decrease, so this stops at the first one that doesn't, right away for non-overlapping windows
+        if position > 0 and max_ends[position - 1] > end_clock:
+            max_ends[position] = max_ends[position - 1]
+        for i in range(position + 1, len(max_ends)):
+            if max_ends[i] >= end_clock:
+                break
+            max_ends[i] = end_clock
+
+    # Return the details of a window that overlaps start_clock-end_clock on the day, or None
+    def find_conflict(self, day, start_clock, end_clock):
+        starts = self.starts.get(day)
+        if not starts:
+            return None
+
+        # only windows that start before the new one ends can overlap it
+        position = bisect_left(starts, end_clock)
+        if position == 0 or self.max_ends[day][position - 1] <= start_clock:
+            return None
+
+        # the first running latest end after start_clock is that window's own end, and it starts before position
+        window_start, window_end, details = self.windows[day][bisect_right(self.max_ends[day], start_clock)]
+        return {
+            **details,
+            'start_time': window_start.strftime('%H:%M'),
+            'end_time': window_end.strftime('%H:%M'),
+        }
@@ -0,0 +1,193 @@
+"""
+ * invalidation.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the invalidation bus that tells every worker process to drop
+ * cached course, program, and account data after a write, with an
+ * in-memory transport for tests, a SQLite polling transport for single
+ * host deployments, and a Redis pub/sub transport
+ *
+ * Known Bugs:
+ * - Messages are fire and forget. A worker that misses one (e.g. the
+ *   transport was unreachable) only catches up through the cache TTLs.
+ *
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from uuid import uuid4
+
+# delivers messages synchronously to every bus started on the same transport object, used by tests
+class MemoryTransport:
+    def __init__(self):
+        self.listeners = []
+
+    def start(self, listener):
+        self.listeners.append(listener)
+
+    def send(self, origin, kind, key):
+        for listener in list(self.listeners):
+            listener(origin, kind, key)
+
+    def close(self):
+        self.listeners = []
+
+# shares messages through a table in a local SQLite file that every worker polls
+class SQLiteTransport:
+    def __init__(self, path, poll_interval=0.01, retention=60):
+        self.path = path
+        self.poll_interval = poll_interval  # seconds between polls
+        self.retention = retention  # seconds a message is kept for slow pollers
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = self.connect()
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS invalidation_message ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT, kind TEXT, key TEXT, created_at REAL)'
+        )
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+
+    def start(self, listener):
+        # only messages sent after this worker started are relevant, its caches are still empty
+        with self.lock:
+            last_id = self.connection.execute('SELECT COALESCE(MAX(id), 0) FROM invalidation_message').fetchone()[0]
+        self.thread = threading.Thread(target=self.poll, args=(listener, last_id), daemon=True)
+        self.thread.start()
+
+    def poll(self, listener, last_id):
+        connection = self.connect()
+        while not self.stopped.wait(self.poll_interval):
+            try:
+                rows = connection.execute(
+                    'SELECT id, origin, kind, key FROM invalidation_message WHERE id > ? ORDER BY id', (last_id,)
+                ).fetchall()
+            except sqlite3.Error:
+                continue
+
+            for message_id, origin, kind, key in rows:
+                last_id = message_id
+                listener(origin, kind, json.loads(key))
+        connection.close()
+
+    def send(self, origin, kind, key):
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                'INSERT INTO invalidation_message (origin, kind, key, created_at) VALUES (?, ?, ?, ?)',
+                (origin, kind, json.dumps(key), now)
+            )
+            self.connection.execute('DELETE FROM invalidation_message WHERE created_at < ?', (now - self.retention,))
+
+    def close(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        self.connection.close()
+
+# shares messages through a Redis (or Redis protocol compatible) pub/sub channel
+class RedisTransport:
+    def __init__(self, url=None, channel='scheduler-invalidation', client=None):
+        if client is None:
+            import redis  # optional dependency, only needed when INVALIDATION_TRANSPORT is "redis"
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.channel = channel
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self, listener):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        self.thread = threading.Thread(target=self.listen, args=(pubsub, listener), daemon=True)
+        self.thread.start()
+
+    def listen(self, pubsub, listener):
+        while not self.stopped.is_set():
+            message = pubsub.get_message(timeout=1.0)
+            if message and message['type'] == 'message':
+                origin, kind, key = json.loads(message['data'])
+                listener(origin, kind, key)
+        pubsub.close()
+
+    def send(self, origin, kind, key):
+        self.client.publish(self.channel, json.dumps([origin, kind, key]))
+
+    def close(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+
+# runs the invalidation handlers of this worker for its own writes and for messages from the other workers
+class InvalidationBus:
+    def __init__(self):
+        self.handlers = defaultdict(list)  # kind -> functions called with the key to drop
+        self.origin = uuid4().hex  # identifies this worker's messages
+        self.transport = None
+
+    # call handler(key) whenever this or another worker publishes a message of this kind
+    def subscribe(self, kind, handler):
+        self.handlers[kind].append(handler)
+
+    # drop the key in this worker right away, then tell the other workers, call after committing the write
+    def publish(self, kind, key):
+        self.dispatch(kind, key)
+        if self.transport:
+            try:
+                self.transport.send(self.origin, kind, key)
+            except Exception as e:
+                # the write already committed, other workers fall back to their cache TTLs
+                print(f"Invalidation of {kind} {key} not sent: {e}")
+
+    def dispatch(self, kind, key):
+        for handler in self.handlers[kind]:
+            handler(key)
+
+    def receive(self, origin, kind, key):
+        if origin == self.origin:
+            return
+        try:
+            self.dispatch(kind, key)
+        except Exception as e:
+            # keep the transport's listener thread alive
+            print(f"Invalidation of {kind} {key} failed: {e}")
+
+    # switch to a new transport, closing the previous one
+    def connect(self, transport):
+        self.close()
+        self.transport = transport
+        if transport:
+            transport.start(self.receive)
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+invalidation_bus = InvalidationBus()
+
+# build the transport selected by INVALIDATION_TRANSPORT: sqlite (the default, workers on one host),
+# redis (workers on several hosts), or memory (a single worker process only)
+def create_transport(config):
+    transport = config.get('INVALIDATION_TRANSPORT', 'sqlite')
+    if transport == 'memory':
+        return None
+    if transport == 'sqlite':
+        return SQLiteTransport(config['INVALIDATION_SQLITE_PATH'])
+    if transport == 'redis':
+        return RedisTransport(config['INVALIDATION_REDIS_URL'])
+    raise ValueError(f"Unknown INVALIDATION_TRANSPORT '{transport}', use memory, sqlite, or redis")
+
+# connect this worker's bus to the configured transport
+def configure_invalidation(config):
+    invalidation_bus.connect(create_transport(config))
@@ -0,0 +1,143 @@
+"""
+ * metadata_cache.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the process-wide caches for program and course metadata,
+ * which listing endpoints look up once per row but only changes a few
+ * times per quarter
+ *
+ * Known Bugs:
+ * - Each worker process has its own cache, writes in other workers
+ *   reach it through the invalidation bus, or else the entry's TTL.
+ *
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from .invalidation import invalidation_bus
+
+DEFAULT_CACHE_SIZE = 2048
+DEFAULT_CACHE_TTL = 300  # seconds
+
+class MetadataCache:
+    # bounded LRU cache whose entries also expire ttl seconds after they were loaded
+    def __init__(self, name, max_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self.loading = {}  # key -> generation of its newest load in flight, dropped when the key is invalidated
+        self.generation = 0
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # change the size and TTL, dropping every entry
+    def configure(self, max_size, ttl):
+        with self.lock:
+            self.max_size = max_size
+            self.ttl = ttl
+            self.entries.clear()
+            self.loading.clear()
+
+    # return the cached value for key, or load(key) and cache it unless it is None
+    def get(self, key, load):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            self.generation += 1
+            generation = self.loading[key] = self.generation
+
+        # load outside the lock so a slow query doesn't block other lookups
+        try:
+            value = load(key)
+        except Exception:
+            with self.lock:
+                if self.loading.get(key) == generation:
+                    del self.loading[key]
+            raise
+
+        with self.lock:
+            # an invalidation or a newer load of the key while this one ran makes its value stale
+            if self.loading.get(key) != generation:
+                return value
+            del self.loading[key]
+            if value is None or self.max_size <= 0:
+                return value
+
+            self.entries[key] = (now + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    # drop the cached value of key
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.loading.pop(key, None)
+
+    # drop the cached values of every key for which match(key) is true
+    def invalidate_matching(self, match):
+        with self.lock:
+            for key in [key for key in self.entries if match(key)]:
+                del self.entries[key]
+            for key in [key for key in self.loading if match(key)]:
+                del self.loading[key]
+
+    # drop every cached value
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.loading.clear()
+
+    # hit/miss counters used to size the cache
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else None,
+            }
+
+    # reset the counters, keeping the cached values
+    def reset_stats(self):
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+# program_id -> {'name', 'isDropins', 'course_id', 'instructor_id'}
+program_cache = MetadataCache('program')
+# course_id -> {'name', 'instructor_id'}
+course_cache = MetadataCache('course')
+metadata_caches = (program_cache, course_cache)
+# (account_type, status, prefix) -> number of matching users, for the admin user listings
+user_count_cache = MetadataCache('user_count', max_size=256, ttl=60)
+# (instructor_id, course_id or 'null') -> program times of the instructor's course, for /course/programs/times
+program_times_cache = MetadataCache('program_times', max_size=512)
+
+# writes in any worker publish the id of the changed program or course
+invalidation_bus.subscribe('program', program_cache.invalidate)
+invalidation_bus.subscribe('course', course_cache.invalidate)
+
+# apply METADATA_CACHE_SIZE and METADATA_CACHE_TTL from the app config
+def configure_metadata_caches(config):
+    for cache in metadata_caches:
+        cache.configure(config.get('METADATA_CACHE_SIZE', DEFAULT_CACHE_SIZE), config.get('METADATA_CACHE_TTL', DEFAULT_CACHE_TTL))
+    user_count_cache.clear()
+    program_times_cache.clear()
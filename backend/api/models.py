@@ -1,6 +1,6 @@
 """ 
  * models.py
- * Last Edited: 5/25/24
+ * Last Edited: 10/18/26
  *
  * Contains all Tables and their attributes using SQLAlchemy
  *
@@ -10,7 +10,35 @@
 """
 
 from . import db
-from datetime import datetime
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy import event
+
+# stored wall-clock times are Pacific time (PST or PDT), converted to build the UTC start_at column
+SCHEDULE_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+# parse the YYYY-MM-DD and HH:MM strings into typed date, time, and UTC start values
+def parse_schedule_strings(date_str, start_str, end_str):
+    def parse_clock(value):
+        for time_format in ("%H:%M", "%H:%M:%S"):
+            try:
+                return datetime.strptime(value, time_format).time()
+            except (TypeError, ValueError):
+                continue
+        return None
+
+    try:
+        day = datetime.strptime(str(date_str), "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        day = None
+
+    start_clock = parse_clock(start_str)
+    end_clock = parse_clock(end_str)
+    start_at = None
+    if day and start_clock:
+        start_at = datetime.combine(day, start_clock, SCHEDULE_TIMEZONE).astimezone(timezone.utc).replace(tzinfo=None)
+
+    return day, start_clock, end_clock, start_at
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -51,11 +79,19 @@ class CourseTimes(db.Model):
     course_details = db.relationship("CourseDetails", back_populates="times")
     
 class CourseMembers(db.Model):
+    __table_args__ = (
+        db.Index('ix_course_members_user_course', 'user_id', 'course_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     course_id = db.Column(db.Integer, db.ForeignKey('course_details.id'))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
 
 class ProgramDetails(db.Model):
+    __table_args__ = (
+        db.Index('ix_program_details_course_instructor', 'course_id', 'instructor_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     course_id = db.Column(db.Integer, db.ForeignKey('course_details.id'))
     instructor_id = db.Column(db.Integer, db.ForeignKey('user.id'))
@@ -82,13 +118,22 @@ class ProgramTimes(db.Model):
     program_details = db.relationship("ProgramDetails", back_populates="program_times")
 
 class Availability(db.Model):
+    __table_args__ = (
+        db.Index('ix_availability_user_program_day', 'user_id', 'program_id', 'availability_day'),
+        db.Index('ix_availability_program_day', 'program_id', 'availability_day'),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     program_id = db.Column(db.Integer, db.ForeignKey('program_details.id'))  
     date = db.Column(db.String(150))  # YYYY-MM-DD
     start_time = db.Column(db.String(150))  # YYYY-MM-DDTHH:MM:SS
     end_time = db.Column(db.String(150))  # YYYY-MM-DDTHH:MM:SS
-    status = db.Column(db.String(50))  # active, inactive
+    availability_day = db.Column(db.Date)  # typed copy of date
+    start_clock = db.Column(db.Time)  # typed copy of start_time
+    end_clock = db.Column(db.Time)  # typed copy of end_time
+    start_at = db.Column(db.DateTime)  # date + start_time in UTC
+    status = db.Column(db.String(50))  # active, inactive, removed
     appointments = db.relationship(
         'Appointment', 
         back_populates='availability', 
@@ -97,6 +142,11 @@ class Availability(db.Model):
     program_details = db.relationship("ProgramDetails", back_populates="availability")
 
 class Appointment(db.Model):
+    __table_args__ = (
+        db.Index('ix_appointment_host_day_status', 'host_id', 'appointment_day', 'status'),
+        db.Index('ix_appointment_attendee_start', 'attendee_id', 'start_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     host_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     course_id = db.Column(db.Integer, db.ForeignKey('course_details.id'))  
@@ -105,6 +155,10 @@ class Appointment(db.Model):
     appointment_date = db.Column(db.String(150))  # YYYY-MM-DD
     start_time = db.Column(db.String(150))  # YYYY-MM-DDTHH:MM:SS
     end_time = db.Column(db.String(150))  # YYYY-MM-DDTHH:MM:SS
+    appointment_day = db.Column(db.Date)  # typed copy of appointment_date
+    start_clock = db.Column(db.Time)  # typed copy of start_time
+    end_clock = db.Column(db.Time)  # typed copy of end_time
+    start_at = db.Column(db.DateTime)  # appointment_date + start_time in UTC
     event_id = db.Column(db.String(255))
     physical_location = db.Column(db.String(255))
     meeting_url = db.Column(db.String(255))
@@ -113,6 +167,22 @@ class Appointment(db.Model):
     availability = db.relationship('Availability', back_populates='appointments')
     appointment_comment = db.relationship('AppointmentComment', backref='appointment', cascade='all, delete-orphan')
     
+class HostBookingCount(db.Model):
+    host_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    period_type = db.Column(db.String(10), primary_key=True)  # daily, weekly, monthly
+    period_start = db.Column(db.Date, primary_key=True)  # first day of the period
+    booked_count = db.Column(db.Integer, nullable=False, default=0)  # reserved and pending appointments
+
+class UserClaimsChange(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    changed_at = db.Column(db.Integer, nullable=False)  # unix time of the last account_type or status change, tokens issued before are stale
+
+# write counters behind the ETags of etags.py, shared so every worker builds the same tag
+class EntityVersion(db.Model):
+    kind = db.Column(db.String(20), primary_key=True)  # course, programs, user, users, catalog
+    key = db.Column(db.String(20), primary_key=True)  # entity id, '' for the users and catalog entities
+    version = db.Column(db.Integer, nullable=False, default=0)
+
 class AppointmentComment(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'))
@@ -129,4 +199,61 @@ class Feedback(db.Model):
     attendee_rating = db.Column(db.String(255))
     attendee_notes = db.Column(db.Text)
     host_rating = db.Column(db.String(255))
-    host_notes = db.Column(db.Text)
\ No newline at end of file
+    host_notes = db.Column(db.Text)
+
+# finished appointments moved out of the Appointment table by the archival job (see archive.py)
+class AppointmentHistory(db.Model):
+    __table_args__ = (
+        db.Index('ix_appointment_history_host_start', 'host_id', 'start_at'),
+        db.Index('ix_appointment_history_attendee_start', 'attendee_id', 'start_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # id the appointment had in the Appointment table
+    host_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    course_id = db.Column(db.Integer, db.ForeignKey('course_details.id'))
+    attendee_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    availability_id = db.Column(db.Integer)  # no foreign key, the availability may be deleted after archival
+    program_id = db.Column(db.Integer)  # program of the availability at archival time
+    appointment_date = db.Column(db.String(150))  # YYYY-MM-DD
+    start_time = db.Column(db.String(150))
+    end_time = db.Column(db.String(150))
+    appointment_day = db.Column(db.Date)
+    start_clock = db.Column(db.Time)
+    end_clock = db.Column(db.Time)
+    start_at = db.Column(db.DateTime)
+    event_id = db.Column(db.String(255))
+    physical_location = db.Column(db.String(255))
+    meeting_url = db.Column(db.String(255))
+    notes = db.Column(db.Text)
+    status = db.Column(db.String(50))
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class AppointmentCommentHistory(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment_history.id'), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    appointment_comment = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+
+class FeedbackHistory(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment_history.id'), index=True)
+    attendee_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    host_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    attendee_rating = db.Column(db.String(255))
+    attendee_notes = db.Column(db.Text)
+    host_rating = db.Column(db.String(255))
+    host_notes = db.Column(db.Text)
+
+# keep the typed schedule columns in sync with the string columns on every ORM write
+@event.listens_for(Availability, 'before_insert')
+@event.listens_for(Availability, 'before_update')
+def sync_availability_schedule(mapper, connection, target):
+    target.availability_day, target.start_clock, target.end_clock, target.start_at = \
+        parse_schedule_strings(target.date, target.start_time, target.end_time)
+
+@event.listens_for(Appointment, 'before_insert')
+@event.listens_for(Appointment, 'before_update')
+def sync_appointment_schedule(mapper, connection, target):
+    target.appointment_day, target.start_clock, target.end_clock, target.start_at = \
+        parse_schedule_strings(target.appointment_date, target.start_time, target.end_time)
@@ -11,10 +11,16 @@
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select, delete, func
+from collections import defaultdict
+from operator import attrgetter
 from .models import ProgramDetails, User, Appointment, Availability, ProgramTimes, CourseDetails, CourseMembers, AppointmentComment, Feedback, CourseTimes
 from . import db
-from .user import is_instructor
+from .user import is_instructor, get_current_user, filter_users, get_user_filters, page_users
+from .booking_limits import BOOKED_STATUSES, apply_booking_deltas
+from .metadata_cache import program_cache, course_cache, program_times_cache
+from .invalidation import invalidation_bus
+from .etags import conditional, bump_versions
 
 programs = Blueprint('programs', __name__)
 
@@ -22,36 +28,170 @@ programs = Blueprint('programs', __name__)
 ""             Backend Only Functions              ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 
+# load the name, isDropins, course_id, and instructor_id of a program, or None if it doesn't exist
+def load_program_metadata(program_id):
+    program = db.session.execute(
+        select(ProgramDetails.name, ProgramDetails.isDropins, ProgramDetails.course_id, ProgramDetails.instructor_id)
+        .where(ProgramDetails.id == program_id)
+    ).first()
+    return dict(program._mapping) if program else None
+
+# load the name and instructor_id of a course, or None if it doesn't exist
+def load_course_metadata(course_id):
+    course = db.session.execute(
+        select(CourseDetails.name, CourseDetails.instructor_id).where(CourseDetails.id == course_id)
+    ).first()
+    return dict(course._mapping) if course else None
+
+# return the cached metadata of a program
+def get_program_metadata(program_id):
+    if program_id is None:
+        return None
+    return program_cache.get(int(program_id), load_program_metadata)
+
+# return the cached metadata of a course
+def get_course_metadata(course_id):
+    if course_id is None:
+        return None
+    return course_cache.get(int(course_id), load_course_metadata)
+
+# drop a program from the metadata cache of every worker after it was changed or deleted
+def invalidate_program_metadata(program_id):
+    if program_id is not None:
+        invalidation_bus.publish('program', int(program_id))
+
+# drop a course from the metadata cache of every worker after it was changed or deleted
+def invalidate_course_metadata(course_id):
+    if course_id is not None:
+        invalidation_bus.publish('course', int(course_id))
+
 # return the program name for a given program ID
 def get_program_name(program_id): 
     try: 
-        program = ProgramDetails.query.filter_by(id=program_id).first()
+        program = get_program_metadata(program_id)
 
         if program:
-            return program.name
+            return program['name']
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 # return the course name for a course_id
 def get_course_name(course_id): 
     try: 
-        course = CourseDetails.query.filter_by(id=course_id).first()
+        course = get_course_metadata(course_id)
 
         if course:
-            return course.name
+            return course['name']
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# build a function that converts a program to an object with the given attributes
+def compile_program_serializer(fields):
+    get_values = attrgetter(*fields)
+
+    def serialize(program):
+        return dict(zip(fields, get_values(program)))
+    return serialize
+
+# attributes returned for a program in the program listings
+PROGRAM_FIELDS = (
+    'id', 'name', 'description', 'duration', 'physical_location', 'meeting_url', 'auto_approve_appointments',
+    'max_daily_meetings', 'max_weekly_meetings', 'max_monthly_meetings', 'isDropins',
+)
+serialize_program = compile_program_serializer(PROGRAM_FIELDS)
+serialize_instructor_program = compile_program_serializer(PROGRAM_FIELDS + ('isRangeBased',))
+serialize_program_description = compile_program_serializer(('id', 'name', 'description', 'duration'))
+
+# get the programs of the given courses and the global programs of the given instructors with one query
+# returns ({course_id: [programs]}, {instructor_id: [global programs]})
+def get_course_programs(course_ids, instructor_ids):
+    programs = ProgramDetails.query.filter(or_(
+        ProgramDetails.course_id.in_(course_ids),
+        and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id.in_(instructor_ids))
+    )).order_by(ProgramDetails.id).all()
+
+    course_programs = defaultdict(list)
+    global_programs = defaultdict(list)
+    for program in programs:
+        if program.course_id is not None:
+            course_programs[program.course_id].append(program)
+        else:
+            global_programs[program.instructor_id].append(program)
+    return course_programs, global_programs
+
+# drop the cached program times of every course of an instructor in this worker
+def drop_program_times(instructor_id):
+    program_times_cache.invalidate_matching(lambda key: key[0] == instructor_id)
+
+# drop the cached program times of every course of an instructor in every worker
+def invalidate_program_times(instructor_id):
+    if instructor_id is not None:
+        invalidation_bus.publish('program_times', int(instructor_id))
+
+invalidation_bus.subscribe('program_times', drop_program_times)
+
+# get the program times of an instructor's course ("null" for global programs) with one query, or None if there are no programs
+def load_program_times(instructor_id, course_id):
+    query = db.session.query(
+        ProgramDetails.id, ProgramDetails.name, ProgramTimes.day, ProgramTimes.start_time, ProgramTimes.end_time
+    ).outerjoin(ProgramTimes, ProgramTimes.program_id == ProgramDetails.id).filter(ProgramDetails.instructor_id == instructor_id)
+
+    # all courses programs
+    if course_id == "null":
+        query = query.filter(ProgramDetails.course_id.is_(None))
+    # single course programs
+    else:
+        query = query.filter(ProgramDetails.course_id == course_id)
+
+    rows = query.order_by(ProgramDetails.id, ProgramTimes.id).all()
+    if not rows:
+        return None
+
+    # programs without times only have the outer joined row
+    return [{
+        'program_id': program_id,
+        'name': name,
+        'day': day,
+        'start_time': start_time,
+        'end_time': end_time,
+    } for program_id, name, day, start_time, end_time in rows if day is not None]
+
+# delete a program and all connected data with one statement per table, the caller commits
+def delete_program_rows(program_id):
+    availability_ids = select(Availability.id).where(Availability.program_id == program_id)
+    appointment_ids = select(Appointment.id).where(Appointment.availability_id.in_(availability_ids))
+
+    # reserved and pending appointments are removed from the host booking counters
+    booked_rows = db.session.execute(
+        select(Appointment.host_id, Appointment.appointment_day, func.count())
+        .where(Appointment.availability_id.in_(availability_ids), Appointment.status.in_(BOOKED_STATUSES))
+        .group_by(Appointment.host_id, Appointment.appointment_day)
+    ).all()
+    apply_booking_deltas(db.session.connection(), {(host_id, day): -count for host_id, day, count in booked_rows})
+
+    for statement in (
+        delete(AppointmentComment).where(AppointmentComment.appointment_id.in_(appointment_ids)),
+        delete(Feedback).where(Feedback.appointment_id.in_(appointment_ids)),
+        delete(Appointment).where(Appointment.availability_id.in_(availability_ids)),
+        delete(Availability).where(Availability.program_id == program_id),
+        delete(ProgramTimes).where(ProgramTimes.program_id == program_id),
+        delete(ProgramDetails).where(ProgramDetails.id == program_id),
+    ):
+        db.session.execute(statement, execution_options={'synchronize_session': False})
+
+    # objects already loaded in the session no longer have rows
+    db.session.expire_all()
+
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ""               Endpoint Functions                ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 
 @programs.route('/course/details/<course_id>', methods=['GET'])
 @jwt_required()
+@conditional(lambda course_id: [('course', course_id)])
 def get_courses_details(course_id):
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if user and course_id is not None:
             course = CourseDetails.query.filter_by(id=course_id).first()
@@ -80,8 +220,7 @@ def get_courses_details(course_id):
 @jwt_required()
 def set_course_details():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user:
             return jsonify({"error": "user not found"}), 404
@@ -109,6 +248,8 @@ def set_course_details():
             course.comments = comments
 
             db.session.commit()
+            invalidate_course_metadata(course.id)
+            bump_versions(('course', course.id))
             
             return jsonify({"message": "Course details updated successfully"}), 200
         else:
@@ -120,6 +261,7 @@ def set_course_details():
 # get all of the times for a course
 @programs.route('/course/times/<course_id>', methods=['GET'])
 @jwt_required()
+@conditional(lambda course_id: [('course', course_id)])
 def get_course_times(course_id):
     try:
         course = CourseDetails.query.get(course_id)
@@ -168,6 +310,7 @@ def set_course_times(course_id):
                 for course in courses:
                     db.session.delete(course)
                 db.session.commit()
+                bump_versions(('course', course_id))
 
             # add the new times
             if len(data) > 0:
@@ -196,6 +339,7 @@ def set_course_times(course_id):
                 for courseTimesTuple in courseTimesTuples:
                     db.session.add(courseTimesTuple)
                 db.session.commit()
+                bump_versions(*[('course', course_id) for course_id in data])
                 return jsonify({"message": "Times updated successfully"}), 200
             
             # set no times for course
@@ -207,8 +351,16 @@ def set_course_times(course_id):
         print(e)
         return jsonify({"error": str(e)}), 500
 
+# the course and its instructor's programs, or None for a course that doesn't exist
+def get_programs_entities(course_id):
+    course = get_course_metadata(course_id) if course_id.isdigit() else None
+    if course is None:
+        return None
+    return [('course', course_id), ('programs', course['instructor_id'])]
+
 # fetch all of the programs in a course, including global programs for the instructor of the course
 @programs.route('/course/programs/<course_id>', methods=['GET'])
+@conditional(get_programs_entities, cache_control='public, no-cache')
 def get_programs(course_id):
     try: 
         course = CourseDetails.query.filter_by(id=course_id).first()
@@ -243,41 +395,14 @@ def get_program_times_in_course(course_id):
         if not is_instructor(user_id):
             return jsonify({"msg": "instructor access required"}), 401
         
-        instructor = User.query.get(user_id)
+        if course_id != "null" and not course_id.isdigit():
+            return jsonify({"error": "course_id must be a course id or null"}), 400
 
-        # all courses programs
-        if course_id == "null":
-            programs = ProgramDetails.query.filter(ProgramDetails.course_id.is_(None), ProgramDetails.instructor_id==instructor.id).all()
-        # single course programs
-        else:
-            programs = ProgramDetails.query.filter_by(course_id=course_id, instructor_id=instructor.id).all()
-        
-        if programs:
-            # return list of program times
-            course_times_list = []
-
-            for program in programs:
-
-                program_times = ProgramTimes.query.filter_by(program_id=program.id).all()
+        key = (int(user_id), course_id if course_id == "null" else int(course_id))
+        times = program_times_cache.get(key, lambda key: load_program_times(*key))
 
-                program_name = get_program_name(program.id)
-
-                for tuple in program_times:
-                    # convert attributes to a object
-                    program_time_info = {
-                        'program_id': tuple.program_id,
-                        'name': program_name,
-                        'day': tuple.day,
-                        'start_time': tuple.start_time,
-                        'end_time': tuple.end_time,
-                    }
-
-                    # append the object to the list
-                    course_times_list.append(program_time_info)
-            return jsonify(course_times_list), 200
-        else:
-            # no programs found
-            return jsonify(None), 200
+        # None when no programs were found
+        return jsonify(times), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -295,6 +420,10 @@ def set_program_times(program_id):
         program_id = program_id
         courseTimesTuples = []
 
+        # the cached times of the program's instructor are dropped after the update
+        program = ProgramDetails.query.get(program_id)
+        instructor_id = program.instructor_id if program else user_id
+
         if data is not None:
             # set times for course
             courses = ProgramTimes.query.filter_by(program_id=program_id).all()
@@ -332,10 +461,14 @@ def set_program_times(program_id):
                 for courseTimesTuple in courseTimesTuples:
                     db.session.add(courseTimesTuple)
                 db.session.commit()
+                invalidate_program_times(instructor_id)
+                bump_versions(('programs', instructor_id))
                 return jsonify({"message": "Times updated successfully"}), 200
             
             # set no times for course
             else:
+                invalidate_program_times(instructor_id)
+                bump_versions(('programs', instructor_id))
                 return jsonify({"message": "Times updated successfully: No times for course"}), 200
         else:
             return jsonify({"error": "Times data not found"}), 404
@@ -378,6 +511,9 @@ def create_program():
                 # post to the database
                 db.session.add(new_details)
                 db.session.commit()
+                invalidate_program_times(user_id)
+                invalidate_program_metadata(new_details.id)
+                bump_versions(('programs', user_id))
 
                 # Return the new program ID
                 new_program_id = new_details.id
@@ -397,37 +533,14 @@ def delete_program(program_id):
         if not is_instructor(user_id):
             return jsonify({"msg": "instructor access required"}), 401
 
-        # delete appointments
-        appointments = Appointment.query.join(Availability).filter_by(program_id=program_id).all()
-        for appointment in appointments:
-            comments = AppointmentComment.query.filter_by(appointment_id=appointment.id).all()
-            feedbacks = Feedback.query.filter_by(appointment_id=appointment.id).all()
-
-            # delete comments
-            for comment in comments:
-                db.session.delete(comment)
-
-            # delete feedback
-            for feedback in feedbacks:
-                db.session.delete(feedback)
-
-            db.session.delete(appointment)
-
-        # delete availability
-        availabilities = Availability.query.filter_by(program_id=program_id).all()
-        for availability in availabilities:
-            db.session.delete(availability)
-
-        # delete program_times
-        times = ProgramTimes.query.filter_by(program_id=program_id).all()
-        for time in times:
-            db.session.delete(time)
-
-        # delete program
         program = ProgramDetails.query.get_or_404(program_id)
-        db.session.delete(program)
+        instructor_id = program.instructor_id
+        delete_program_rows(program.id)
 
         db.session.commit()
+        invalidate_program_times(instructor_id)
+        invalidate_program_metadata(program_id)
+        bump_versions(('programs', instructor_id))
         return jsonify({"msg": "Program deleted"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -487,6 +600,9 @@ def set_program_details():
             program.isDropins = isDropins
 
             db.session.commit()
+            invalidate_program_times(program.instructor_id)
+            invalidate_program_metadata(program.id)
+            bump_versions(('programs', program.instructor_id))
             
             return jsonify({"message": "Program name updated successfully"}), 200
         else:
@@ -549,6 +665,7 @@ def create_course():
             db.session.add(new_student_member)
 
         db.session.commit()
+        bump_versions(('course', new_course_id))
 
         return jsonify({"message": "Course created successfully"}), 200
 
@@ -577,6 +694,7 @@ def add_user_to_course():
             # post to the database
             db.session.add(new_details)
             db.session.commit()
+            bump_versions(('course', course_id))
             
             return jsonify({"message": "Added to course successfully"}), 200
         else:
@@ -585,13 +703,20 @@ def add_user_to_course():
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
-# fetch all students so that they can be selected when creating a course
+# fetch a page of students, optionally filtered by a name or email prefix, so that they can be selected when creating a course
 @programs.route('/students', methods=['GET'])
 @jwt_required()
 def get_all_students():
     try:
-        students = User.query.filter_by(account_type='student').all()
+        filters = get_user_filters(request.args, account_type='student')
+        students, next_cursor = page_users(filter_users(select(User.id, User.name), **filters), request.args)
         students_list = [{'id': student.id, 'name': student.name} for student in students]
-        return jsonify(students_list), 200
+
+        # all=true keeps the original response of every student in a plain list
+        if request.args.get('all', '').lower() == 'true':
+            return jsonify(students_list), 200
+        return jsonify({'students': students_list, 'next_cursor': next_cursor}), 200
+    except ValueError as e:
+        return jsonify({"error": f"Invalid paging parameters: {e}"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
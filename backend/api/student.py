@@ -17,13 +17,17 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, \
     set_access_cookies, get_jwt, create_access_token
-from sqlalchemy import extract, or_, and_, func
+from sqlalchemy import and_, or_
 from .models import User, Appointment, ProgramDetails, Availability, AppointmentComment, CourseDetails, CourseMembers
 from . import db
 from datetime import datetime, timedelta, timezone
 from .mail import send_email
-from .programs import get_program_name, get_course_name
-from .user import is_student, is_instructor
+from .user import is_student, is_instructor, get_current_user
+from .programs import get_course_programs, serialize_program, serialize_program_description
+from .booking_limits import get_booking_counts, get_exceeded_scope, get_scope_range
+from .virtual_slots import lazy_slots_enabled, get_open_slots, parse_slot_id, materialize_slot, compact_slots
+from .archive import select_appointment_rows, get_past_appointments, get_appointment_comments, \
+    PAST_PAGE_SIZE, PAST_STATUSES
 from ics import Calendar, Event
 from .calendars.google_calendar import GoogleCalendarService
 
@@ -48,48 +52,6 @@ def refresh_expiring_jwts(response):
 ""             Backend Only Functions              ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
     
-# get all of the global programs for a instructor
-def get_global_programs(instructor_id):
-    try:
-        if is_instructor(instructor_id):
-            # get all global programs for the instructor
-            all_global_programs = ProgramDetails.query.filter(
-                and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id == instructor_id)
-            ).all()
-
-            # global programs found
-            if all_global_programs:
-                all_formatted_programs = []
-
-                for program in all_global_programs:
-                    # convert attributes to a object
-                    program_info = {
-                        'id': program.id,
-                        'name': program.name,
-                        'description': program.description,
-                        'duration': program.duration,
-                        'physical_location': program.physical_location,
-                        'meeting_url': program.meeting_url,
-                        'auto_approve_appointments': program.auto_approve_appointments,
-                        'max_daily_meetings': program.max_daily_meetings,
-                        'max_weekly_meetings': program.max_weekly_meetings,
-                        'max_monthly_meetings': program.max_monthly_meetings,
-                        'isDropins': program.isDropins,
-                    }
-
-                    # append object to list
-                    all_formatted_programs.append(program_info)
-
-                return all_formatted_programs
-            else: 
-                # no global programs found
-                return None
-        else:
-            # instructor not found
-            return None
-    except Exception as e:
-        return None
-
 # Helper function to send confirmation email to attendee and host
 def send_confirmation_email(appointment):
     attendee = User.query.get(appointment.attendee_id)
@@ -131,56 +93,23 @@ def send_confirmation_email(appointment):
         return True
     return False
 
-# Helper function to get the start and end dates of the week for a given date
-def get_week_range(date_str):
-    date = datetime.strptime(date_str, '%Y-%m-%d')
-    start_of_week = date - timedelta(days=date.weekday())
-    end_of_week = start_of_week + timedelta(days=6)
-    return start_of_week.strftime('%Y-%m-%d'), end_of_week.strftime('%Y-%m-%d')
-
 # Helper function to update appointments and availabilities status
-def update_appointments_status(host_id, appointment_date, scope):
-    parsed_appointment_date = datetime.strptime(appointment_date, '%Y-%m-%d')
-    if scope == 'daily':
-        # Update appointments for the day
-        appointments = Appointment.query.filter(
-            Appointment.host_id == host_id,
-            func.date(Appointment.appointment_date) == appointment_date,
-            Appointment.status == 'posted'
-        ).all()
-        # Update the availability for the day
-        availabilities = Availability.query.filter(
-            Availability.user_id == host_id,
-            func.date(Availability.date) == appointment_date
-        ).all()
-    elif scope == 'weekly':
-        start_of_week, end_of_week = get_week_range(appointment_date)
-        # Update appointments for the week
-        appointments = Appointment.query.filter(
-            Appointment.host_id == host_id,
-            func.date(Appointment.appointment_date).between(start_of_week, end_of_week),
-            Appointment.status == 'posted'
-        ).all()
-        # Update availabilities for the week
-        availabilities = Availability.query.filter(
-            Availability.user_id == host_id,
-            func.date(Availability.date).between(start_of_week, end_of_week)
-        ).all()
-    elif scope == 'monthly':
-        #Your code here
-        appointments = Appointment.query.filter(
-            Appointment.host_id == host_id,
-            extract('month', func.date(Appointment.appointment_date)) == parsed_appointment_date.month,
-            extract('year', func.date(Appointment.appointment_date)) == parsed_appointment_date.year,
-            Appointment.status == 'posted'
-        ).all()
-
-        # Update availabilities for the month
-        availabilities = Availability.query.filter(
-            Availability.user_id == host_id,
-            extract('month', func.date(Availability.date)) == parsed_appointment_date.month,
-            extract('year', func.date(Availability.date)) == parsed_appointment_date.year
-        ).all()
+def update_appointments_status(host_id, appointment_day, scope):
+    start_day, end_day = get_scope_range(appointment_day, scope)
+
+    # Update appointments for the day, week, or month
+    appointments = Appointment.query.filter(
+        Appointment.host_id == host_id,
+        Appointment.appointment_day.between(start_day, end_day),
+        Appointment.status == 'posted'
+    ).all()
+
+    # Update availabilities for the day, week, or month
+    availabilities = Availability.query.filter(
+        Availability.user_id == host_id,
+        Availability.availability_day.between(start_day, end_day),
+        Availability.status == 'active'
+    ).all()
         
     # Set all fetched appointments to 'inactive'
     for appt in appointments:
@@ -206,53 +135,49 @@ def get_student_dropins(course_id):
             member = CourseMembers.query.filter(CourseMembers.user_id==user_id, CourseMembers.course_id==course_id).first()
 
             if member:
-                course_information = CourseDetails.query.filter(CourseDetails.id == member.course_id).first()
-                programs_in_course = ProgramDetails.query.filter(ProgramDetails.course_id == member.course_id).all()
-
-                all_formatted_programs = []
-
-                if programs_in_course:
-                    for program in programs_in_course:
-                        program_info = {
-                            'id': program.id,
-                            'isDropins': program.isDropins,
-                        }
-                        all_formatted_programs.append(program_info)
-                    
-                # get global programs
-                global_programs = get_global_programs(course_information.instructor_id)
-
-                # if there are global programs: append to all_formatted_programs with their id and isDropins
-                if global_programs is not None:
-                    global_programs = [{'id': program['id'], 'isDropins': program['isDropins']} for program in global_programs]
-
-                    for program in global_programs:
-                        all_formatted_programs.append(program)
+                # optional date range, from today onward by default
+                start_date = request.args.get('start_date')
+                end_date = request.args.get('end_date')
+                try:
+                    start_day = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else datetime.now().date()
+                    end_day = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+                except ValueError:
+                    return jsonify({"error": "Invalid date format, expected YYYY-MM-DD"}), 400
+
+                # drop-in programs of the course and global drop-in programs of the course instructor
+                course_instructor_id = db.session.query(CourseDetails.instructor_id) \
+                    .filter(CourseDetails.id == member.course_id).scalar_subquery()
+                dropin_program_ids = db.session.query(ProgramDetails.id).filter(
+                    ProgramDetails.isDropins == True,
+                    or_(
+                        ProgramDetails.course_id == member.course_id,
+                        and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id == course_instructor_id)
+                    )
+                )
 
-                # then filter by isDropins == True
-                all_formatted_programs = [program for program in all_formatted_programs if program.get('isDropins') == True]
+                # their availabilities, in the same statement
+                dropins_query = db.session.query(
+                    Availability.id, ProgramDetails.name, Availability.date, Availability.start_time, Availability.end_time
+                ).join(ProgramDetails, Availability.program_id == ProgramDetails.id).filter(
+                    Availability.program_id.in_(dropin_program_ids),
+                    Availability.status != 'removed',
+                    Availability.availability_day >= start_day
+                )
+                if end_day:
+                    dropins_query = dropins_query.filter(Availability.availability_day <= end_day)
 
                 dropin_times = []
-
-                # for each program, get the availabilities attached to it
-                for program in all_formatted_programs:
-                    availabilities = Availability.query.filter_by(program_id=program.get('id')).all()
-
-                    # for each availability, get the program id, name, date, start time, and end time
-                    for availability in availabilities:
-                        program_name = get_program_name(availability.program_details.id)
-
-                        # convert attributes to a object
-                        availability_info = {
-                            'id': availability.id,
-                            'name': program_name,
-                            'date': availability.date,
-                            'start_time': availability.start_time,
-                            'end_time': availability.end_time,
-                        }
-
-                        # append object to return list
-                        dropin_times.append(availability_info)
+                for availability_id, name, date, start_time, end_time in dropins_query.order_by(
+                    Availability.availability_day, Availability.start_clock, Availability.id
+                ):
+                    # convert attributes to a object
+                    dropin_times.append({
+                        'id': availability_id,
+                        'name': name,
+                        'date': date,
+                        'start_time': start_time,
+                        'end_time': end_time,
+                    })
 
                 # when all programs have been iterated through, return the list
                 return jsonify(dropin_times), 200
@@ -275,72 +200,51 @@ def get_student_appointments_for_course():
             return jsonify({"error": "Student not found"}), 404
 
         meeting_type = request.args.get('type', 'all')
-        current_time_pst = datetime.now(timezone.utc) - timedelta(hours=8)
-        current_date_str = current_time_pst.strftime('%Y-%m-%d')
-        current_time_str = current_time_pst.strftime('%H:%M')
+        current_time_utc = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        appointments_query = Appointment.query.filter(Appointment.attendee_id == student_id)
+        next_page = None
 
         # filter appointments based on meeting type
-        if meeting_type in ['upcoming', 'past', 'pending']:
+        if meeting_type == 'past':
+            # past appointments are read from both the hot and the history tables
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', PAST_PAGE_SIZE, type=int)
+            appointments, next_page = get_past_appointments(
+                'attendee_id', student_id, PAST_STATUSES, current_time_utc, page, per_page
+            )
+        else:
+            appointments_query = select_appointment_rows(Appointment, 'attendee_id', student_id)
             if meeting_type == 'upcoming':
-                appointments_query = appointments_query.filter(
-                    or_(
-                        Appointment.appointment_date > current_date_str,
-                        and_(
-                            Appointment.appointment_date == current_date_str,
-                            Appointment.start_time >= current_time_str
-                        )
-                    ),
+                appointments_query = appointments_query.where(
+                    Appointment.start_at >= current_time_utc,
                     Appointment.status == 'reserved'
                 )
-            elif meeting_type == 'past':
-                appointments_query = appointments_query.filter(
-                    or_(
-                        Appointment.appointment_date < current_date_str,
-                        and_(
-                            Appointment.appointment_date == current_date_str,
-                            Appointment.start_time < current_time_str
-                        )
-                    ),
-                    Appointment.status.in_(['reserved', 'completed', 'rejected', 'missed', 'canceled'])
-                )
             elif meeting_type == 'pending':
-                appointments_query = appointments_query.filter(
-                    or_(
-                        Appointment.appointment_date > current_date_str,
-                        and_(
-                            Appointment.appointment_date == current_date_str,
-                            Appointment.start_time >= current_time_str
-                        )
-                    ),
+                appointments_query = appointments_query.where(
+                    Appointment.start_at >= current_time_utc,
                     Appointment.status == 'pending'
                 )
+            appointments = db.session.execute(appointments_query).all()
 
         student_appointments = []
-        appointments = appointments_query.all()
 
         # iterate through appointments
+        # the host, program name and course name come from the same joined query
         for appt in appointments:
-            host = User.query.get(appt.host_id) if appt.host_id else None
             # create an object for the host's information
             host_info = {
-                "name": host.name,
-                "title": host.title,
-                "pronouns": host.pronouns,
-                "email": host.email,
-            } if host else {}
-
-            # get program name and course name
-            program_name = get_program_name(appt.availability.program_details.id)
-            course_name = get_course_name(appt.course_id)
+                "name": appt.person_name,
+                "title": appt.person_title,
+                "pronouns": appt.person_pronouns,
+                "email": appt.person_email,
+            } if appt.person_id is not None else {}
 
             # add appointment information to student_appointments
             student_appointments.append({
                 "appointment_id": appt.id,
-                "program_id": appt.availability.program_details.id,
-                "name": program_name,
-                "course_name": course_name,
+                "program_id": appt.program_id,
+                "name": appt.program_name,
+                "course_name": appt.course_name,
                 "date": appt.appointment_date,
                 "start_time": appt.start_time,
                 "end_time": appt.end_time,
@@ -352,6 +256,8 @@ def get_student_appointments_for_course():
                 "host": host_info
             })
 
+        if next_page is not None:
+            return jsonify(student_appointments=student_appointments, next_page=next_page), 200
         return jsonify(student_appointments=student_appointments), 200
     except Exception as e:
         print(e)
@@ -370,32 +276,19 @@ def get_student_programs():
         all_student_courses = CourseDetails.query.join(CourseMembers, CourseDetails.id == CourseMembers.course_id).filter_by(user_id=student_id).all()
 
         if all_student_courses:
+            # programs of every course and the global programs of their instructors in one query
+            course_programs, global_programs = get_course_programs(
+                [course.id for course in all_student_courses], {course.instructor_id for course in all_student_courses}
+            )
 
             all_programs = []
 
             for course in all_student_courses:
-                all_programs_in_course = ProgramDetails.query.filter_by(course_id=course.id).all()
-
-                # get global programs for instructor
-                global_programs = get_global_programs(course.instructor_id)
-
                 # for each program in course
-                for program in all_programs_in_course:
-                    # convert attributes to a object
-                    program_info = {
-                        'id': program.id,
-                        'name': program.name,
-                        'description': program.description,
-                        'duration': program.duration,
-                    }
+                all_programs.extend(serialize_program_description(program) for program in course_programs[course.id])
 
-                    # append object to list
-                    all_programs.append(program_info)
-                    
-                # if there are global programs: append to all_programs
-                if global_programs is not None:
-                    for global_program in global_programs:
-                        all_programs.append(global_program)
+                # global programs of the course instructor
+                all_programs.extend(serialize_program(program) for program in global_programs[course.instructor_id])
             
             return jsonify(all_programs), 200
         else: 
@@ -453,61 +346,25 @@ def get_appointment_programs():
             return jsonify({"error": "Student not found"}), 404
         
         student_courses = CourseDetails.query.join(CourseMembers, CourseDetails.id == CourseMembers.course_id).filter_by(user_id=student_id).all()
-        converted_courses = [{'course_id': course.id, 'course_name': course.name} for course in student_courses]
 
         if student_courses:
+            # programs of every course and the global programs of their instructors in one query
+            course_programs, global_programs = get_course_programs(
+                [course.id for course in student_courses], {course.instructor_id for course in student_courses}
+            )
 
             # return list of all courses
             courses_list = []
 
-            for entry in converted_courses:
-                course_id = entry['course_id']
-
-                programs_in_course = ProgramDetails.query.filter_by(course_id=course_id).all()
-
-                course = CourseDetails.query.filter_by(id=course_id).first()
-
-                global_programs = get_global_programs(course.instructor_id)
-
-                # list of all programs in a course
-                programs_in_course_list = []
-
-                for program in programs_in_course:
-                    # check if program is not a dropin
-                    if program.isDropins == False:
-                        # convert attributes to a object
-                        program_info = {
-                            'id': program.id,
-                            'name': program.name,
-                            'description': program.description,
-                            'duration': program.duration,
-                            'physical_location': program.physical_location,
-                            'meeting_url': program.meeting_url,
-                            'auto_approve_appointments': program.auto_approve_appointments,
-                            'max_daily_meetings': program.max_daily_meetings,
-                            'max_weekly_meetings': program.max_weekly_meetings,
-                            'max_monthly_meetings': program.max_monthly_meetings,
-                            'isDropins': program.isDropins,
-                        }
-
-                        # append object to list
-                        programs_in_course_list.append(program_info)
-
-                # if global programs found and a dropin, append to programs_in_course_list 
-                if global_programs is not None:
-                    for global_program in global_programs:
-                        if global_program['isDropins'] == False:
-                            programs_in_course_list.append(global_program)
-
-                # format data to append to courses_list
-                formatTuple = {
-                    'id': course_id,
-                    'course_name': entry['course_name'],
-                    'programs': programs_in_course_list
-                }
+            for course in student_courses:
+                # course programs followed by the instructor's global programs, without dropins
+                programs = course_programs[course.id] + global_programs[course.instructor_id]
 
-                # append to courses_list
-                courses_list.append(formatTuple)
+                courses_list.append({
+                    'id': course.id,
+                    'course_name': course.name,
+                    'programs': [serialize_program(program) for program in programs if program.isDropins == False]
+                })
             
             return jsonify(courses_list), 200
         else: 
@@ -516,6 +373,7 @@ def get_appointment_programs():
         return jsonify({"error": str(e)}), 500
     
 # Retrieve available appointments to reserve for a student
+# ?format=compact groups the slots by availability, see compact_slots
 @student.route('/student/appointments/available/<program_id>/<course_id>', methods=['GET'])
 @jwt_required()
 def get_available_appointments(program_id, course_id):
@@ -525,6 +383,10 @@ def get_available_appointments(program_id, course_id):
         print("student_id = ", student_id)
         if not is_student(student_id):
             return jsonify({"error": "Student not found"}), 404
+
+        response_format = request.args.get('format', 'full')
+        if response_format not in ('full', 'compact'):
+            return jsonify({"error": "format must be full or compact"}), 400
         
         now = datetime.now()
 
@@ -535,31 +397,37 @@ def get_available_appointments(program_id, course_id):
             if program.course_id == None:
                 course_id = None
             
-            # get all future appointments for the program
-            future_appointments = Appointment.query.join(Availability).join(ProgramDetails).filter(
-                (Appointment.status == 'posted') &
-                (ProgramDetails.id == program_id) &
-                (ProgramDetails.course_id == course_id) &
-                (Appointment.appointment_date > now.date())
-            ).all()
-
-
-            available_appointments = []
-            for appt in future_appointments:
-                # convert attributes to a object
-                appointment_data = {
-                    "appointment_id": appt.id,
-                    "physical_location": appt.physical_location,
-                    "date": appt.appointment_date,
-                    "program_id": appt.availability.program_details.id,
-                    "start_time": appt.start_time,
-                    "end_time": appt.end_time,
-                    "status": appt.status,
-                    "meeting_url": appt.meeting_url
-                }
+            # compute the open slots from the program's availabilities
+            if lazy_slots_enabled():
+                available_appointments = get_open_slots(program, course_id, now.date())
+            else:
+                # get all future appointments for the program
+                future_appointments = Appointment.query.join(Availability).join(ProgramDetails).filter(
+                    (Appointment.status == 'posted') &
+                    (ProgramDetails.id == program_id) &
+                    (ProgramDetails.course_id == course_id) &
+                    (Appointment.appointment_day > now.date())
+                ).all()
+
+                available_appointments = []
+                for appt in future_appointments:
+                    # convert attributes to a object
+                    appointment_data = {
+                        "appointment_id": appt.id,
+                        "availability_id": appt.availability_id,
+                        "physical_location": appt.physical_location,
+                        "date": appt.appointment_date,
+                        "program_id": appt.availability.program_details.id,
+                        "start_time": appt.start_time,
+                        "end_time": appt.end_time,
+                        "status": appt.status,
+                        "meeting_url": appt.meeting_url
+                    }
 
-                # append object to list
-                available_appointments.append(appointment_data)
+                    # append object to list
+                    available_appointments.append(appointment_data)
+            if response_format == 'compact':
+                return jsonify(compact_slots(program.id, available_appointments))
             print(f"Available appointments: {available_appointments}")   
             return jsonify({"available_appointments": available_appointments})
         else:
@@ -597,11 +465,15 @@ def reserve_appointment(appointment_id, course_id):
     try:
         student_id = get_jwt_identity()
 
-        student = User.query.get(student_id)
+        student = get_current_user()
         if not student or student.account_type != 'student':
             return jsonify({"error": "Only students are allowed to book sessions!"}), 400
         
-        appointment = Appointment.query.get(appointment_id)
+        # slots without an Appointment tuple yet are created on reservation
+        if parse_slot_id(appointment_id):
+            appointment = materialize_slot(appointment_id)
+        else:
+            appointment = Appointment.query.get(appointment_id)
         
         if not appointment or appointment.status != 'posted':
             return jsonify({"error": "Appointment is not available for reservation"}), 400
@@ -615,32 +487,11 @@ def reserve_appointment(appointment_id, course_id):
 
         instructor_limits = ProgramDetails.query.filter_by(id=appointment.availability.program_details.id).first()
 
-        # Calculate week range for the appointment
-        start_of_week, end_of_week = get_week_range(appointment.appointment_date)
-
-        # Count current reserved and pending appointments for the day
-        daily_count = Appointment.query.filter(
-            Appointment.host_id == appointment.host_id,
-            func.date(Appointment.appointment_date) == appointment.appointment_date,
-            Appointment.status.in_(['reserved', 'pending'])
-        ).count()
-
-        # Count current reserved and pending appointments for the week
-        weekly_count = Appointment.query.filter(
-            Appointment.host_id == appointment.host_id,
-            func.date(Appointment.appointment_date).between(start_of_week, end_of_week),
-            Appointment.status.in_(['reserved', 'pending'])
-        ).count()
-        
-        parsed_appointment_date = datetime.strptime(appointment.appointment_date, '%Y-%m-%d')
-
-        # Count current reserved and pending appointments for the month
-        monthly_count = Appointment.query.filter(
-            Appointment.host_id == appointment.host_id,
-            extract('month', func.date(Appointment.appointment_date)) == parsed_appointment_date.month,
-            extract('year', func.date(Appointment.appointment_date)) == parsed_appointment_date.year,
-            Appointment.status.in_(['reserved', 'pending'])
-        ).count()
+        # Get current reserved and pending appointment counts for the day, week, and month
+        booking_counts = get_booking_counts(appointment.host_id, appointment.appointment_day)
+        daily_count = booking_counts['daily']
+        weekly_count = booking_counts['weekly']
+        monthly_count = booking_counts['monthly']
         
         # Check against daily and weekly limits
         if (not instructor_limits) or (daily_count < instructor_limits.max_daily_meetings and \
@@ -655,19 +506,30 @@ def reserve_appointment(appointment_id, course_id):
                 else:
                     appointment.status = 'pending'
                 appointment.course_id = course_id
-                    
+
+                # the flush increments the counters, which locks their rows until the commit, so a concurrent
+                # reservation that passed the check above waits here and then sees this one in the counts
+                db.session.flush()
+                booking_counts = get_booking_counts(appointment.host_id, appointment.appointment_day, lock=True)
+                exceeded_scope = get_exceeded_scope(booking_counts, instructor_limits)
+                if exceeded_scope:
+                    host_id, appointment_day = appointment.host_id, appointment.appointment_day
+                    db.session.rollback()
+                    update_appointments_status(host_id, appointment_day, exceeded_scope)
+                    return jsonify({"message": "Meeting limit reached"}), 409
+
                 # Check if this appointment hits the daily or weekly limit
-                hits_daily_limit = daily_count + 1 == instructor_limits.max_daily_meetings
-                hits_weekly_limit = weekly_count + 1 == instructor_limits.max_weekly_meetings
-                hits_monthly_limit = monthly_count + 1 == instructor_limits.max_monthly_meetings
+                hits_daily_limit = booking_counts['daily'] == instructor_limits.max_daily_meetings
+                hits_weekly_limit = booking_counts['weekly'] == instructor_limits.max_weekly_meetings
+                hits_monthly_limit = booking_counts['monthly'] == instructor_limits.max_monthly_meetings
                 db.session.commit()
                 
                 if hits_daily_limit:
-                    update_appointments_status(appointment.host_id, appointment.appointment_date, 'daily')
+                    update_appointments_status(appointment.host_id, appointment.appointment_day, 'daily')
                 elif hits_weekly_limit:
-                    update_appointments_status(appointment.host_id, appointment.appointment_date, 'weekly')
+                    update_appointments_status(appointment.host_id, appointment.appointment_day, 'weekly')
                 elif hits_monthly_limit:
-                    update_appointments_status(appointment.host_id, appointment.appointment_date, 'monthly')
+                    update_appointments_status(appointment.host_id, appointment.appointment_day, 'monthly')
 
                 
                 if appointment.status == 'reserved':
@@ -685,9 +547,9 @@ def reserve_appointment(appointment_id, course_id):
         else:
             # Update remaining slots if limits are reached
             if daily_count >= instructor_limits.max_daily_meetings:
-                update_appointments_status(appointment.host_id, appointment.appointment_date, 'daily')
+                update_appointments_status(appointment.host_id, appointment.appointment_day, 'daily')
             elif weekly_count >= instructor_limits.max_weekly_meetings:
-                update_appointments_status(appointment.host_id, appointment.appointment_date, 'weekly')
+                update_appointments_status(appointment.host_id, appointment.appointment_day, 'weekly')
             return jsonify({"message": "Meeting limit reached"}), 409
     except Exception as e:
         print(f"ERM: {str(e)}")
@@ -734,17 +596,17 @@ def get_comments(appointment_id):
         if not is_student(student_id):
             return jsonify({"error": "Student not found"}), 404
         
-        appointment = Appointment.query.get(appointment_id)
+        # archived appointments keep their comments in the history table
+        comments = get_appointment_comments(appointment_id)
         
-        if appointment:
-            comments = AppointmentComment.query.filter_by(appointment_id=appointment_id).join(User, AppointmentComment.user_id == User.id).all()
+        if comments is not None:
             comments_list = []
             for comment in comments:
                 # convert attributes to a object
                 comment_info = {
                     'id': comment.id,
-                    'name': comment.user.name,
-                    'pronouns': comment.user.pronouns,
+                    'name': comment.name,
+                    'pronouns': comment.pronouns,
                     'user_id': comment.user_id,
                     'appointment_comment': comment.appointment_comment,
                     'created_at': comment.created_at
@@ -10,17 +10,32 @@
  *
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, g
 from flask_jwt_extended import jwt_required, get_jwt_identity, \
     set_access_cookies, get_jwt, create_access_token
-from .models import User, Appointment, ProgramDetails, CourseDetails, CourseMembers, ProgramTimes, CourseTimes
+from sqlalchemy import and_, or_, select, func
+from collections import defaultdict
+from .models import User, UserClaimsChange, Appointment, ProgramDetails, CourseDetails, CourseMembers, ProgramTimes, CourseTimes
 from . import db
 from .mail import send_email
+from .invalidation import invalidation_bus
+from .etags import conditional, bump_versions, CATALOG, USERS
+from .metadata_cache import user_count_cache
+from .user_search import user_search_index
 from ics import Calendar, Event
 from datetime import datetime, timedelta, timezone
+import time
 
 user = Blueprint('user', __name__)
 
+# page size of the user listings when the request doesn't set one, and the largest allowed
+USER_PAGE_SIZE = 100
+MAX_USER_PAGE_SIZE = 500
+
+# unix time of the last account_type or status change per user id, tokens issued at or before it are stale.
+# loaded at startup and kept current by the 'claims' messages of the invalidation bus, so role checks don't query
+claims_changed_at = {}
+
 # token generator
 @user.after_request
 def refresh_expiring_jwts(response):
@@ -35,108 +50,215 @@ def refresh_expiring_jwts(response):
     except (RuntimeError, KeyError):
         # Case where there is not a valid JWT. Just return the original response
         return response
+
+# drop the user cached by a previous request sharing this app context, e.g. under the test client
+@user.before_app_request
+def clear_current_user():
+    g.pop('current_user', None)
+
+# reissue tokens whose role claims went stale, on every blueprint
+@user.after_app_request
+def refresh_stale_claims(response):
+    try:
+        if get_jwt() and get_token_claims(get_jwt_identity()) is None and get_current_user():
+            set_access_cookies(response, create_access_token(identity=get_jwt_identity()))
+        return response
+    except (RuntimeError, KeyError):
+        return response
     
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ""             Backend Only Functions              ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 
+# load the user behind the JWT identity once per request, later calls reuse the cached User on flask.g
+def get_current_user():
+    if 'current_user' not in g:
+        user_id = get_jwt_identity()
+        g.current_user = db.session.get(User, int(user_id)) if user_id is not None else None
+    return g.current_user
+
+# the claims of the current token if it belongs to user_id and was issued after the user's last role change
+def get_token_claims(user_id):
+    try:
+        claims = get_jwt()
+    except RuntimeError:
+        return None
+
+    if user_id is None or claims.get('sub') != str(user_id) or 'account_type' not in claims:
+        return None
+    if claims.get('iat', 0) <= claims_changed_at.get(int(user_id), 0):
+        return None
+    return claims
+
+# account type of a user, read from the token claims when they can be trusted and from the database otherwise
+def get_account_type(user_id):
+    if user_id is None:
+        return None
+
+    claims = get_token_claims(user_id)
+    if claims:
+        return claims['account_type']
+
+    # the identity map hands back the User already loaded by get_current_user without another query
+    user = db.session.get(User, int(user_id))
+    return user.account_type if user else None
+
+# store that the tokens of a user went stale after their account_type or status changed, call before committing
+# and publish the returned [user_id, changed_at] as 'claims' on the invalidation bus after committing
+def record_claims_change(user_id):
+    changed_at = int(time.time())
+    db.session.merge(UserClaimsChange(user_id=user_id, changed_at=changed_at))
+    return [user_id, changed_at]
+
+# mark the tokens of a user as stale in this worker
+def apply_claims_change(change):
+    user_id, changed_at = change
+    claims_changed_at[user_id] = max(claims_changed_at.get(user_id, 0), changed_at)
+
+invalidation_bus.subscribe('claims', apply_claims_change)
+
+# load the role changes recent enough to still have live tokens, run once at startup
+def load_claims_changes(token_lifetime):
+    oldest = int(time.time() - token_lifetime.total_seconds())
+    changes = db.session.execute(
+        select(UserClaimsChange.user_id, UserClaimsChange.changed_at).where(UserClaimsChange.changed_at >= oldest)
+    )
+    claims_changed_at.clear()
+    claims_changed_at.update({user_id: changed_at for user_id, changed_at in changes})
+
 # check if user is an instructor
 def is_instructor(user_id):
-    instructor = User.query.get(user_id)
-    return instructor.account_type == 'instructor' if instructor else False
+    return get_account_type(user_id) == 'instructor'
 
 # check if user is an student
 def is_student(user_id):
-    student = User.query.get(user_id)
-    return student.account_type == 'student' if student else False
+    return get_account_type(user_id) == 'student'
+
+# filter a select of users by account type, status, and a name or email prefix
+def filter_users(query, account_type=None, status=None, prefix=None):
+    if account_type:
+        query = query.where(User.account_type == account_type)
+    if status:
+        query = query.where(User.status == status)
+    if prefix:
+        pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        query = query.where(or_(User.name.like(pattern, escape='\\'), User.email.like(pattern, escape='\\')))
+    return query
+
+# read the account_type, status, and q (name or email prefix) filters of a user listing from the query string
+def get_user_filters(args, account_type=None):
+    return {
+        'account_type': account_type or args.get('account_type'),
+        'status': args.get('status'),
+        'prefix': args.get('q', '').strip() or None,
+    }
+
+# one page of the users matched by a select, ordered by id and starting after the "after" cursor of the query string
+# returns (rows, next_cursor), or every row and no cursor when the request sets all=true
+def page_users(query, args):
+    query = query.order_by(User.id)
+    if args.get('all', '').lower() == 'true':
+        return db.session.execute(query).all(), None
+
+    limit = int(args.get('limit', USER_PAGE_SIZE))
+    if limit <= 0:
+        raise ValueError("limit must be a positive number")
+    limit = min(limit, MAX_USER_PAGE_SIZE)
+
+    after = args.get('after')
+    if after is not None:
+        query = query.where(User.id > int(after))
+
+    # one extra row tells if there is another page
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
+
+# count the users matched by the filters, cached until a user is added or changed
+def count_users(account_type=None, status=None, prefix=None):
+    def load(key):
+        return db.session.scalar(filter_users(select(func.count(User.id)), *key))
+    return user_count_cache.get((account_type, status, prefix), load)
+
+# user writes publish the USERS entity, which makes the cached counts stale
+def drop_user_counts(entities):
+    if any((kind, key) == USERS for kind, key, version in entities):
+        user_count_cache.clear()
+
+invalidation_bus.subscribe('versions', drop_user_counts)
+
+# build the standard time of every HH:MM military time once, e.g. '13:05' -> '1:05 PM'
+def build_standard_time_table():
+    table = {}
+    for hour in range(24):
+        for minute in range(60):
+            table[f"{hour:02d}:{minute:02d}"] = f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+    return table
+
+STANDARD_TIMES = build_standard_time_table()
 
 # convert a military time object to a standard time object
 def convert_to_standard_time(military_time):
-    military_time_obj = datetime.strptime(military_time, "%H:%M")
-    formatted_hours = military_time_obj.strftime("%I").lstrip("0")
-    standard_time = military_time_obj.strftime(f"{formatted_hours}:%M %p")
-
-    return standard_time
-
-# based on the given program id and name, print the times for the program in a string format
-def findStandardTimes(id, name):
-    try:
-        # search through CourseTimes
-        if name == "Course Details":
-            tuples = (
-                CourseTimes.query
-                .join(CourseDetails, CourseTimes.course_id == CourseDetails.id)
-                .filter(CourseDetails.id == id)
-            )
-            details = tuples.first().course_details if tuples.first() else None
-
-        # search through ProgramTimes
-        else:
-            tuples = (
-                ProgramTimes.query
-                .join(ProgramDetails, ProgramTimes.program_id == ProgramDetails.id)
-                .filter(ProgramDetails.course_id == id, ProgramDetails.name == name)
-            )
-            details = tuples.first().program_details if tuples.first() else None
-
-        # set physical_location and link
-        times = ""
-        physical_location = details.physical_location if details else "No Location"
-        link = details.meeting_url if details else "No URL"
-
-        tuples = tuples.all()
-
-        if tuples:
-            # convert the times to a string format
-            tempString = ""
-            for obj in tuples:
-                if tempString:
-                    tempString += "/"
-                tempString += (
-                    obj.day + " " + convert_to_standard_time(obj.start_time) + "-" +
-                    convert_to_standard_time(obj.end_time)
-                )
-            times = tempString
-        else:
-            times = "No Known Times"
-
-        return {'times': times, 'physical_location': physical_location, 'link': link }
-    except Exception as e:
-        return {"error": str(e)}, 404
+    standard_time = STANDARD_TIMES.get(military_time)
+    if standard_time:
+        return standard_time
 
-# based on the given program name and instructor_id, print the times for their office hours in a string format
-def findInstructorOfficeHours(name, instructor_id):
-    try:
-        # search through ProgramTimes
-        program = (
-            ProgramTimes.query
-            .join(ProgramDetails, ProgramTimes.program_id == ProgramDetails.id)
-            .filter(ProgramDetails.course_id == None, ProgramDetails.name == name, ProgramDetails.instructor_id == instructor_id)
+    # times that aren't zero padded, e.g. '9:00'
+    military_time_obj = datetime.strptime(military_time, "%H:%M")
+    return STANDARD_TIMES[military_time_obj.strftime("%H:%M")]
+
+# print a list of time tuples with day, start_time, and end_time in a string format, with the location of the details they belong to
+def format_times(time_rows, details):
+    if not time_rows:
+        return {'times': "No Known Times", 'physical_location': "No Location", 'link': "No URL"}
+
+    times = "/".join(
+        row.day + " " + convert_to_standard_time(row.start_time) + "-" + convert_to_standard_time(row.end_time)
+        for row in time_rows
+    )
+    return {'times': times, 'physical_location': details.physical_location, 'link': details.meeting_url}
+
+# get the course times and office hours of every course with two queries, keyed by course id
+def get_course_card_times(courses):
+    course_ids = [course.id for course in courses]
+    instructor_ids = {course.instructor_id for course in courses}
+
+    # all times of the courses
+    course_times = defaultdict(list)
+    for row in CourseTimes.query.filter(CourseTimes.course_id.in_(course_ids)).order_by(CourseTimes.id):
+        course_times[row.course_id].append(row)
+
+    # office hours attached to the courses, and global office hours of their instructors
+    office_hour_rows = db.session.query(
+        ProgramTimes.day, ProgramTimes.start_time, ProgramTimes.end_time, ProgramDetails.course_id,
+        ProgramDetails.instructor_id, ProgramDetails.physical_location, ProgramDetails.meeting_url
+    ).join(ProgramDetails, ProgramTimes.program_id == ProgramDetails.id).filter(
+        ProgramDetails.name == "Office Hours",
+        or_(
+            ProgramDetails.course_id.in_(course_ids),
+            and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id.in_(instructor_ids))
         )
+    ).order_by(ProgramTimes.id).all()
 
-        program_details = program.first().program_details if program.first() else None
-
-        # set physical_location and link
-        times = ""
-        physical_location = program_details.physical_location if program_details else "No Location"
-        link = program_details.meeting_url if program_details else "No URL"
-        
-        program = program.all()
-
-        if len(program) > 0:
-            # convert the times to a string format
-            tempString = ""
-            for obj in program:
-                if tempString != "":
-                    tempString += "/"
-                tempString += (obj.day + " " + convert_to_standard_time(obj.start_time) + "-" + convert_to_standard_time(obj.end_time))
-            times = tempString
+    course_office_hours = defaultdict(list)
+    global_office_hours = defaultdict(list)
+    for row in office_hour_rows:
+        if row.course_id is not None:
+            course_office_hours[row.course_id].append(row)
         else:
-            times = "No Known Times"
-
-        return {'times': times, 'physical_location': physical_location, 'link': link }
-    except Exception as e:
-        return jsonify({"error": str(e)}), 401
+            global_office_hours[row.instructor_id].append(row)
+
+    card_times = {}
+    for course in courses:
+        # use the course office hours if they exist, otherwise the global office hours of the instructor
+        office_hours = course_office_hours[course.id] or global_office_hours[course.instructor_id]
+        card_times[course.id] = (
+            format_times(course_times[course.id], course),
+            # the location comes from the program of the first office hours time
+            format_times(office_hours, office_hours[0] if office_hours else None),
+        )
+    return card_times
 
 # get all of the attributes of a user_id from the User table
 def get_user_data(user_id):
@@ -211,30 +333,21 @@ def send_confirmation_email(appointment):
 # get the course info for all courses a user is registered in
 @user.route('/user/courses', methods=['GET'])
 @jwt_required()
+@conditional(lambda: [CATALOG], per_user=True)
 def get_user_courses():
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if user:
             user_courses_info = CourseDetails.query.join(CourseMembers, CourseDetails.id == CourseMembers.course_id).filter_by(user_id=user_id).all()
 
+            # course times and office hours for every course at once
+            card_times = get_course_card_times(user_courses_info)
+
             courses_list = []
             for course in user_courses_info:
-                # get the course times
-                courseTimes = findStandardTimes(course.id, "Course Details")
-
-                # get the office hours attached to the instructor
-                globalOfficeHours = findInstructorOfficeHours("Office Hours", course.instructor_id)
-
-                # get the office hours attached to the course
-                courseOfficeHours = findStandardTimes(course.id, "Office Hours")
-
-                # set the office hours to the course office hours if they exist, otherwise set them to the global office hours
-                if courseOfficeHours['times'] != "No Known Times":
-                    officeHours = courseOfficeHours
-                else:
-                    officeHours = globalOfficeHours
+                courseTimes, officeHours = card_times[course.id]
 
                 # convert attributes to a object
                 course_info = {
@@ -258,8 +371,24 @@ def get_user_courses():
     except Exception as e:
         return jsonify({"error": str(e)}), 500  
     
+# typeahead search for users whose name or email starts with q, for instructors and admins
+@user.route('/users/search', methods=['GET'])
+@jwt_required()
+def search_users():
+    if get_account_type(get_jwt_identity()) not in ('instructor', 'admin'):
+        return jsonify({"error": "instructor or admin access required"}), 401
+
+    try:
+        limit = min(int(request.args.get('limit', 10)), 50)
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+
+    users = user_search_index.search(request.args.get('q', ''), limit, request.args.get('account_type'))
+    return jsonify({"users": users}), 200
+
 # get the profile details for a user
 @user.route('/user/profile/<user_id>', methods=['GET'])
+@conditional(lambda user_id: [('user', user_id)])
 def get_user_profile(user_id):
     user = User.query.get(user_id)
     
@@ -301,6 +430,7 @@ def update_user_profile():
        
 
         db.session.commit()
+        bump_versions(('user', user.id), USERS)
 
         # return updated user data
         return jsonify(get_user_data(user_id)), 200
@@ -0,0 +1,162 @@
+"""
+ * virtual_slots.py
+ * Last Edited: 10/18/26
+ *
+ * Contains functions used to compute open appointment slots on the fly
+ * from Availability and ProgramDetails.duration instead of storing a
+ * "posted" Appointment for every slot (LAZY_APPOINTMENT_SLOTS mode)
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+from flask import current_app
+from datetime import datetime, timedelta
+from .models import Appointment, Availability, ProgramDetails, parse_schedule_strings
+from . import db
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# check if open slots are computed on the fly instead of stored as posted appointments
+def lazy_slots_enabled():
+    return current_app.config.get('LAZY_APPOINTMENT_SLOTS', False)
+
+# split an availability window into (start_time, end_time) slots of the program duration
+def get_slot_times(start_time, end_time, duration):
+    start_datetime = datetime.strptime(start_time, "%H:%M")
+    end_datetime = datetime.strptime(end_time, "%H:%M")
+
+    slot_times = []
+    while start_datetime < end_datetime:
+        slot_end_datetime = start_datetime + timedelta(minutes=duration) if duration else end_datetime
+        slot_times.append((start_datetime.strftime("%H:%M"), slot_end_datetime.strftime("%H:%M")))
+        start_datetime = slot_end_datetime  # Move to next time slot
+
+    return slot_times
+
+# build the id of a slot that has no Appointment tuple yet, e.g. slot-12-1030
+def make_slot_id(availability_id, start_time):
+    return f"slot-{availability_id}-{start_time.replace(':', '')}"
+
+# return the (availability_id, start_time) of a slot id, or None for a regular appointment id
+def parse_slot_id(appointment_id):
+    parts = str(appointment_id).split('-')
+
+    if len(parts) != 3 or parts[0] != 'slot' or not parts[1].isdigit() or len(parts[2]) != 4 or not parts[2].isdigit():
+        return None
+    return int(parts[1]), f"{parts[2][:2]}:{parts[2][2:]}"
+
+# get the open slots of a program after the given date in the available appointments format
+def get_open_slots(program, course_id, after_date):
+    availabilities = Availability.query.join(ProgramDetails).filter(
+        ProgramDetails.id == program.id,
+        ProgramDetails.course_id == course_id,
+        Availability.status == 'active',
+        Availability.availability_day > after_date
+    ).order_by(Availability.availability_day, Availability.start_clock).all()
+
+    # appointments that already exist for the availabilities, keyed by slot
+    appointments = Appointment.query.filter(
+        Appointment.availability_id.in_([availability.id for availability in availabilities])
+    ).all() if availabilities else []
+    existing_appointments = {(appt.availability_id, appt.start_time): appt for appt in appointments}
+
+    open_slots = []
+    for availability in availabilities:
+        for start_time, end_time in get_slot_times(availability.start_time, availability.end_time, program.duration):
+            appt = existing_appointments.get((availability.id, start_time))
+
+            # slot is taken by a reserved, pending, or closed appointment
+            if appt is not None and appt.status != 'posted':
+                continue
+
+            # convert attributes to a object
+            open_slots.append({
+                "appointment_id": appt.id if appt else make_slot_id(availability.id, start_time),
+                "availability_id": availability.id,
+                "physical_location": appt.physical_location if appt else program.physical_location,
+                "date": availability.date,
+                "program_id": program.id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "status": 'posted',
+                "meeting_url": appt.meeting_url if appt else program.meeting_url
+            })
+
+    return open_slots
+
+# minutes since midnight of a HH:MM time, e.g. '10:30' -> 630
+def get_minutes(clock):
+    hours, minutes = clock.split(':')
+    return int(hours) * 60 + int(minutes)
+
+# encode slots in the available appointments format as one group per availability, with the fields
+# every slot of the availability shares stated once and the times as minutes since midnight, e.g.
+# {'program_id': 3, 'availabilities': [{'availability_id': 12, 'date': '2026-10-20', 'physical_location': 'UW1-121',
+#   'meeting_url': ..., 'status': 'posted', 'appointment_ids': [41, 'slot-12-1015'], 'start_times': [600, 615], 'end_times': [615, 630]}]}
+def compact_slots(program_id, slots):
+    availabilities = {}
+    for slot in sorted(slots, key=lambda slot: (slot['date'], slot['start_time'])):
+        key = slot['availability_id']
+        if key not in availabilities:
+            availabilities[key] = {
+                'availability_id': slot['availability_id'],
+                'date': slot['date'],
+                'physical_location': slot['physical_location'],
+                'meeting_url': slot['meeting_url'],
+                'status': slot['status'],
+                'appointment_ids': [],
+                'start_times': [],
+                'end_times': [],
+            }
+        availability = availabilities[key]
+        availability['appointment_ids'].append(slot['appointment_id'])
+        availability['start_times'].append(get_minutes(slot['start_time']))
+        availability['end_times'].append(get_minutes(slot['end_time']))
+
+    return {'format': 'compact', 'program_id': program_id, 'availabilities': list(availabilities.values())}
+
+# return a posted Appointment for a slot id, creating it in the session if the slot has none yet
+def materialize_slot(appointment_id):
+    slot = parse_slot_id(appointment_id)
+    if slot is None:
+        return None
+
+    availability_id, start_time = slot
+
+    # lock the availability so two students can't create the same slot at once
+    availability = Availability.query.filter_by(id=availability_id).with_for_update().first()
+    if not availability or availability.status != 'active':
+        return None
+
+    program = availability.program_details
+    slot_times = dict(get_slot_times(availability.start_time, availability.end_time, program.duration))
+    if start_time not in slot_times:
+        return None
+
+    existing_appointment = Appointment.query.filter_by(availability_id=availability_id, start_time=start_time).first()
+    if existing_appointment:
+        return existing_appointment
+
+    appointment_day, start_clock, end_clock, start_at = parse_schedule_strings(availability.date, start_time, slot_times[start_time])
+    new_appointment = Appointment(
+        host_id=availability.user_id,
+        appointment_date=availability.date,
+        start_time=start_time,
+        end_time=slot_times[start_time],
+        appointment_day=appointment_day,
+        start_clock=start_clock,
+        end_clock=end_clock,
+        start_at=start_at,
+        status='posted',
+        physical_location=program.physical_location,
+        meeting_url=program.meeting_url,
+        availability=availability,
+        event_id=None
+    )
+    db.session.add(new_appointment)
+
+    return new_appointment
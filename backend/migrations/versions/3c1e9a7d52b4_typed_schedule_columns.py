@@ -0,0 +1,119 @@
+"""typed schedule columns for appointment and availability
+
+Revision ID: 3c1e9a7d52b4
+Revises: 
+Create Date: 2026-10-18 09:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1e9a7d52b4'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TYPED_COLUMNS = {
+    'availability': ('date', 'availability_day'),
+    'appointment': ('appointment_date', 'appointment_day'),
+}
+
+BACKFILL_BATCH_SIZE = 1000
+
+# schedule strings are stored in Pacific time, PST or PDT depending on the date
+SCHEDULE_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+
+# frozen copy of api.models.parse_schedule_strings as of this revision, so later changes to the app
+# don't change what the backfill writes
+def parse_schedule_strings(date_str, start_str, end_str):
+    def parse_clock(value):
+        for time_format in ("%H:%M", "%H:%M:%S"):
+            try:
+                return datetime.strptime(value, time_format).time()
+            except (TypeError, ValueError):
+                continue
+        return None
+
+    try:
+        day = datetime.strptime(str(date_str), "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        day = None
+
+    start_clock = parse_clock(start_str)
+    end_clock = parse_clock(end_str)
+    start_at = None
+    if day and start_clock:
+        start_at = datetime.combine(day, start_clock, SCHEDULE_TIMEZONE).astimezone(timezone.utc).replace(tzinfo=None)
+
+    return day, start_clock, end_clock, start_at
+
+
+# add a column unless db.create_all() already created it
+def add_column_if_missing(table_name, column):
+    existing_columns = [c['name'] for c in sa.inspect(op.get_bind()).get_columns(table_name)]
+    if column.name not in existing_columns:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(column)
+
+
+# copy the string date and times of every row into the typed columns
+def backfill_table(table_name, date_column, day_column):
+    connection = op.get_bind()
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column(date_column, sa.String),
+        sa.column('start_time', sa.String),
+        sa.column('end_time', sa.String),
+        sa.column(day_column, sa.Date),
+        sa.column('start_clock', sa.Time),
+        sa.column('end_clock', sa.Time),
+        sa.column('start_at', sa.DateTime),
+    )
+
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, table.c[date_column], table.c.start_time, table.c.end_time)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+
+        if not rows:
+            break
+
+        for row in rows:
+            day, start_clock, end_clock, start_at = parse_schedule_strings(row[1], row[2], row[3])
+            connection.execute(
+                table.update().where(table.c.id == row[0]).values({
+                    day_column: day,
+                    'start_clock': start_clock,
+                    'end_clock': end_clock,
+                    'start_at': start_at,
+                })
+            )
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    for table_name, (date_column, day_column) in TYPED_COLUMNS.items():
+        add_column_if_missing(table_name, sa.Column(day_column, sa.Date(), nullable=True))
+        add_column_if_missing(table_name, sa.Column('start_clock', sa.Time(), nullable=True))
+        add_column_if_missing(table_name, sa.Column('end_clock', sa.Time(), nullable=True))
+        add_column_if_missing(table_name, sa.Column('start_at', sa.DateTime(), nullable=True))
+        backfill_table(table_name, date_column, day_column)
+
+
+def downgrade():
+    for table_name, (date_column, day_column) in TYPED_COLUMNS.items():
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('start_at')
+            batch_op.drop_column('end_clock')
+            batch_op.drop_column('start_clock')
+            batch_op.drop_column(day_column)
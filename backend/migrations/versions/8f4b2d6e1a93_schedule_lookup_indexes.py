@@ -0,0 +1,38 @@
+"""composite indexes for booking, listing and limit queries
+
+Revision ID: 8f4b2d6e1a93
+Revises: 3c1e9a7d52b4
+Create Date: 2026-10-18 11:03:27.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f4b2d6e1a93'
+down_revision = '3c1e9a7d52b4'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_appointment_host_day_status', 'appointment', ['host_id', 'appointment_day', 'status']),
+    ('ix_appointment_attendee_start', 'appointment', ['attendee_id', 'start_at']),
+    ('ix_availability_user_program_day', 'availability', ['user_id', 'program_id', 'availability_day']),
+    ('ix_course_members_user_course', 'course_members', ['user_id', 'course_id']),
+    ('ix_program_details_course_instructor', 'program_details', ['course_id', 'instructor_id']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for index_name, table_name, columns in INDEXES:
+        # db.create_all() already builds the indexes on fresh databases
+        existing_indexes = [index['name'] for index in inspector.get_indexes(table_name)]
+        if index_name not in existing_indexes:
+            op.create_index(index_name, table_name, columns)
+
+
+def downgrade():
+    for index_name, table_name, columns in reversed(INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,32 @@
+"""share the ETag version counters between workers
+
+Revision ID: 9a4f1c6e2d83
+Revises: f2c8a61d9b47
+Create Date: 2026-10-18 19:04:12.530871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4f1c6e2d83'
+down_revision = 'f2c8a61d9b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already builds the table on fresh databases
+    if not sa.inspect(op.get_bind()).has_table('entity_version'):
+        op.create_table(
+            'entity_version',
+            sa.Column('kind', sa.String(length=20), nullable=False),
+            sa.Column('key', sa.String(length=20), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('kind', 'key'),
+        )
+
+
+def downgrade():
+    op.drop_table('entity_version')
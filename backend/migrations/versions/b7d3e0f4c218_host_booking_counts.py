@@ -0,0 +1,91 @@
+"""per-host booking counters for meeting limits
+
+Revision ID: b7d3e0f4c218
+Revises: 8f4b2d6e1a93
+Create Date: 2026-10-18 13:47:05.271634
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e0f4c218'
+down_revision = '8f4b2d6e1a93'
+branch_labels = None
+depends_on = None
+
+# appointment statuses that count towards a host's meeting limits
+BOOKED_STATUSES = ('reserved', 'pending')
+
+
+# first day of the daily, weekly (starting Monday), and monthly periods a day falls into
+def get_period_starts(day):
+    return [
+        ('daily', day),
+        ('weekly', day - timedelta(days=day.weekday())),
+        ('monthly', day.replace(day=1)),
+    ]
+
+
+# fill the counters from the appointments, a frozen copy of api.booking_limits.rebuild_booking_counts as of this
+# revision so later changes to the app don't change what the migration writes
+def rebuild_booking_counts(connection):
+    appointment = sa.table(
+        'appointment',
+        sa.column('host_id', sa.Integer),
+        sa.column('appointment_date', sa.String),
+        sa.column('status', sa.String),
+    )
+    counter = sa.table(
+        'host_booking_count',
+        sa.column('host_id', sa.Integer),
+        sa.column('period_type', sa.String),
+        sa.column('period_start', sa.Date),
+        sa.column('booked_count', sa.Integer),
+    )
+
+    rows = connection.execute(
+        sa.select(appointment.c.host_id, appointment.c.appointment_date, sa.func.count())
+        .where(appointment.c.status.in_(BOOKED_STATUSES))
+        .group_by(appointment.c.host_id, appointment.c.appointment_date)
+    ).all()
+
+    counts = defaultdict(int)
+    for host_id, appointment_date, count in rows:
+        try:
+            day = datetime.strptime(str(appointment_date), "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            continue
+        if host_id is None:
+            continue
+        for period_type, period_start in get_period_starts(day):
+            counts[(host_id, period_type, period_start)] += count
+
+    connection.execute(counter.delete())
+    if counts:
+        connection.execute(counter.insert(), [
+            {'host_id': host_id, 'period_type': period_type, 'period_start': period_start, 'booked_count': count}
+            for (host_id, period_type, period_start), count in counts.items()
+        ])
+
+
+def upgrade():
+    # db.create_all() already builds the table on fresh databases
+    if not sa.inspect(op.get_bind()).has_table('host_booking_count'):
+        op.create_table(
+            'host_booking_count',
+            sa.Column('host_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+            sa.Column('period_type', sa.String(length=10), nullable=False),
+            sa.Column('period_start', sa.Date(), nullable=False),
+            sa.Column('booked_count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('host_id', 'period_type', 'period_start'),
+        )
+
+    rebuild_booking_counts(op.get_bind())
+
+
+def downgrade():
+    op.drop_table('host_booking_count')
@@ -0,0 +1,81 @@
+"""history tables for archived appointments, comments and feedback
+
+Revision ID: d41a7c93e5f0
+Revises: b7d3e0f4c218
+Create Date: 2026-10-18 15:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7c93e5f0'
+down_revision = 'b7d3e0f4c218'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    # db.create_all() already builds the tables on fresh databases
+    if not inspector.has_table('appointment_history'):
+        op.create_table(
+            'appointment_history',
+            sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('host_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=True),
+            sa.Column('course_id', sa.Integer(), sa.ForeignKey('course_details.id'), nullable=True),
+            sa.Column('attendee_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=True),
+            sa.Column('availability_id', sa.Integer(), nullable=True),
+            sa.Column('program_id', sa.Integer(), nullable=True),
+            sa.Column('appointment_date', sa.String(length=150), nullable=True),
+            sa.Column('start_time', sa.String(length=150), nullable=True),
+            sa.Column('end_time', sa.String(length=150), nullable=True),
+            sa.Column('appointment_day', sa.Date(), nullable=True),
+            sa.Column('start_clock', sa.Time(), nullable=True),
+            sa.Column('end_clock', sa.Time(), nullable=True),
+            sa.Column('start_at', sa.DateTime(), nullable=True),
+            sa.Column('event_id', sa.String(length=255), nullable=True),
+            sa.Column('physical_location', sa.String(length=255), nullable=True),
+            sa.Column('meeting_url', sa.String(length=255), nullable=True),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(length=50), nullable=True),
+            sa.Column('archived_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_appointment_history_host_start', 'appointment_history', ['host_id', 'start_at'])
+        op.create_index('ix_appointment_history_attendee_start', 'appointment_history', ['attendee_id', 'start_at'])
+
+    if not inspector.has_table('appointment_comment_history'):
+        op.create_table(
+            'appointment_comment_history',
+            sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('appointment_id', sa.Integer(), sa.ForeignKey('appointment_history.id'), nullable=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=True),
+            sa.Column('appointment_comment', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_appointment_comment_history_appointment_id', 'appointment_comment_history', ['appointment_id'])
+
+    if not inspector.has_table('feedback_history'):
+        op.create_table(
+            'feedback_history',
+            sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('appointment_id', sa.Integer(), sa.ForeignKey('appointment_history.id'), nullable=True),
+            sa.Column('attendee_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=True),
+            sa.Column('host_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=True),
+            sa.Column('attendee_rating', sa.String(length=255), nullable=True),
+            sa.Column('attendee_notes', sa.Text(), nullable=True),
+            sa.Column('host_rating', sa.String(length=255), nullable=True),
+            sa.Column('host_notes', sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_feedback_history_appointment_id', 'feedback_history', ['appointment_id'])
+
+
+def downgrade():
+    op.drop_table('feedback_history')
+    op.drop_table('appointment_comment_history')
+    op.drop_table('appointment_history')
@@ -0,0 +1,27 @@
+"""index availability by program and day for drop-in listings
+
+Revision ID: e5b90f27c3d1
+Revises: d41a7c93e5f0
+Create Date: 2026-10-18 16:40:12.503317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b90f27c3d1'
+down_revision = 'd41a7c93e5f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already builds the index on fresh databases
+    existing_indexes = [index['name'] for index in sa.inspect(op.get_bind()).get_indexes('availability')]
+    if 'ix_availability_program_day' not in existing_indexes:
+        op.create_index('ix_availability_program_day', 'availability', ['program_id', 'availability_day'])
+
+
+def downgrade():
+    op.drop_index('ix_availability_program_day', table_name='availability')
@@ -0,0 +1,31 @@
+"""record account type and status changes so older tokens stop being trusted
+
+Revision ID: f2c8a61d9b47
+Revises: e5b90f27c3d1
+Create Date: 2026-10-18 17:52:36.184209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a61d9b47'
+down_revision = 'e5b90f27c3d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already builds the table on fresh databases
+    if not sa.inspect(op.get_bind()).has_table('user_claims_change'):
+        op.create_table(
+            'user_claims_change',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+            sa.Column('changed_at', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('user_id'),
+        )
+
+
+def downgrade():
+    op.drop_table('user_claims_change')
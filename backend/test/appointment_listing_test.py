@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Appointment, Availability, User
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class AppointmentListingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.instructor_client = login_client(self.app, self.instructor)
+        self.student_client = login_client(self.app, self.student)
+        self.user_count = 0
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    # add a user with a unique name and email
+    def add_user(self, account_type):
+        self.user_count += 1
+        user = User(name=f'User {self.user_count}', email=f'user{self.user_count}@test.com',
+                    account_type=account_type, status='active')
+        db.session.add(user)
+        db.session.flush()
+        return user
+
+    # add reserved appointments, half of them in the past, each with a new student or, for the student listing, a new host
+    def seed_appointments(self, count, for_student=False):
+        for i in range(count):
+            host = self.add_user('instructor') if for_student else self.instructor
+            attendee = self.student if for_student else self.add_user('student')
+            days = i + 1 if i % 2 else -(i + 1)
+            date = (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+            availability = Availability(user_id=host.id, program_id=self.program.id, date=date,
+                                        start_time='10:00', end_time='10:15', status='active')
+            db.session.add_all([availability, Appointment(
+                host_id=host.id, attendee_id=attendee.id, course_id=self.course.id, availability=availability,
+                appointment_date=date, start_time='10:00', end_time='10:15', status='reserved'
+            )])
+        db.session.commit()
+
+    def list_and_count(self, client, url):
+        db.session.expire_all()
+        with count_queries() as statements:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json(), len(statements)
+
+    def test_instructor_listing_content(self):
+        self.seed_appointments(1)
+        data, _ = self.list_and_count(self.instructor_client, '/instructor/appointments?type=all')
+
+        appointment = data['instructor_appointments'][0]
+        self.assertEqual(appointment['program_id'], self.program.id)
+        self.assertEqual(appointment['name'], self.program.name)
+        self.assertEqual(appointment['course_name'], self.course.name)
+        self.assertEqual(appointment['attendee'], {'name': 'User 1', 'pronouns': None, 'email': 'user1@test.com'})
+
+    def test_instructor_listing_query_count_is_constant(self):
+        for meeting_type in ('all', 'upcoming', 'past'):
+            self.seed_appointments(2)
+            small_data, small_count = self.list_and_count(self.instructor_client, f'/instructor/appointments?type={meeting_type}')
+            self.seed_appointments(30)
+            large_data, large_count = self.list_and_count(self.instructor_client, f'/instructor/appointments?type={meeting_type}')
+
+            self.assertGreater(len(large_data['instructor_appointments']), len(small_data['instructor_appointments']))
+            self.assertEqual(small_count, large_count, meeting_type)
+
+    def test_student_listing_content(self):
+        self.seed_appointments(1, for_student=True)
+        data, _ = self.list_and_count(self.student_client, '/student/appointments?type=all')
+
+        appointment = data['student_appointments'][0]
+        self.assertEqual(appointment['program_id'], self.program.id)
+        self.assertEqual(appointment['name'], self.program.name)
+        self.assertEqual(appointment['course_name'], self.course.name)
+        self.assertEqual(appointment['host'], {'name': 'User 1', 'title': None, 'pronouns': None, 'email': 'user1@test.com'})
+
+    def test_student_listing_query_count_is_constant(self):
+        for meeting_type in ('all', 'upcoming', 'past', 'pending'):
+            self.seed_appointments(2, for_student=True)
+            small_data, small_count = self.list_and_count(self.student_client, f'/student/appointments?type={meeting_type}')
+            self.seed_appointments(30, for_student=True)
+            large_data, large_count = self.list_and_count(self.student_client, f'/student/appointments?type={meeting_type}')
+
+            if meeting_type != 'pending':
+                self.assertGreater(len(large_data['student_appointments']), len(small_data['student_appointments']))
+            self.assertEqual(small_count, large_count, meeting_type)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
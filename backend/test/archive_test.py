@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Appointment, AppointmentHistory, AppointmentComment, AppointmentCommentHistory, \
+    Availability, Feedback, FeedbackHistory
+from api.archive import archive_appointments, delete_expired_slots, get_archive_cutoff
+from test.db_helpers import create_test_app, seed_course, login_client
+
+
+class ArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.student_client = login_client(self.app, self.student)
+        self.instructor_client = login_client(self.app, self.instructor)
+
+        # one appointment past the archive horizon and one from last week
+        self.old_date = (datetime.now() - timedelta(days=200)).strftime('%Y-%m-%d')
+        self.recent_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+        self.old_appointment = self.add_appointment(self.old_date)
+        self.recent_appointment = self.add_appointment(self.recent_date)
+
+        db.session.add(AppointmentComment(appointment_id=self.old_appointment.id, user_id=self.student.id, appointment_comment='see you'))
+        db.session.add(Feedback(appointment_id=self.old_appointment.id, attendee_id=self.student.id, attendee_rating='5'))
+        db.session.commit()
+        self.old_id, self.recent_id = self.old_appointment.id, self.recent_appointment.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add_appointment(self, date, status='completed'):
+        availability = Availability(user_id=self.instructor.id, program_id=self.program.id, date=date,
+                                    start_time='10:00', end_time='10:15', status='active')
+        appointment = Appointment(host_id=self.instructor.id, attendee_id=self.student.id, course_id=self.course.id,
+                                  appointment_date=date, start_time='10:00', end_time='10:15', status=status,
+                                  availability=availability)
+        db.session.add_all([availability, appointment])
+        db.session.commit()
+        return appointment
+
+    def test_archive_moves_old_appointments(self):
+        self.assertEqual(archive_appointments(get_archive_cutoff(120), batch_size=1), 1)
+
+        self.assertEqual([appt.id for appt in Appointment.query.all()], [self.recent_id])
+        history = AppointmentHistory.query.one()
+        self.assertEqual((history.id, history.program_id, history.status), (self.old_id, self.program.id, 'completed'))
+        self.assertEqual(AppointmentComment.query.count(), 0)
+        self.assertEqual(Feedback.query.count(), 0)
+        self.assertEqual(AppointmentCommentHistory.query.one().appointment_id, self.old_id)
+        self.assertEqual(FeedbackHistory.query.one().attendee_rating, '5')
+
+        # running the job again has nothing left to move
+        self.assertEqual(archive_appointments(get_archive_cutoff(120)), 0)
+
+    def test_only_finished_appointments_are_archived(self):
+        unbooked_ids = [self.add_appointment(self.old_date, status).id for status in ('posted', 'inactive', 'pending')]
+        finished_ids = [self.add_appointment(self.old_date, status).id for status in ('reserved', 'canceled')]
+        db.session.add(AppointmentComment(appointment_id=unbooked_ids[2], user_id=self.student.id, appointment_comment='?'))
+        db.session.commit()
+
+        cutoff = get_archive_cutoff(120)
+        self.assertEqual(archive_appointments(cutoff), 3)
+        self.assertEqual(sorted(history.id for history in AppointmentHistory.query.all()), sorted([self.old_id] + finished_ids))
+        self.assertEqual(Appointment.query.filter(Appointment.id.in_(unbooked_ids)).count(), 3)
+
+        # the slots nobody booked are deleted, not archived, and never show up in the past tab
+        self.assertEqual(delete_expired_slots(cutoff), 3)
+        self.assertEqual([appt.id for appt in Appointment.query.all()], [self.recent_id])
+        self.assertEqual(AppointmentHistory.query.count(), 3)
+        self.assertEqual(AppointmentComment.query.count(), 0)
+
+        response = self.student_client.get('/student/appointments?type=past')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['student_appointments']), 4)
+
+    def test_past_tab_reads_history(self):
+        archive_appointments(get_archive_cutoff(120))
+
+        response = self.student_client.get('/student/appointments?type=past')
+        self.assertEqual(response.status_code, 200)
+        appointments = response.get_json()['student_appointments']
+        self.assertEqual([appt['appointment_id'] for appt in appointments], [self.recent_id, self.old_id])
+        self.assertEqual(appointments[1]['program_id'], self.program.id)
+
+        response = self.instructor_client.get('/instructor/appointments?type=past')
+        self.assertEqual(len(response.get_json()['instructor_appointments']), 2)
+
+    def test_past_tab_pagination(self):
+        archive_appointments(get_archive_cutoff(120))
+
+        first_page = self.student_client.get('/student/appointments?type=past&page=1&per_page=1').get_json()
+        self.assertEqual([appt['appointment_id'] for appt in first_page['student_appointments']], [self.recent_id])
+        self.assertEqual(first_page['next_page'], 2)
+
+        second_page = self.student_client.get('/student/appointments?type=past&page=2&per_page=1').get_json()
+        self.assertEqual([appt['appointment_id'] for appt in second_page['student_appointments']], [self.old_id])
+        self.assertNotIn('next_page', second_page)
+
+    def test_past_tab_is_paged_by_default(self):
+        archive_appointments(get_archive_cutoff(120))
+
+        with patch('api.student.PAST_PAGE_SIZE', 1):
+            data = self.student_client.get('/student/appointments?type=past').get_json()
+        self.assertEqual([appt['appointment_id'] for appt in data['student_appointments']], [self.recent_id])
+        self.assertEqual(data['next_page'], 2)
+
+    def test_archived_comments_and_feedback(self):
+        archive_appointments(get_archive_cutoff(120))
+
+        response = self.student_client.get(f'/student/appointments/{self.old_id}/comment')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([comment['appointment_comment'] for comment in response.get_json()['comments']], ['see you'])
+
+        response = self.student_client.get(f'/feedback/{self.old_id}')
+        self.assertEqual(response.get_json()['attendee_rating'], '5')
+
+        response = self.student_client.get('/student/appointments/999/comment')
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from flask_jwt_extended import create_access_token, decode_token, get_jwt_identity, verify_jwt_in_request
+from werkzeug.security import generate_password_hash
+from api import db
+from api.models import User
+from api.admin import is_admin
+from api.invalidation import InvalidationBus, MemoryTransport, invalidation_bus
+from api.user import is_instructor, is_student, get_current_user, record_claims_change, claims_changed_at, load_claims_changes
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class AuthClaimsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.admin = User.query.filter_by(account_type='admin').first()
+        self.admin_client = login_client(self.app, self.admin)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+        claims_changed_at.clear()
+
+    # a request context authenticated with the given token
+    def token_request(self, token):
+        return self.app.test_request_context(headers={'Cookie': f'access_token_cookie={token}'})
+
+    def get_cookie_claims(self, response):
+        for header in response.headers.getlist('Set-Cookie'):
+            if header.startswith('access_token_cookie='):
+                return decode_token(header.split(';')[0].split('=', 1)[1])
+        return None
+
+    def test_login_token_has_role_claims(self):
+        self.student.password = generate_password_hash('password123', method='scrypt', salt_length=2)
+        db.session.commit()
+
+        response = self.app.test_client().post('/login', json={'email': self.student.email, 'password': 'password123'})
+        self.assertEqual(response.status_code, 200)
+
+        claims = self.get_cookie_claims(response)
+        self.assertEqual(claims['sub'], str(self.student.id))
+        self.assertEqual(claims['account_type'], 'student')
+        self.assertEqual(claims['status'], 'active')
+
+    def test_role_checks_use_claims(self):
+        token = create_access_token(identity=str(self.instructor.id))
+        with self.token_request(token):
+            verify_jwt_in_request()
+            with count_queries() as statements:
+                self.assertTrue(is_instructor(get_jwt_identity()))
+                self.assertFalse(is_student(get_jwt_identity()))
+                self.assertFalse(is_admin(get_jwt_identity()))
+            self.assertEqual(statements, [])
+
+            # other users still come from the database
+            self.assertTrue(is_student(self.student.id))
+
+    def test_current_user_is_loaded_once(self):
+        token = create_access_token(identity=str(self.student.id))
+        db.session.expire_all()
+        with self.token_request(token):
+            verify_jwt_in_request()
+            with count_queries() as statements:
+                user = get_current_user()
+                self.assertIs(get_current_user(), user)
+                self.assertEqual(user.id, self.student.id)
+            self.assertEqual(len(statements), 1)
+
+    def test_role_change_refreshes_token(self):
+        student_client = login_client(self.app, self.student)
+        old_token = create_access_token(identity=str(self.student.id))
+
+        response = self.admin_client.post('/admin/change-account-type',
+                                          json={'user_id': self.student.id, 'new_account_type': 'instructor'})
+        self.assertEqual(response.status_code, 200)
+
+        # the old token is no longer trusted for role checks
+        with self.token_request(old_token):
+            verify_jwt_in_request()
+            self.assertTrue(is_instructor(get_jwt_identity()))
+            self.assertFalse(is_student(get_jwt_identity()))
+
+        # and the next response hands out a token with the new role
+        claims = self.get_cookie_claims(student_client.get('/user/courses'))
+        self.assertEqual(claims['account_type'], 'instructor')
+
+    def test_role_change_reaches_other_workers(self):
+        old_token = create_access_token(identity=str(self.student.id))
+
+        # another worker, sharing this worker's transport, handles the role change
+        transport = MemoryTransport()
+        invalidation_bus.connect(transport)
+        self.addCleanup(invalidation_bus.connect, None)
+        other_worker = InvalidationBus()
+        other_worker.connect(transport)
+
+        self.student.account_type = 'instructor'
+        claims_change = record_claims_change(self.student.id)
+        db.session.commit()
+        other_worker.publish('claims', claims_change)
+
+        # this worker stops trusting the old token's student claim
+        with self.token_request(old_token):
+            verify_jwt_in_request()
+            self.assertFalse(is_student(get_jwt_identity()))
+            self.assertTrue(is_instructor(get_jwt_identity()))
+
+    def test_claims_changes_survive_restart(self):
+        response = self.admin_client.post('/admin/change-account-status',
+                                          json={'user_id': self.student.id, 'new_account_status': 'inactive'})
+        self.assertEqual(response.status_code, 200)
+        changed_at = claims_changed_at[self.student.id]
+
+        claims_changed_at.clear()
+        load_claims_changes(self.app.config['JWT_ACCESS_TOKEN_EXPIRES'])
+        self.assertEqual(claims_changed_at, {self.student.id: changed_at})
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,123 @@
+"""
+ * availability_benchmark.py
+ *
+ * Compares a per-entry availability path, the validate, check, insert, and commit
+ * per availability and slot that the endpoint used before, with the batched path
+ * (add_instructor_availabilities) for a 10-week schedule.
+ *
+ * Also times AvailabilityIntervalIndex with quarter- and full-day schedules and
+ * checks that the cost per window doesn't grow with the windows per day.
+ *
+ * Run from the test folder:
+ *     python availability_benchmark.py [weeks]
+ *
+"""
+
+import sys
+import os
+import time
+from datetime import datetime, timedelta, time as clock
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Availability, Appointment, CourseDetails, ProgramDetails, User, parse_schedule_strings
+from api.instructor import add_instructor_availabilities, is_valid_date, is_valid_time, is_start_time_before_end_time
+from api.interval_index import AvailabilityIntervalIndex
+from api.virtual_slots import get_slot_times
+from test.db_helpers import create_test_app, seed_course, count_queries
+
+
+# build weekday availabilities from 10:00 to 12:00 for the given number of weeks
+def build_schedule(program_id, weeks):
+    first_day = datetime.now().date() + timedelta(days=7)
+    return [
+        {'id': program_id, 'date': (first_day + timedelta(days=day)).strftime('%Y-%m-%d'), 'start_time': '10:00', 'end_time': '12:00'}
+        for day in range(weeks * 7)
+        if (first_day + timedelta(days=day)).weekday() < 5
+    ]
+
+# add one availability and its slots the way the endpoint did before batching, a few queries and two commits per entry
+def add_availability_per_entry(course_id, instructor_id, entry, physical_location, meeting_url, duration):
+    date, start_time, end_time = entry['date'], entry['start_time'], entry['end_time']
+
+    if not User.query.filter_by(id=instructor_id, account_type='instructor').first():
+        return False
+    if not CourseDetails.query.filter_by(id=course_id, instructor_id=instructor_id).first():
+        return False
+    if not ProgramDetails.query.filter_by(id=entry['id']).first():
+        return False
+    if not is_valid_date(date) or not is_valid_time(start_time) or not is_valid_time(end_time) or \
+            not is_start_time_before_end_time(start_time, end_time):
+        return False
+
+    day, start_clock, end_clock, _ = parse_schedule_strings(date, start_time, end_time)
+    if AvailabilityIntervalIndex.for_instructor(instructor_id, day, day).find_conflict(day, start_clock, end_clock):
+        return False
+
+    availability = Availability(user_id=instructor_id, program_id=entry['id'], date=date,
+                                start_time=start_time, end_time=end_time, status='active')
+    db.session.add(availability)
+    db.session.commit()
+
+    for slot_start_time, slot_end_time in get_slot_times(start_time, end_time, duration):
+        db.session.add(Appointment(host_id=instructor_id, appointment_date=date, start_time=slot_start_time,
+                                   end_time=slot_end_time, status='posted', physical_location=physical_location,
+                                   meeting_url=meeting_url, availability_id=availability.id))
+    db.session.commit()
+    return True
+
+def run(label, add_schedule, entries):
+    with count_queries() as statements:
+        start = time.perf_counter()
+        add_schedule(entries)
+        elapsed = time.perf_counter() - start
+
+    print(f"{label:<10} {len(entries):>6} availabilities {Appointment.query.count():>6} appointments "
+          f"{len(statements):>6} statements {elapsed * 1000:>9.1f} ms")
+
+    Appointment.query.delete()
+    Availability.query.delete()
+    db.session.commit()
+
+# seconds per add() and find_conflict() for 70 days of back-to-back 30 minute windows, windows_per_day of them a day,
+# added latest first so every add() lands in front of the day's other windows
+def time_interval_index(windows_per_day, repeat=20):
+    first_day = datetime.now().date()
+    windows = [(first_day + timedelta(days=day), clock(minutes // 60, minutes % 60), clock((minutes + 29) // 60, (minutes + 29) % 60))
+               for day in range(70) for minutes in range(30 * (windows_per_day - 1), -1, -30)]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        interval_index = AvailabilityIntervalIndex()
+        for day, start_clock, end_clock in windows:
+            interval_index.add(day, start_clock, end_clock, {})
+            interval_index.find_conflict(day, start_clock, end_clock)
+    return (time.perf_counter() - start) / (repeat * len(windows))
+
+def benchmark_interval_index():
+    quarter_day, full_day = time_interval_index(12), time_interval_index(48)
+    print(f"interval index {quarter_day * 1e6:>6.2f} us per window at 12 a day, {full_day * 1e6:>6.2f} us at 48 a day")
+    assert full_day < quarter_day * 2, "interval index cost grows with the windows per day"
+
+def main():
+    weeks = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    app = create_test_app()
+    with app.app_context():
+        instructor, student, course, program = seed_course()
+        entries = build_schedule(program.id, weeks)
+
+        def per_entry(entries):
+            for entry in entries:
+                add_availability_per_entry(course.id, instructor.id, entry, 'UW1-121', None, 15)
+
+        def batched(entries):
+            add_instructor_availabilities(course.id, instructor.id, entries, 'UW1-121', None, 15, False)
+
+        run('per-entry', per_entry, entries)
+        run('batched', batched, entries)
+
+    benchmark_interval_index()
+
+
+if __name__ == '__main__':
+    main()
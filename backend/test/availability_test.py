@@ -0,0 +1,190 @@
+import unittest
+import sys
+import os
+import random
+from datetime import datetime, timedelta, time
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Availability, Appointment, ProgramDetails, parse_schedule_strings
+from api.interval_index import AvailabilityIntervalIndex
+from test.db_helpers import create_test_app, seed_course, login_client
+
+
+class AvailabilityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.instructor_client = login_client(self.app, self.instructor)
+        self.date = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def post_availabilities(self, entries):
+        return self.instructor_client.post(f'/instructor/availability/{self.course.id}', json={
+            'availabilities': [{'id': self.program.id, **entry} for entry in entries],
+            'duration': 15,
+            'physical_location': 'UW1-121',
+            'meeting_url': 'https://zoom.us/j/1',
+            'isDropins': False,
+            'program_id': self.program.id,
+        })
+
+    def test_start_at_is_utc_in_standard_and_daylight_time(self):
+        self.assertEqual(parse_schedule_strings('2026-01-15', '10:00', '11:00')[3], datetime(2026, 1, 15, 18, 0))
+        self.assertEqual(parse_schedule_strings('2026-10-15', '10:00', '11:00')[3], datetime(2026, 10, 15, 17, 0))
+
+        availability = Availability(user_id=self.instructor.id, program_id=self.program.id, date='2026-04-20',
+                                    start_time='09:30', end_time='10:30', status='active')
+        db.session.add(availability)
+        db.session.commit()
+        self.assertEqual(availability.start_at, datetime(2026, 4, 20, 16, 30))
+
+    def test_batch_reports_per_entry_results(self):
+        response = self.post_availabilities([
+            {'date': self.date, 'start_time': '10:00', 'end_time': '11:00'},
+            {'date': self.date, 'start_time': '10:30', 'end_time': '11:30'},
+            {'date': self.date, 'start_time': '13:00', 'end_time': '13:10'},
+            {'date': self.date, 'start_time': '14:00', 'end_time': '15:00'},
+        ])
+        self.assertEqual(response.status_code, 201)
+
+        results = response.get_json()['results']
+        self.assertEqual([result['status'] for result in results], [201, 400, 400, 201])
+        self.assertIn('conflict', results[1]['error'])
+
+        self.assertEqual(Availability.query.count(), 2)
+        self.assertEqual(Appointment.query.count(), 8)
+
+        appointment = Appointment.query.filter_by(start_time='14:45').one()
+        self.assertEqual(appointment.availability.start_time, '14:00')
+        self.assertEqual(appointment.appointment_day.strftime('%Y-%m-%d'), self.date)
+
+    def test_resubmitting_keeps_unchanged_windows_and_bookings(self):
+        self.post_availabilities([
+            {'date': self.date, 'start_time': '10:00', 'end_time': '11:00'},
+            {'date': self.date, 'start_time': '14:00', 'end_time': '15:00'},
+        ])
+        kept = Availability.query.filter_by(start_time='10:00').one()
+        removed = Availability.query.filter_by(start_time='14:00').one()
+        booked = Appointment.query.filter_by(availability_id=kept.id, start_time='10:15').one()
+        booked.status = 'reserved'
+        booked.attendee_id = self.student.id
+        db.session.commit()
+
+        # keep 10:00-11:00, drop 14:00-15:00, and add 16:00-17:00
+        response = self.post_availabilities([
+            {'date': self.date, 'start_time': '10:00', 'end_time': '11:00'},
+            {'date': self.date, 'start_time': '16:00', 'end_time': '17:00'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result['status'] for result in response.get_json()['results']], [200, 201])
+
+        db.session.expire_all()
+        self.assertEqual(Availability.query.get(kept.id).status, 'active')
+        self.assertEqual(Appointment.query.get(booked.id).status, 'reserved')
+        self.assertEqual(Appointment.query.filter_by(availability_id=kept.id).count(), 4)
+
+        self.assertEqual(Availability.query.get(removed.id).status, 'removed')
+        self.assertEqual({appt.status for appt in Appointment.query.filter_by(availability_id=removed.id)}, {'inactive'})
+        self.assertEqual(Availability.query.filter_by(start_time='16:00', status='active').count(), 1)
+
+    def test_replacing_a_window_with_an_overlapping_one(self):
+        self.post_availabilities([{'date': self.date, 'start_time': '10:00', 'end_time': '11:00'}])
+
+        response = self.post_availabilities([{'date': self.date, 'start_time': '10:00', 'end_time': '12:00'}])
+        self.assertEqual([result['status'] for result in response.get_json()['results']], [201])
+
+        response = self.instructor_client.get(f'/instructor/availability/{self.course.id}')
+        windows = [(a['start_time'], a['end_time']) for a in response.get_json()['instructor_availability']]
+        self.assertEqual(windows, [('10:00', '12:00')])
+
+    def test_slots_belong_to_the_new_window(self):
+        for end_time in ('11:00', '12:00', '11:00'):
+            response = self.post_availabilities([{'date': self.date, 'start_time': '10:00', 'end_time': end_time}])
+            self.assertEqual(response.status_code, 201)
+
+        active = Availability.query.filter_by(status='active').one()
+        self.assertEqual(active.end_time, '11:00')
+        posted = Appointment.query.filter_by(status='posted').all()
+        self.assertEqual(len(posted), 4)
+        self.assertEqual({appointment.availability_id for appointment in posted}, {active.id})
+
+    def test_slots_belong_to_the_new_window_without_returning(self):
+        # databases without INSERT ... RETURNING, e.g. MySQL, look the new windows up again
+        dialect = db.session.get_bind().dialect
+        with patch.object(dialect, 'insert_executemany_returning_sort_by_parameter_order', False):
+            self.test_slots_belong_to_the_new_window()
+
+    def test_nothing_added(self):
+        response = self.post_availabilities([
+            {'date': self.date, 'start_time': '13:00', 'end_time': '13:10'},
+            {'date': '2020-01-01', 'start_time': '10:00', 'end_time': '11:00'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['status'] for result in response.get_json()['results']], [400, 400])
+        self.assertEqual(Availability.query.count(), 0)
+
+    def test_conflicts_across_programs(self):
+        self.post_availabilities([{'date': self.date, 'start_time': '10:00', 'end_time': '11:00'}])
+
+        other_program = ProgramDetails(course_id=None, instructor_id=self.instructor.id, name='Tutoring', duration=30, isDropins=False)
+        db.session.add(other_program)
+        db.session.commit()
+
+        response = self.instructor_client.post(f'/instructor/availability/{self.course.id}', json={
+            'availabilities': [
+                {'id': other_program.id, 'date': self.date, 'start_time': '10:30', 'end_time': '11:30'},
+                {'id': other_program.id, 'date': self.date, 'start_time': '11:00', 'end_time': '12:00'},
+            ],
+            'duration': 30,
+            'isDropins': False,
+            'program_id': other_program.id,
+        })
+
+        results = response.get_json()['results']
+        self.assertEqual([result['status'] for result in results], [400, 201])
+        self.assertIn('Office Hours', results[0]['error'])
+        self.assertEqual(results[0]['conflict']['program_id'], self.program.id)
+
+    def test_interval_index(self):
+        day = datetime.now().date()
+        interval_index = AvailabilityIntervalIndex()
+        interval_index.add(day, time(9, 0), time(12, 0), {'name': 'long'})
+        interval_index.add(day, time(10, 0), time(10, 30), {'name': 'short'})
+        interval_index.add(day, time(13, 0), time(14, 0), {'name': 'afternoon'})
+
+        self.assertIsNone(interval_index.find_conflict(day, time(12, 0), time(13, 0)))
+        self.assertIsNone(interval_index.find_conflict(day + timedelta(days=1), time(9, 0), time(10, 0)))
+        self.assertEqual(interval_index.find_conflict(day, time(11, 0), time(11, 30))['name'], 'long')
+        self.assertEqual(interval_index.find_conflict(day, time(13, 30), time(15, 0))['name'], 'afternoon')
+
+    def test_interval_index_matches_brute_force(self):
+        day = datetime.now().date()
+        rng = random.Random(7)
+        windows = []
+        interval_index = AvailabilityIntervalIndex()
+        for i in range(200):
+            start = rng.randrange(0, 23 * 60)
+            end = min(start + rng.randrange(15, 180), 24 * 60 - 1)
+            window = (time(start // 60, start % 60), time(end // 60, end % 60))
+            windows.append(window)
+            interval_index.add(day, *window, {'name': i})
+
+            start = rng.randrange(0, 23 * 60)
+            query = (time(start // 60, start % 60), time(start // 60 + 1, start % 60))
+            conflict = interval_index.find_conflict(day, *query)
+            overlapping = [name for name, (window_start, window_end) in enumerate(windows)
+                           if window_start < query[1] and window_end > query[0]]
+            if overlapping:
+                self.assertIn(conflict['name'], overlapping)
+            else:
+                self.assertIsNone(conflict)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,137 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Availability, Appointment
+from api.models import HostBookingCount
+from api import booking_limits
+from api.booking_limits import get_booking_counts, get_week_range, apply_booking_deltas, apply_booking_delta
+from test.db_helpers import create_test_app, seed_course, login_client
+
+
+class BookingLimitsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course(max_daily_meetings=3)
+        self.day = (datetime.now() + timedelta(days=7)).date()
+        self.appointment_ids = self.post_slots(self.day, 4)
+        self.student_client = login_client(self.app, self.student)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    # create an active availability with posted 15 minute appointments
+    def post_slots(self, day, count):
+        availability = Availability(user_id=self.instructor.id, program_id=self.program.id, date=day.strftime('%Y-%m-%d'),
+                                    start_time='10:00', end_time='11:00', status='active')
+        availability.appointments = [
+            Appointment(host_id=self.instructor.id, appointment_date=day.strftime('%Y-%m-%d'),
+                        start_time=f'10:{15 * i:02d}', end_time=f'10:{15 * i + 15:02d}' if i < 3 else '11:00', status='posted')
+            for i in range(count)
+        ]
+        db.session.add(availability)
+        db.session.commit()
+        return [appointment.id for appointment in availability.appointments]
+
+    @patch('api.student.send_confirmation_email', return_value=True)
+    def reserve(self, appointment_id, mock_send_email):
+        return self.student_client.post(f'/student/appointments/reserve/{appointment_id}/{self.course.id}', json={})
+
+    def test_counters_follow_status_transitions(self):
+        self.reserve(self.appointment_ids[0])
+        self.reserve(self.appointment_ids[1])
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day), {'daily': 2, 'weekly': 2, 'monthly': 2})
+
+        # rejecting a reserved appointment releases its slot in the limits
+        response = self.student_client.post('/appointment/update/status', json={'appointment_id': self.appointment_ids[0], 'status': 'rejected'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day)['daily'], 1)
+
+        response = self.student_client.post(f'/student/appointments/cancel/{self.appointment_ids[1]}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day), {'daily': 0, 'weekly': 0, 'monthly': 0})
+
+    def test_weekly_counter_spans_days(self):
+        start_of_week, _ = get_week_range(self.day)
+        other_day = start_of_week if start_of_week != self.day else start_of_week + timedelta(days=1)
+        other_ids = self.post_slots(other_day, 1)
+
+        self.reserve(self.appointment_ids[0])
+        self.reserve(other_ids[0])
+
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day)['daily'], 1)
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day)['weekly'], 2)
+
+    def test_deleting_booked_appointment_decrements(self):
+        self.reserve(self.appointment_ids[0])
+        availability = Appointment.query.get(self.appointment_ids[0]).availability
+        db.session.delete(availability)
+        db.session.commit()
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day)['daily'], 0)
+
+    def test_daily_limit_uses_counter(self):
+        for appointment_id in self.appointment_ids[:3]:
+            self.assertEqual(self.reserve(appointment_id).status_code, 201)
+
+        # the third booking hit the daily limit, so the remaining slot is closed
+        self.assertEqual(Appointment.query.get(self.appointment_ids[3]).status, 'inactive')
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day)['daily'], 3)
+
+    def test_concurrent_reservation_over_the_limit(self):
+        for appointment_id in self.appointment_ids[:2]:
+            self.assertEqual(self.reserve(appointment_id).status_code, 201)
+
+        # another request books the third slot after this one read the counts, but before it writes
+        stale_counts = get_booking_counts(self.instructor.id, self.day)
+        Appointment.query.get(self.appointment_ids[2]).status = 'reserved'
+        db.session.commit()
+
+        counts = [stale_counts]
+        def read_counts(host_id, day, lock=False):
+            return counts.pop() if counts else booking_limits.get_booking_counts(host_id, day, lock)
+
+        with patch('api.student.get_booking_counts', side_effect=read_counts):
+            response = self.reserve(self.appointment_ids[3])
+        self.assertEqual(response.status_code, 409)
+
+        # the reservation was rolled back and the remaining slot closed
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day)['daily'], 3)
+        appointment = Appointment.query.get(self.appointment_ids[3])
+        self.assertEqual((appointment.status, appointment.attendee_id), ('inactive', None))
+
+    def test_rebuild_command(self):
+        self.reserve(self.appointment_ids[0])
+        HostBookingCount.query.delete()
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['rebuild-booking-counts'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day), {'daily': 1, 'weekly': 1, 'monthly': 1})
+
+    def test_counter_upsert(self):
+        # the counter row may already exist, e.g. inserted by a concurrent first booking of the period
+        apply_booking_deltas(db.session.connection(), {(self.instructor.id, self.day): 1})
+        apply_booking_deltas(db.session.connection(), {(self.instructor.id, self.day): 2})
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day), {'daily': 3, 'weekly': 3, 'monthly': 3})
+
+        # a release on a period without a counter doesn't go below zero
+        other_day = self.day + timedelta(days=40)
+        apply_booking_deltas(db.session.connection(), {(self.instructor.id, other_day): -1})
+        self.assertEqual(get_booking_counts(self.instructor.id, other_day)['daily'], 0)
+
+    def test_counter_fallback_without_upsert(self):
+        table = HostBookingCount.__table__
+        values = dict(host_id=self.instructor.id, period_type='daily', period_start=self.day, booked_count=1)
+        apply_booking_delta(db.session.connection(), table, values, 1)
+        apply_booking_delta(db.session.connection(), table, values, 1)
+        self.assertEqual(get_booking_counts(self.instructor.id, self.day)['daily'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import gzip
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db, compression
+from api.models import Appointment, Availability, Feedback, User
+from test.db_helpers import create_test_app, seed_course, login_client
+
+
+class CompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.admin = User.query.filter_by(account_type='admin').first()
+        self.client = login_client(self.app, self.admin)
+
+        db.session.add_all([
+            User(name=f'Student {i:02d}', email=f'student{i:02d}@uw.edu', account_type='student', status='active')
+            for i in range(50)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def get(self, url, encoding='gzip'):
+        response = self.client.get(url, headers={'Accept-Encoding': encoding})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_large_response_is_compressed(self):
+        plain = self.get('/admin/all-users?limit=50', encoding='identity')
+        self.assertNotIn('Content-Encoding', plain.headers)
+
+        response = self.get('/admin/all-users?limit=50')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertLess(len(response.data), len(plain.data) / 4)
+
+        stats = self.get('/admin/compression', encoding='identity').get_json()
+        self.assertEqual(stats['encodings']['gzip']['responses'], 1)
+        self.assertEqual(stats['encodings']['gzip']['uncompressed_bytes'], len(plain.data))
+        self.assertEqual(stats['encodings']['gzip']['compressed_bytes'], len(response.data))
+
+    def test_small_response_is_not_compressed(self):
+        response = self.get('/admin/users/count')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(compression.compression_stats.stats()['small_responses'], 1)
+
+    def test_excluded_blueprint(self):
+        self.app.config['COMPRESSION_EXCLUDED_BLUEPRINTS'] = ['admin']
+        response = self.get('/admin/all-users?limit=50')
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_streamed_response_is_compressed(self):
+        for day in range(1, 4):
+            date = f'2026-10-{day:02d}'
+            availability = Availability(user_id=self.instructor.id, program_id=self.program.id, date=date,
+                                        start_time='10:00', end_time='10:30', status='active')
+            appointment = Appointment(host_id=self.instructor.id, attendee_id=self.student.id, course_id=self.course.id,
+                                      availability=availability, appointment_date=date, start_time='10:00',
+                                      end_time='10:30', status='completed', notes='')
+            db.session.add_all([availability, appointment])
+            db.session.flush()
+            db.session.add(Feedback(appointment_id=appointment.id, attendee_id=self.student.id, host_id=self.instructor.id,
+                                    attendee_rating='5', attendee_notes='', host_rating='5', host_notes=''))
+        db.session.commit()
+
+        plain = self.get('/feedback/all', encoding='identity')
+        response = self.get('/feedback/all')
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertEqual(len(plain.get_json()['feedback_list']), 3)
+
+    @unittest.skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_brotli_is_preferred(self):
+        response = self.get('/admin/all-users?limit=50', encoding='gzip, br')
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.data), self.get('/admin/all-users?limit=50', 'identity').data)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
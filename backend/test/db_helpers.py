@@ -0,0 +1,79 @@
+import os
+import sys
+from contextlib import contextmanager
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from dotenv import load_dotenv
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from api import create_app, db
+from api.models import User, CourseDetails, CourseMembers, ProgramDetails
+
+# create the app against TEST_DATABASE_URI, or a fresh in-memory sqlite database when it is not set
+def create_test_app():
+    load_dotenv()
+    os.environ['SQLALCHEMY_DATABASE_URI'] = os.environ.get('TEST_DATABASE_URI', 'sqlite://')
+    os.environ.setdefault('JWT_SECRET_KEY', 'test-secret-key-with-at-least-32-bytes')
+    os.environ.setdefault('ADMIN_NAME', 'admin')
+    os.environ.setdefault('ADMIN_EMAIL', 'admin@admin.com')
+    os.environ.setdefault('ADMIN_PASSWORD', 'Black!Hole123')
+    # tests run in a single process, so they don't need the default sqlite invalidation transport
+    os.environ.setdefault('INVALIDATION_TRANSPORT', 'memory')
+
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+    return app
+
+# create an instructor, a student, and a course with one appointment based program
+def seed_course(max_daily_meetings=5, max_weekly_meetings=10, max_monthly_meetings=20, auto_approve_appointments=True):
+    instructor = User(name='Test Instructor', email='instructor@uw.edu', account_type='instructor', status='active')
+    student = User(name='Test Student', email='student@uw.edu', account_type='student', status='active')
+    db.session.add_all([instructor, student])
+    db.session.commit()
+
+    course = CourseDetails(instructor_id=instructor.id, instructor_email=instructor.email, name='CSS 101')
+    db.session.add(course)
+    db.session.commit()
+
+    program = ProgramDetails(
+        course_id=course.id,
+        instructor_id=instructor.id,
+        name='Office Hours',
+        duration=15,
+        physical_location='UW1-121',
+        meeting_url='https://zoom.us/j/1',
+        auto_approve_appointments=auto_approve_appointments,
+        max_daily_meetings=max_daily_meetings,
+        max_weekly_meetings=max_weekly_meetings,
+        max_monthly_meetings=max_monthly_meetings,
+        isDropins=False,
+        isRangeBased=False,
+    )
+    db.session.add_all([
+        program,
+        CourseMembers(course_id=course.id, user_id=instructor.id),
+        CourseMembers(course_id=course.id, user_id=student.id),
+    ])
+    db.session.commit()
+
+    return instructor, student, course, program
+
+# return a test client that is logged in as the given user
+def login_client(app, user):
+    client = app.test_client()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(user.id)))
+    return client
+
+# record every SQL statement sent to the database inside the with block
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
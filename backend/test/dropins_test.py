@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Availability, CourseDetails, ProgramDetails, User
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class DropinsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.client = login_client(self.app, self.student)
+
+        other_instructor = User(name='Other Instructor', email='other@uw.edu', account_type='instructor', status='active')
+        db.session.add(other_instructor)
+        db.session.flush()
+        other_course = CourseDetails(instructor_id=self.instructor.id, instructor_email=self.instructor.email, name='CSS 999')
+        db.session.add(other_course)
+        db.session.flush()
+
+        self.course_dropins = self.add_program('Study Group', self.course.id, self.instructor.id)
+        self.global_dropins = self.add_program('Open Lab', None, self.instructor.id)
+        self.other_course_dropins = self.add_program('Other Course Lab', other_course.id, self.instructor.id)
+        self.other_global_dropins = self.add_program('Other Lab', None, other_instructor.id)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add_program(self, name, course_id, instructor_id):
+        program = ProgramDetails(name=name, course_id=course_id, instructor_id=instructor_id, isDropins=True)
+        db.session.add(program)
+        db.session.flush()
+        return program
+
+    def add_availability(self, program, days_from_now, start_time='10:00', status='active'):
+        date = (datetime.now() + timedelta(days=days_from_now)).strftime('%Y-%m-%d')
+        db.session.add(Availability(user_id=program.instructor_id, program_id=program.id, date=date,
+                                    start_time=start_time, end_time='11:00', status=status))
+        db.session.commit()
+        return date
+
+    def get_dropins(self, query=''):
+        response = self.client.get(f'/course/programs/dropins/{self.course.id}{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_course_and_global_dropins_sorted_by_date(self):
+        third = self.add_availability(self.course_dropins, 5)
+        first = self.add_availability(self.global_dropins, 1, '12:00')
+        second = self.add_availability(self.course_dropins, 1, '13:00')
+        self.add_availability(self.course_dropins, -3)
+        self.add_availability(self.course_dropins, 2, status='removed')
+        self.add_availability(self.other_course_dropins, 1)
+        self.add_availability(self.other_global_dropins, 1)
+        self.add_availability(self.program, 1)  # not a drop-in program
+
+        dropins = self.get_dropins()
+        self.assertEqual([(dropin['name'], dropin['date']) for dropin in dropins],
+                         [('Open Lab', first), ('Study Group', second), ('Study Group', third)])
+
+    def test_date_range(self):
+        past = self.add_availability(self.course_dropins, -3)
+        soon = self.add_availability(self.course_dropins, 1)
+        self.add_availability(self.course_dropins, 10)
+
+        dropins = self.get_dropins(f'?start_date={past}&end_date={soon}')
+        self.assertEqual([dropin['date'] for dropin in dropins], [past, soon])
+
+        response = self.client.get(f'/course/programs/dropins/{self.course.id}?start_date=tomorrow')
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_is_constant(self):
+        self.add_availability(self.course_dropins, 1)
+        with count_queries() as small_statements:
+            self.get_dropins()
+
+        for days in range(2, 20):
+            self.add_availability(self.course_dropins if days % 2 else self.global_dropins, days)
+        with count_queries() as large_statements:
+            self.assertEqual(len(self.get_dropins()), 19)
+
+        self.assertEqual(len(small_statements), len(large_statements))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
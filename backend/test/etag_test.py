@@ -0,0 +1,154 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import User
+from api.etags import entity_versions, load_entity_versions
+from api.invalidation import invalidation_bus
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class ETagTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.instructor_client = login_client(self.app, self.instructor)
+        self.student_client = login_client(self.app, self.student)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    # fetch url, then fetch it again with the returned ETag, returning (first response, revalidation response, statements)
+    def revalidate(self, client, url):
+        first = client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.headers['ETag'].startswith('W/'))
+
+        with count_queries() as statements:
+            second = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        return first, second, statements
+
+    def assert_not_modified(self, client, url):
+        first, second, statements = self.revalidate(client, url)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(second.data, b'')
+        self.assertEqual(statements, [])
+        return first.headers['ETag']
+
+    def assert_modified(self, client, url, etag):
+        response = client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        return response
+
+    def test_not_modified_without_database_reads(self):
+        course_id = self.course.id
+        self.assert_not_modified(self.student_client, f'/course/details/{course_id}')
+        self.assert_not_modified(self.student_client, f'/course/times/{course_id}')
+        self.assert_not_modified(self.student_client, f'/course/programs/{course_id}')
+        self.assert_not_modified(self.student_client, '/user/courses')
+        self.assert_not_modified(self.student_client, f'/user/profile/{self.instructor.id}')
+
+    def test_course_writes_change_etags(self):
+        course_id = self.course.id
+        details_etag = self.assert_not_modified(self.student_client, f'/course/details/{course_id}')
+        courses_etag = self.assert_not_modified(self.student_client, '/user/courses')
+
+        response = self.instructor_client.post('/course/details', json={'id': course_id, 'name': 'CSS 102'})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.assert_modified(self.student_client, f'/course/details/{course_id}', details_etag)
+        self.assertEqual(response.get_json()['name'], 'CSS 102')
+        self.assert_modified(self.student_client, '/user/courses', courses_etag)
+
+        times_etag = self.assert_not_modified(self.student_client, f'/course/times/{course_id}')
+        response = self.instructor_client.post(f'/course/times/{course_id}', json={
+            str(course_id): {'Monday': {'start_time': '10:00', 'end_time': '11:00'}}
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.assert_modified(self.student_client, f'/course/times/{course_id}', times_etag).get_json()), 1)
+
+    def test_program_writes_change_etags(self):
+        url = f'/course/programs/{self.course.id}'
+        first = self.app.test_client().get(url)
+        self.assertEqual(first.headers['Cache-Control'], 'public, no-cache')
+
+        response = self.instructor_client.post('/program/details', json={
+            'course_id': self.course.id,
+            'data': {'id': self.program.id, 'name': 'Lab Hours', 'duration': 15, 'isDropins': False},
+        })
+        self.assertEqual(response.status_code, 200)
+
+        response = self.assert_modified(self.app.test_client(), url, first.headers['ETag'])
+        self.assertEqual([program['name'] for program in response.get_json()['programs']], ['Lab Hours'])
+
+    def test_profile_writes_change_etags(self):
+        url = f'/user/profile/{self.instructor.id}'
+        etag = self.assert_not_modified(self.student_client, url)
+
+        response = self.instructor_client.post('/user/profile', json={'pronouns': 'they/them'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.assert_modified(self.student_client, url, etag).get_json()['pronouns'], 'they/them')
+
+    def test_user_courses_etag_is_per_user(self):
+        student_etag = self.student_client.get('/user/courses').headers['ETag']
+        response = self.instructor_client.get('/user/courses', headers={'If-None-Match': student_etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_entities_have_no_etag(self):
+        response = self.app.test_client().get('/course/programs/999')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response.headers)
+
+        response = self.student_client.get('/user/profile/999')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response.headers)
+
+    def test_etags_match_across_workers(self):
+        # two app instances sharing one database, the second standing in for another worker started later
+        path = os.path.join(tempfile.mkdtemp(), 'etags.db')
+        with patch.dict(os.environ, {'TEST_DATABASE_URI': f'sqlite:///{path}'}):
+            first_app = create_test_app()
+            with first_app.app_context():
+                instructor, student, course, program = seed_course()
+                course_id = course.id
+                instructor_client = login_client(first_app, instructor)
+                first_client = login_client(first_app, student)
+            response = instructor_client.post('/course/details', json={'id': course_id, 'name': 'CSS 102'})
+            self.assertEqual(response.status_code, 200)
+            url = f'/course/details/{course_id}'
+            etag = first_client.get(url).headers['ETag']
+
+            entity_versions.clear()
+            with patch.object(invalidation_bus, 'origin', 'other-worker'):
+                second_app = create_test_app()
+                with second_app.app_context():
+                    second_client = login_client(second_app, db.session.get(User, student.id))
+                    second_instructor_client = login_client(second_app, db.session.get(User, instructor.id))
+
+                # the new worker loads the versions from the database and accepts the first worker's ETag
+                response = second_client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers['ETag'], etag)
+
+                response = second_instructor_client.post('/course/details', json={'id': course_id, 'name': 'CSS 103'})
+                self.assertEqual(response.status_code, 200)
+
+            # a write on the second worker changes the ETag, also after the versions are loaded again
+            with first_app.app_context():
+                load_entity_versions()
+                db.session.remove()
+            response = first_client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['name'], 'CSS 103')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
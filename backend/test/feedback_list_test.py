@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api import feedback as feedback_api
+from api.models import Appointment, Availability, Feedback, ProgramDetails, User
+from api.archive import archive_appointments, get_archive_cutoff
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class FeedbackListTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.admin = User.query.filter_by(account_type='admin').first()
+        self.client = login_client(self.app, self.admin)
+
+        self.other_program = ProgramDetails(name='Tutoring', course_id=self.course.id, instructor_id=self.instructor.id, duration=30)
+        db.session.add(self.other_program)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add_feedback(self, days_ago, program, rating):
+        date = (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+        availability = Availability(user_id=self.instructor.id, program_id=program.id, date=date,
+                                    start_time='10:00', end_time='10:30', status='active')
+        appointment = Appointment(host_id=self.instructor.id, attendee_id=self.student.id, course_id=self.course.id,
+                                  availability=availability, appointment_date=date, start_time='10:00',
+                                  end_time='10:30', status='completed', notes='')
+        db.session.add_all([availability, appointment])
+        db.session.flush()
+        db.session.add(Feedback(appointment_id=appointment.id, attendee_id=self.student.id, host_id=self.instructor.id,
+                                attendee_rating=rating, attendee_notes='', host_rating=rating, host_notes=''))
+        db.session.commit()
+        return date
+
+    def get_feedback(self, query=''):
+        response = self.client.get('/feedback/all' + query)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_no_feedback(self):
+        self.assertEqual(self.client.get('/feedback/all').status_code, 404)
+
+    def test_lists_live_and_archived_feedback(self):
+        self.add_feedback(200, self.program, '1')
+        self.add_feedback(3, self.other_program, '4')
+        archive_appointments(get_archive_cutoff(120))
+
+        data = self.get_feedback()
+        self.assertEqual([feedback['attendee_rating'] for feedback in data['feedback_list']], ['1', '4'])
+        self.assertIsNone(data['next_cursor'])
+
+        feedback = data['feedback_list'][1]
+        self.assertEqual(feedback['appointment_type'], 'Tutoring')
+        self.assertEqual(feedback['attendee_id'], self.student.name)
+        self.assertEqual(feedback['host_id'], self.instructor.name)
+        self.assertEqual(feedback['appointment_data']['status'], 'completed')
+
+    def test_keyset_pagination(self):
+        for rating in '12345':
+            self.add_feedback(3, self.program, rating)
+
+        ratings = []
+        query = '?limit=2'
+        while True:
+            data = self.get_feedback(query)
+            ratings += [feedback['attendee_rating'] for feedback in data['feedback_list']]
+            if data['next_cursor'] is None:
+                break
+            query = f"?limit=2&after={data['next_cursor']}"
+        self.assertEqual(ratings, ['1', '2', '3', '4', '5'])
+
+        # an oversized limit is lowered to the largest page
+        with patch.object(feedback_api, 'MAX_FEEDBACK_PAGE_SIZE', 3):
+            data = self.get_feedback('?limit=100')
+        self.assertEqual(len(data['feedback_list']), 3)
+        self.assertIsNotNone(data['next_cursor'])
+
+    def test_filters(self):
+        old_date = self.add_feedback(30, self.program, '1')
+        self.add_feedback(3, self.other_program, '2')
+
+        by_program = self.get_feedback(f'?program_id={self.other_program.id}')['feedback_list']
+        self.assertEqual([feedback['attendee_rating'] for feedback in by_program], ['2'])
+
+        by_date = self.get_feedback(f'?start_date={old_date}&end_date={old_date}')['feedback_list']
+        self.assertEqual([feedback['attendee_rating'] for feedback in by_date], ['1'])
+
+        by_host = self.get_feedback(f'?host_id={self.student.id}')['feedback_list']
+        self.assertEqual(by_host, [])
+
+        self.assertEqual(self.client.get('/feedback/all?start_date=04/01/2024').status_code, 400)
+
+        # malformed filters and cursors are rejected instead of being dropped
+        for query in ('host_id=abc', 'program_id=1.5', 'after=x', 'limit=ten'):
+            response = self.client.get(f'/feedback/all?{query}')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(query.split('=')[0], response.get_json()['error'])
+
+    def test_query_count_is_constant(self):
+        self.add_feedback(3, self.program, '1')
+        with count_queries() as small_statements:
+            self.get_feedback()
+
+        for rating in range(30):
+            self.add_feedback(3, self.program, str(rating))
+        with count_queries() as large_statements:
+            self.get_feedback()
+
+        self.assertEqual(len(small_statements), len(large_statements))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import ProgramDetails, User
+from api.invalidation import InvalidationBus, MemoryTransport, SQLiteTransport, invalidation_bus, create_transport
+from api.programs import get_program_name
+from api.user import claims_changed_at
+from test.db_helpers import create_test_app, seed_course, login_client
+
+
+class InvalidationBusTestCase(unittest.TestCase):
+    # two buses standing in for two worker processes, each recording what it was told to drop
+    def connect_workers(self, make_transport):
+        workers = []
+        for _ in range(2):
+            bus = InvalidationBus()
+            dropped = []
+            bus.subscribe('program', dropped.append)
+            bus.connect(make_transport())
+            self.addCleanup(bus.close)
+            workers.append((bus, dropped))
+        return workers
+
+    def test_memory_transport(self):
+        transport = MemoryTransport()
+        (first, first_dropped), (second, second_dropped) = self.connect_workers(lambda: transport)
+
+        first.publish('program', 7)
+        self.assertEqual(first_dropped, [7])
+        self.assertEqual(second_dropped, [7])
+
+        second.publish('course', 3)  # nobody subscribed
+        self.assertEqual(first_dropped, [7])
+
+    def test_sqlite_transport(self):
+        path = os.path.join(tempfile.mkdtemp(), 'invalidation.db')
+        (first, first_dropped), (second, second_dropped) = self.connect_workers(lambda: SQLiteTransport(path))
+
+        start = time.monotonic()
+        first.publish('program', 7)
+        while not second_dropped and time.monotonic() - start < 2:
+            time.sleep(0.001)
+
+        self.assertEqual(second_dropped, [7])
+        self.assertLess(time.monotonic() - start, 0.5)
+        time.sleep(0.05)
+        self.assertEqual(first_dropped, [7])  # its own message isn't applied twice
+
+    def test_default_transport_crosses_processes(self):
+        path = os.path.join(tempfile.mkdtemp(), 'invalidation.db')
+        transport = create_transport({'INVALIDATION_SQLITE_PATH': path})
+        self.addCleanup(transport.close)
+        self.assertIsInstance(transport, SQLiteTransport)
+
+
+class WorkerInvalidationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.client = login_client(self.app, self.instructor)
+
+        # this worker and another one share a transport
+        transport = MemoryTransport()
+        invalidation_bus.connect(transport)
+        self.other_worker = InvalidationBus()
+        self.other_worker.connect(transport)
+
+    def tearDown(self):
+        invalidation_bus.connect(None)
+        db.session.remove()
+        self.ctx.pop()
+        claims_changed_at.clear()
+
+    def test_writes_are_published(self):
+        published = []
+        self.other_worker.subscribe('program', published.append)
+        self.other_worker.subscribe('program_times', published.append)
+
+        response = self.client.post('/program/details', json={
+            'course_id': self.course.id,
+            'data': {'id': self.program.id, 'name': 'Lab Hours', 'duration': 15, 'isDropins': False},
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(published), sorted([self.program.id, self.instructor.id]))
+
+    def test_other_worker_writes_drop_cache(self):
+        program_id = self.program.id
+        self.assertEqual(get_program_name(program_id), 'Office Hours')
+
+        # the other worker renames the program and publishes it
+        db.session.query(ProgramDetails).filter_by(id=program_id).update({'name': 'Lab Hours'})
+        db.session.commit()
+        self.assertEqual(get_program_name(program_id), 'Office Hours')
+        self.other_worker.publish('program', program_id)
+
+        self.assertEqual(get_program_name(program_id), 'Lab Hours')
+
+    def test_other_worker_role_change(self):
+        self.other_worker.publish('claims', [self.student.id, int(time.time())])
+        self.assertIn(self.student.id, claims_changed_at)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
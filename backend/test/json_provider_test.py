@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime, date, time
+from unittest import mock
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import BadRequest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db, json_provider
+from api.models import Appointment, AppointmentComment
+from test.db_helpers import create_test_app, seed_course, login_client
+
+
+class JSONProviderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def test_dates_are_http_dates(self):
+        value = {'created_at': datetime(2026, 10, 18, 9, 30), 'day': date(2026, 10, 18), 'clock': time(9, 30)}
+        expected = {'created_at': 'Sun, 18 Oct 2026 09:30:00 GMT', 'day': 'Sun, 18 Oct 2026 00:00:00 GMT', 'clock': '09:30:00'}
+        self.assertEqual(json.loads(self.app.json.dumps(value)), expected)
+
+        # the same wire format as Flask's own provider
+        flask_dumps = DefaultJSONProvider(self.app).dumps
+        self.assertEqual(json.loads(flask_dumps({'created_at': value['created_at'], 'day': value['day']})),
+                         {'created_at': expected['created_at'], 'day': expected['day']})
+
+        # the standard library fallback writes the same JSON
+        with mock.patch.object(json_provider, 'orjson', None):
+            self.assertEqual(json.loads(self.app.json.dumps(value)), expected)
+            self.assertEqual(self.app.json.loads('{"id": 1}'), {'id': 1})
+
+    def test_streamed_array(self):
+        items = [{'id': number} for number in range(7)]
+        pieces = list(self.app.json.stream_array(iter(items), chunk_size=3))
+        self.assertEqual(len(pieces), 5)  # '[', three chunks, ']'
+        self.assertEqual(json.loads(b''.join(pieces)), items)
+        self.assertEqual(b''.join(self.app.json.stream_array(iter([]))), b'[]')
+
+    def test_comment_created_at(self):
+        appointment = Appointment(host_id=self.instructor.id, attendee_id=self.student.id, course_id=self.course.id,
+                                  appointment_date='2026-10-18', start_time='10:00', end_time='10:30', status='reserved')
+        db.session.add(appointment)
+        db.session.flush()
+        db.session.add(AppointmentComment(appointment_id=appointment.id, user_id=self.student.id,
+                                          appointment_comment='See you then', created_at=datetime(2026, 10, 18, 9, 30)))
+        db.session.commit()
+
+        client = login_client(self.app, self.instructor)
+        response = client.get(f'/instructor/appointments/{appointment.id}/comment')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(as_text=True).count('"created_at":"Sun, 18 Oct 2026 09:30:00 GMT"'), 1)
+
+    def test_invalid_body(self):
+        with self.app.test_request_context('/', method='POST', data='{not json', content_type='application/json'):
+            with self.assertRaises(BadRequest):
+                request.get_json()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
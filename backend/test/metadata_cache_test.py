@@ -0,0 +1,161 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Availability, User
+from api.metadata_cache import MetadataCache, program_cache
+from api.programs import get_program_name, get_course_name
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class MetadataCacheTestCase(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = MetadataCache('test', max_size=2, ttl=60)
+        loads = []
+
+        def load(key):
+            loads.append(key)
+            return key * 10
+
+        self.assertEqual(cache.get(1, load), 10)
+        self.assertEqual(cache.get(2, load), 20)
+        self.assertEqual(cache.get(1, load), 10)  # 1 becomes the most recently used
+        self.assertEqual(cache.get(3, load), 30)  # evicts 2
+        self.assertEqual(cache.get(1, load), 10)
+        self.assertEqual(cache.get(2, load), 20)
+        self.assertEqual(loads, [1, 2, 3, 2])
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['size']), (2, 4, 2, 2))
+
+    def test_ttl_expiry_and_invalidation(self):
+        cache = MetadataCache('test', max_size=10, ttl=0)
+        loads = []
+        load = lambda key: loads.append(key) or key
+        cache.get(1, load)
+        cache.get(1, load)
+        self.assertEqual(loads, [1, 1])
+
+        cache.configure(max_size=10, ttl=60)
+        cache.get(1, load)
+        cache.invalidate(1)
+        cache.get(1, load)
+        self.assertEqual(loads, [1, 1, 1, 1])
+
+    def test_missing_values_are_not_cached(self):
+        cache = MetadataCache('test')
+        loads = []
+        load = lambda key: loads.append(key)
+        cache.get(1, load)
+        cache.get(1, load)
+        self.assertEqual(loads, [1, 1])
+
+    def test_invalidation_during_load(self):
+        cache = MetadataCache('test')
+        values = {1: 'old'}
+
+        # the key is changed and invalidated while its old value is being loaded
+        def load(key):
+            value = values[key]
+            values[key] = 'new'
+            cache.invalidate(key)
+            return value
+
+        self.assertEqual(cache.get(1, load), 'old')
+        self.assertEqual(cache.get(1, lambda key: values[key]), 'new')
+
+        # the same for a clear
+        def load_and_clear(key):
+            cache.clear()
+            return 'stale'
+
+        cache.invalidate(1)
+        cache.get(1, load_and_clear)
+        self.assertEqual(cache.get(1, lambda key: values[key]), 'new')
+        self.assertEqual(cache.loading, {})
+
+
+class MetadataEndpointsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.client = login_client(self.app, self.instructor)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add_availabilities(self, count):
+        for i in range(count):
+            date = (datetime.now() + timedelta(days=i + 1)).strftime('%Y-%m-%d')
+            db.session.add(Availability(user_id=self.instructor.id, program_id=self.program.id, date=date,
+                                        start_time='10:00', end_time='11:00', status='active'))
+        db.session.commit()
+
+    def get_availabilities(self):
+        response = self.client.get(f'/instructor/availability/{self.course.id}')
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()['instructor_availability']
+
+    def test_lookups_are_cached(self):
+        program_id, course_id = self.program.id, self.course.id
+        self.assertEqual(get_program_name(program_id), 'Office Hours')
+        with count_queries() as statements:
+            self.assertEqual(get_program_name(program_id), 'Office Hours')
+            self.assertEqual(get_course_name(course_id), 'CSS 101')
+            self.assertEqual(get_course_name(course_id), 'CSS 101')
+        self.assertEqual(len(statements), 1)
+
+    def test_listing_query_count_is_constant(self):
+        self.add_availabilities(2)
+        with count_queries() as small_statements:
+            self.assertEqual(len(self.get_availabilities()), 2)
+
+        self.add_availabilities(20)
+        with count_queries() as large_statements:
+            availabilities = self.get_availabilities()
+        self.assertEqual(len(availabilities), 22)
+        self.assertEqual({availability['course_name'] for availability in availabilities}, {'CSS 101'})
+        self.assertLessEqual(len(large_statements), len(small_statements))
+
+    def test_writes_invalidate(self):
+        self.assertEqual(get_program_name(self.program.id), 'Office Hours')
+        self.assertEqual(get_course_name(self.course.id), 'CSS 101')
+
+        response = self.client.post('/program/details', json={
+            'course_id': self.course.id,
+            'data': {'id': self.program.id, 'name': 'Lab Hours', 'duration': 15, 'isDropins': False},
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_program_name(self.program.id), 'Lab Hours')
+
+        response = self.client.post('/course/details', json={'id': self.course.id, 'name': 'CSS 102'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_course_name(self.course.id), 'CSS 102')
+
+        program_id = self.program.id
+        response = self.client.delete(f'/program/delete/{program_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(get_program_name(program_id))
+
+    def test_stats_endpoint(self):
+        program_cache.reset_stats()
+        get_program_name(self.program.id)
+        get_program_name(self.program.id)
+
+        admin = User.query.filter_by(account_type='admin').first()
+        response = login_client(self.app, admin).get('/admin/metadata-cache')
+        self.assertEqual(response.status_code, 200)
+        stats = {cache['name']: cache for cache in response.get_json()['caches']}
+        self.assertEqual((stats['program']['hits'], stats['program']['misses']), (1, 1))
+        self.assertIn('course', stats)
+
+        self.assertEqual(self.client.get('/admin/metadata-cache').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Appointment, AppointmentComment, Availability, Feedback, ProgramDetails, ProgramTimes
+from api.booking_limits import get_booking_counts
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class ProgramDeleteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.client = login_client(self.app, self.instructor)
+        self.booked_day = datetime.now().date() + timedelta(days=3)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    # give a program the given number of availabilities, each with posted slots, comments, feedback, and one booked slot,
+    # booked on self.booked_day, or on a day, week, and month of its own when spread
+    def seed_program(self, name, availability_count, spread=False):
+        program = ProgramDetails(name=name, course_id=self.course.id, instructor_id=self.instructor.id, duration=15)
+        db.session.add(program)
+        db.session.add(ProgramTimes(program_details=program, day='Monday', start_time='10:00', end_time='11:00'))
+
+        for i in range(availability_count):
+            date = (datetime.now() + timedelta(days=i + 1)).strftime('%Y-%m-%d')
+            availability = Availability(user_id=self.instructor.id, program_details=program, date=date,
+                                        start_time='10:00', end_time='11:00', status='active')
+            db.session.add(availability)
+            for start_time, end_time in (('10:00', '10:15'), ('10:15', '10:30'), ('10:30', '10:45')):
+                appointment = Appointment(host_id=self.instructor.id, course_id=self.course.id, availability=availability,
+                                          appointment_date=date, start_time=start_time, end_time=end_time, status='posted')
+                db.session.add(appointment)
+                db.session.add(AppointmentComment(appointment=appointment, user_id=self.student.id, appointment_comment='hi'))
+
+            booked_day = self.booked_day + timedelta(days=i * 32) if spread else self.booked_day
+            booked = Appointment(host_id=self.instructor.id, attendee_id=self.student.id, course_id=self.course.id,
+                                 availability=availability, appointment_date=booked_day.strftime('%Y-%m-%d'),
+                                 start_time='10:45', end_time='11:00', status='reserved')
+            db.session.add(booked)
+            db.session.flush()
+            db.session.add(Feedback(appointment_id=booked.id, attendee_id=self.student.id, attendee_rating='5'))
+
+        db.session.commit()
+        return program.id
+
+    def delete_and_count(self, program_id):
+        with count_queries() as statements:
+            response = self.client.delete(f'/program/delete/{program_id}')
+        self.assertEqual(response.status_code, 200)
+        return len(statements)
+
+    def test_delete_removes_connected_rows(self):
+        program_id = self.seed_program('Tutoring', 3)
+        self.assertEqual(get_booking_counts(self.instructor.id, self.booked_day)['daily'], 3)
+
+        self.delete_and_count(program_id)
+
+        self.assertIsNone(db.session.get(ProgramDetails, program_id))
+        self.assertEqual(Availability.query.filter_by(program_id=program_id).count(), 0)
+        self.assertEqual(ProgramTimes.query.filter_by(program_id=program_id).count(), 0)
+        self.assertEqual(Appointment.query.count(), 0)
+        self.assertEqual(AppointmentComment.query.count(), 0)
+        self.assertEqual(Feedback.query.count(), 0)
+        self.assertEqual(get_booking_counts(self.instructor.id, self.booked_day)['daily'], 0)
+
+        # other programs are untouched
+        self.assertIsNotNone(db.session.get(ProgramDetails, self.program.id))
+
+    def test_statement_count_is_constant(self):
+        # the large program's bookings touch 60 days, weeks, and months, so 180 booking counters
+        small_program_id = self.seed_program('Small', 2, spread=True)
+        large_program_id = self.seed_program('Large', 60, spread=True)
+        last_day = self.booked_day + timedelta(days=59 * 32)
+        self.assertEqual(get_booking_counts(self.instructor.id, last_day), {'daily': 1, 'weekly': 1, 'monthly': 1})
+
+        small_statements = self.delete_and_count(small_program_id)
+        large_statements = self.delete_and_count(large_program_id)
+        self.assertEqual(small_statements, large_statements)
+        self.assertEqual(get_booking_counts(self.instructor.id, last_day), {'daily': 0, 'weekly': 0, 'monthly': 0})
+
+    def test_missing_program(self):
+        response = self.client.delete('/program/delete/999')
+        self.assertNotEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
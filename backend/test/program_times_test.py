@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import ProgramDetails, ProgramTimes
+from api.metadata_cache import program_times_cache
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class ProgramTimesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        program_times_cache.clear()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.client = login_client(self.app, self.instructor)
+
+        db.session.add_all([
+            ProgramTimes(program_id=self.program.id, day='Monday', start_time='10:00', end_time='11:00'),
+            ProgramTimes(program_id=self.program.id, day='Friday', start_time='14:00', end_time='15:00'),
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        program_times_cache.clear()
+        db.session.remove()
+        self.ctx.pop()
+
+    def get_times(self, course_id):
+        response = self.client.get(f'/course/programs/times/{course_id}')
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_program_times(self):
+        self.assertEqual(self.get_times(self.course.id), [
+            {'program_id': self.program.id, 'name': 'Office Hours', 'day': 'Monday', 'start_time': '10:00', 'end_time': '11:00'},
+            {'program_id': self.program.id, 'name': 'Office Hours', 'day': 'Friday', 'start_time': '14:00', 'end_time': '15:00'},
+        ])
+
+        # no global programs
+        self.assertIsNone(self.get_times('null'))
+
+        # a new global program without times
+        self.client.post('/program/create', json={'name': 'Study Group', 'course_id': None})
+        self.assertEqual(self.get_times('null'), [])
+
+    def test_query_count_is_constant(self):
+        with count_queries() as small_statements:
+            self.get_times(self.course.id)
+
+        for i in range(10):
+            program = ProgramDetails(name=f'Program {i}', course_id=self.course.id, instructor_id=self.instructor.id)
+            db.session.add(program)
+            db.session.flush()
+            db.session.add(ProgramTimes(program_id=program.id, day='Tuesday', start_time='09:00', end_time='10:00'))
+        db.session.commit()
+        program_times_cache.clear()
+
+        with count_queries() as large_statements:
+            self.assertEqual(len(self.get_times(self.course.id)), 12)
+        self.assertEqual(len(small_statements), len(large_statements))
+
+    def test_cached_until_times_change(self):
+        self.get_times(self.course.id)
+        with count_queries() as cold_statements:
+            program_times_cache.clear()
+            self.get_times(self.course.id)
+        with count_queries() as warm_statements:
+            self.get_times(self.course.id)
+        self.assertLess(len(warm_statements), len(cold_statements))
+
+        response = self.client.post(f'/course/programs/times/{self.program.id}', json={
+            str(self.program.id): {'Wednesday': {'start_time': '08:00', 'end_time': '09:00'}}
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([time['day'] for time in self.get_times(self.course.id)], ['Wednesday'])
+
+    def test_cached_until_details_change(self):
+        self.get_times(self.course.id)
+
+        response = self.client.post('/program/details', json={
+            'course_id': self.course.id,
+            'data': {'id': self.program.id, 'name': 'Lab Hours', 'duration': 15, 'isDropins': False},
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({time['name'] for time in self.get_times(self.course.id)}, {'Lab Hours'})
+
+        # moving the program to all courses updates both listings
+        self.client.post('/program/details', json={
+            'course_id': None,
+            'data': {'id': self.program.id, 'name': 'Lab Hours', 'duration': 15, 'isDropins': False},
+        })
+        self.assertIsNone(self.get_times(self.course.id))
+        self.assertEqual(len(self.get_times('null')), 2)
+
+    def test_cache_is_bounded(self):
+        program_times_cache.configure(max_size=2, ttl=60)
+        self.addCleanup(program_times_cache.configure, 512, 300)
+        for course_id in range(100, 110):
+            self.assertIsNone(self.get_times(course_id))
+        self.get_times(self.course.id)
+        self.get_times('null')
+        self.assertLessEqual(program_times_cache.stats()['size'], 2)
+
+        response = self.client.get('/course/programs/times/not-a-course')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import CourseDetails, CourseMembers, ProgramDetails
+from api.programs import compile_program_serializer
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class ProgramTreeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.instructor_client = login_client(self.app, self.instructor)
+        self.student_client = login_client(self.app, self.student)
+
+        self.dropins = ProgramDetails(name='Study Group', course_id=self.course.id, instructor_id=self.instructor.id, isDropins=True)
+        self.global_program = ProgramDetails(name='Advising', instructor_id=self.instructor.id, duration=30, isDropins=False)
+        db.session.add_all([self.dropins, self.global_program])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add_course(self, name):
+        course = CourseDetails(instructor_id=self.instructor.id, instructor_email=self.instructor.email, name=name)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add_all([
+            CourseMembers(course_id=course.id, user_id=self.instructor.id),
+            CourseMembers(course_id=course.id, user_id=self.student.id),
+            ProgramDetails(name='Office Hours', course_id=course.id, instructor_id=self.instructor.id, isDropins=False),
+            ProgramDetails(name='Lab', course_id=course.id, instructor_id=self.instructor.id, isDropins=True),
+        ])
+        db.session.commit()
+        return course
+
+    def get_json(self, client, url):
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_compiled_serializer(self):
+        serialize = compile_program_serializer(('id', 'name'))
+        self.assertEqual(serialize(self.program), {'id': self.program.id, 'name': 'Office Hours'})
+
+    def test_instructor_tree(self):
+        courses = self.get_json(self.instructor_client, '/instructor/programs')
+
+        self.assertEqual([(course['id'], course['course_name']) for course in courses],
+                         [(self.course.id, 'CSS 101'), (None, 'All Courses')])
+        self.assertEqual([program['name'] for program in courses[0]['programs']], ['Office Hours', 'Study Group'])
+        self.assertEqual([program['name'] for program in courses[1]['programs']], ['Advising'])
+        self.assertEqual(courses[0]['programs'][0]['duration'], 15)
+        self.assertIn('isRangeBased', courses[0]['programs'][0])
+
+    def test_student_appointment_based_programs(self):
+        courses = self.get_json(self.student_client, '/student/programs/appointment-based')
+
+        self.assertEqual(len(courses), 1)
+        self.assertEqual([program['name'] for program in courses[0]['programs']], ['Office Hours', 'Advising'])
+        self.assertNotIn('isRangeBased', courses[0]['programs'][0])
+
+    def test_student_program_descriptions(self):
+        programs = self.get_json(self.student_client, '/student/programs/descriptions')
+
+        self.assertEqual([program['name'] for program in programs], ['Office Hours', 'Study Group', 'Advising'])
+        self.assertEqual(set(programs[0]), {'id', 'name', 'description', 'duration'})
+
+    def test_query_count_is_constant(self):
+        urls = [
+            (self.instructor_client, '/instructor/programs'),
+            (self.student_client, '/student/programs/appointment-based'),
+            (self.student_client, '/student/programs/descriptions'),
+        ]
+
+        small_counts = []
+        for client, url in urls:
+            with count_queries() as statements:
+                self.get_json(client, url)
+            small_counts.append(len(statements))
+
+        for i in range(5):
+            self.add_course(f'CSS 3{i:02d}')
+
+        large_counts = []
+        for client, url in urls:
+            with count_queries() as statements:
+                self.get_json(client, url)
+            large_counts.append(len(statements))
+
+        self.assertEqual(small_counts, large_counts)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
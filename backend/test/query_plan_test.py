@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sqlalchemy import text, and_, or_, union_all
+from api import db
+from api.models import Appointment, AppointmentHistory, Availability, CourseDetails, CourseMembers, ProgramDetails
+from api.archive import select_appointment_rows
+from test.db_helpers import create_test_app
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.rollback()
+        self.ctx.pop()
+
+    # return the tables the database reads with a full table scan for the query
+    def full_scans(self, query):
+        statement = getattr(query, 'statement', query)
+        statement = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+
+        if db.engine.dialect.name == 'mysql':
+            rows = db.session.execute(text('EXPLAIN ' + statement)).mappings().all()
+            return [row['table'] for row in rows if row['type'] == 'ALL']
+
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + statement)).all()
+        return [row[-1] for row in rows if row[-1].startswith('SCAN ') and 'INDEX' not in row[-1]]
+
+    def assertNoFullScan(self, query):
+        self.assertEqual(self.full_scans(query), [])
+
+    def test_booking_limit_count(self):
+        self.assertNoFullScan(Appointment.query.filter(
+            Appointment.host_id == 1,
+            Appointment.appointment_day.between(date(2024, 4, 1), date(2024, 4, 7)),
+            Appointment.status.in_(['reserved', 'pending'])
+        ))
+
+    def test_student_appointments(self):
+        self.assertNoFullScan(Appointment.query.filter(
+            Appointment.attendee_id == 1,
+            Appointment.start_at >= datetime(2024, 4, 1, 17, 0),
+            Appointment.status == 'reserved'
+        ))
+
+    def test_student_appointment_listing(self):
+        self.assertNoFullScan(select_appointment_rows(Appointment, 'attendee_id', 1).where(
+            Appointment.start_at >= datetime(2024, 4, 1, 17, 0),
+            Appointment.status == 'pending'
+        ))
+
+    def test_student_past_appointments(self):
+        recent = select_appointment_rows(Appointment, 'attendee_id', 1).where(Appointment.start_at < datetime(2024, 4, 1, 17, 0))
+        archived = select_appointment_rows(AppointmentHistory, 'attendee_id', 1)
+        self.assertNoFullScan(union_all(recent, archived))
+
+    def test_instructor_appointments(self):
+        self.assertNoFullScan(Appointment.query.filter(
+            Appointment.host_id == 1,
+            Appointment.start_at >= datetime(2024, 4, 1, 17, 0),
+            Appointment.status == 'reserved'
+        ))
+
+    def test_existing_availability(self):
+        self.assertNoFullScan(Availability.query.filter(
+            Availability.user_id == 1,
+            Availability.program_id == 1,
+            Availability.availability_day == date(2024, 4, 1)
+        ))
+
+    def test_course_dropins(self):
+        course_instructor_id = db.session.query(CourseDetails.instructor_id).filter(CourseDetails.id == 1).scalar_subquery()
+        dropin_program_ids = db.session.query(ProgramDetails.id).filter(
+            ProgramDetails.isDropins == True,
+            or_(ProgramDetails.course_id == 1, and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id == course_instructor_id))
+        )
+        self.assertNoFullScan(Availability.query.filter(
+            Availability.program_id.in_(dropin_program_ids),
+            Availability.availability_day >= date(2024, 4, 1)
+        ))
+
+    def test_user_courses(self):
+        self.assertNoFullScan(
+            CourseDetails.query.join(CourseMembers, CourseDetails.id == CourseMembers.course_id).filter_by(user_id=1)
+        )
+
+    def test_course_programs(self):
+        self.assertNoFullScan(ProgramDetails.query.filter(
+            and_(or_(ProgramDetails.course_id == 1, ProgramDetails.course_id == None), ProgramDetails.instructor_id == 1)
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
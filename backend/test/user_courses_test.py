@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import CourseDetails, CourseMembers, CourseTimes, ProgramDetails, ProgramTimes
+from api.user import STANDARD_TIMES, convert_to_standard_time
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class UserCoursesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.client = login_client(self.app, self.student)
+
+        # global office hours of the instructor, used by courses without their own
+        global_program = ProgramDetails(name='Office Hours', instructor_id=self.instructor.id, physical_location='Zoom',
+                                        meeting_url='https://zoom.us/j/2')
+        db.session.add(global_program)
+        db.session.add(ProgramTimes(program_details=global_program, day='Friday', start_time='09:00', end_time='10:00'))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    # add a course the student is in, with lecture times and optionally its own office hours
+    def add_course(self, name, with_office_hours):
+        course = CourseDetails(instructor_id=self.instructor.id, instructor_email=self.instructor.email, name=name,
+                               physical_location='UW2-005', meeting_url='https://zoom.us/j/3')
+        db.session.add(course)
+        db.session.flush()
+        db.session.add_all([
+            CourseMembers(course_id=course.id, user_id=self.student.id),
+            CourseTimes(course_id=course.id, day='Monday', start_time='13:15', end_time='15:20'),
+            CourseTimes(course_id=course.id, day='Wednesday', start_time='13:15', end_time='15:20'),
+        ])
+        if with_office_hours:
+            program = ProgramDetails(name='Office Hours', course_id=course.id, instructor_id=self.instructor.id,
+                                     physical_location='UW1-121', meeting_url='https://zoom.us/j/4')
+            db.session.add(program)
+            db.session.add(ProgramTimes(program_details=program, day='Tuesday', start_time='12:00', end_time='12:30'))
+        db.session.commit()
+        return course
+
+    def get_courses(self):
+        response = self.client.get('/user/courses')
+        self.assertEqual(response.status_code, 200)
+        return {course['course_name']: course for course in response.get_json()}
+
+    def test_standard_time_table(self):
+        for military_time, standard_time in STANDARD_TIMES.items():
+            military_time_obj = datetime.strptime(military_time, "%H:%M")
+            formatted_hours = military_time_obj.strftime("%I").lstrip("0")
+            self.assertEqual(standard_time, military_time_obj.strftime(f"{formatted_hours}:%M %p"))
+        self.assertEqual(convert_to_standard_time('9:05'), '9:05 AM')
+
+    def test_course_cards(self):
+        self.add_course('CSS 342', with_office_hours=True)
+        self.add_course('CSS 343', with_office_hours=False)
+        courses = self.get_courses()
+
+        self.assertEqual(courses['CSS 342']['course_times'], {
+            'times': 'Monday 1:15 PM-3:20 PM/Wednesday 1:15 PM-3:20 PM',
+            'physical_location': 'UW2-005',
+            'link': 'https://zoom.us/j/3',
+        })
+        self.assertEqual(courses['CSS 342']['office_hours'], {
+            'times': 'Tuesday 12:00 PM-12:30 PM', 'physical_location': 'UW1-121', 'link': 'https://zoom.us/j/4',
+        })
+
+        # falls back to the instructor's global office hours
+        self.assertEqual(courses['CSS 343']['office_hours'], {
+            'times': 'Friday 9:00 AM-10:00 AM', 'physical_location': 'Zoom', 'link': 'https://zoom.us/j/2',
+        })
+
+        # the seeded course has no times at all
+        self.assertEqual(courses['CSS 101']['course_times'], {
+            'times': 'No Known Times', 'physical_location': 'No Location', 'link': 'No URL',
+        })
+
+    def test_query_count_is_constant(self):
+        self.add_course('CSS 342', with_office_hours=True)
+        with count_queries() as small_statements:
+            self.get_courses()
+
+        for i in range(6):
+            self.add_course(f'CSS 4{i:02d}', with_office_hours=i % 2 == 0)
+        with count_queries() as large_statements:
+            self.assertEqual(len(self.get_courses()), 8)
+
+        self.assertEqual(len(small_statements), len(large_statements))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
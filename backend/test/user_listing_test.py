@@ -0,0 +1,131 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import User
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class UserListingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.admin = User.query.filter_by(account_type='admin').first()
+        self.client = login_client(self.app, self.admin)
+        self.instructor_client = login_client(self.app, self.instructor)
+
+        db.session.add_all([
+            User(name=f'Student {i:02d}', email=f'student{i:02d}@uw.edu', account_type='student',
+                 status='inactive' if i % 5 == 0 else 'active')
+            for i in range(25)
+        ] + [User(name='Ada_Lovelace', email='ada@uw.edu', account_type='instructor', status='active')])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def get_json(self, url, client=None):
+        response = (client or self.client).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    # follow next_cursor through every page of a listing
+    def get_all_pages(self, url, key, client=None):
+        items = []
+        separator = '&' if '?' in url else '?'
+        data = self.get_json(url, client)
+        while True:
+            items += data[key]
+            if data['next_cursor'] is None:
+                return items
+            data = self.get_json(f"{url}{separator}after={data['next_cursor']}", client)
+
+    def test_keyset_pagination(self):
+        first_page = self.get_json('/admin/students?limit=10')
+        self.assertEqual(len(first_page['students']), 10)
+        self.assertEqual(first_page['next_cursor'], first_page['students'][-1]['id'])
+
+        students = self.get_all_pages('/admin/students?limit=10', 'students')
+        self.assertEqual(len(students), 26)
+        self.assertEqual([student['id'] for student in students], sorted({student['id'] for student in students}))
+
+    def test_filters(self):
+        inactive = self.get_all_pages('/admin/all-users?status=inactive', 'user_list')
+        self.assertEqual(len(inactive), 5)
+
+        by_prefix = self.get_json('/admin/all-users?q=student1')['user_list']
+        self.assertEqual({user['name'] for user in by_prefix}, {f'Student 1{i}' for i in range(10)})
+
+        by_type = self.get_json('/admin/all-users?account_type=instructor&q=Ada')['user_list']
+        self.assertEqual([user['email'] for user in by_type], ['ada@uw.edu'])
+
+        # LIKE wildcards in the prefix are matched literally
+        self.assertEqual(len(self.get_json('/admin/all-users?q=Ada_')['user_list']), 1)
+        self.assertEqual(self.get_json('/admin/all-users?q=%25')['user_list'], [])
+
+        self.assertEqual([admin['id'] for admin in self.get_json('/admin/admins')['admins']], [self.admin.id])
+        self.assertEqual(len(self.get_json('/admin/instructors')['instructors']), 2)
+
+    def test_unpaginated_flag(self):
+        data = self.get_json('/admin/students?all=true&limit=1')
+        self.assertEqual(len(data['students']), 26)
+        self.assertIsNone(data['next_cursor'])
+
+        students = self.get_json('/students?all=true', self.instructor_client)
+        self.assertEqual(len(students), 26)
+        self.assertEqual(set(students[0]), {'id', 'name'})
+
+    def test_roster(self):
+        data = self.get_json('/students?limit=5&q=Student 2', self.instructor_client)
+        self.assertEqual([student['name'] for student in data['students']], [f'Student 2{i}' for i in range(5)])
+        self.assertIsNone(data['next_cursor'])
+
+        self.assertEqual(len(self.get_all_pages('/students?limit=4', 'students', self.instructor_client)), 26)
+
+    def test_bad_paging_parameters(self):
+        self.assertEqual(self.client.get('/admin/all-users?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/admin/all-users?after=abc').status_code, 400)
+        self.assertEqual(self.instructor_client.get('/students?limit=x').status_code, 400)
+
+    def test_admin_access_required(self):
+        for url in ('/admin/all-users', '/admin/admins', '/admin/students', '/admin/instructors', '/admin/users/count'):
+            self.assertEqual(self.app.test_client().get(url).status_code, 401)
+            self.assertEqual(self.instructor_client.get(url).status_code, 401)
+
+        # an ETag from an admin's response doesn't let others through either
+        etag = self.client.get('/admin/users/count').headers['ETag']
+        response = self.instructor_client.get('/admin/users/count', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 401)
+
+    def test_page_query_count_is_constant(self):
+        with count_queries() as statements:
+            self.get_json('/admin/all-users?limit=500')
+        self.assertEqual(len(statements), 1)
+
+    def test_cached_count(self):
+        self.assertEqual(self.get_json('/admin/users/count?account_type=student')['count'], 26)
+        self.assertEqual(self.get_json('/admin/users/count?account_type=student&status=inactive')['count'], 5)
+        with count_queries() as statements:
+            response = self.client.get('/admin/users/count?account_type=student')
+        self.assertEqual(response.get_json()['count'], 26)
+        self.assertEqual(statements, [])
+
+        etag = response.headers['ETag']
+        self.assertEqual(self.client.get('/admin/users/count?account_type=student',
+                                         headers={'If-None-Match': etag}).status_code, 304)
+
+        # account changes make the count stale
+        response = self.client.post('/admin/change-account-type',
+                                    json={'user_id': self.student.id, 'new_account_type': 'instructor'})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/admin/users/count?account_type=student', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['count'], 25)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,78 @@
+"""
+ * user_search_benchmark.py
+ *
+ * Seeds synthetic users and compares /users/search lookups through the
+ * in-process prefix index with the equivalent name/email LIKE query.
+ *
+ * Run from the test folder:
+ *     python user_search_benchmark.py [users]
+ *
+"""
+
+import sys
+import os
+import random
+import string
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sqlalchemy import insert, select
+from api import db
+from api.models import User
+from api.user import filter_users
+from api.user_search import user_search_index
+from test.db_helpers import create_test_app
+
+FIRST_NAMES = ['Ada', 'Alan', 'Grace', 'Linus', 'Barbara', 'Edsger', 'Donald', 'Margaret', 'José', 'Zoë', 'Ken', 'Radia']
+LAST_NAMES = ['Lovelace', 'Turing', 'Hopper', 'Torvalds', 'Liskov', 'Dijkstra', 'Knuth', 'Hamilton', 'Núñez', 'Thompson']
+
+# insert synthetic students with one statement
+def seed_users(count):
+    rows = []
+    for i in range(count):
+        first, last = random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+        suffix = ''.join(random.choices(string.ascii_lowercase, k=4))
+        rows.append({
+            'name': f'{first} {last} {suffix}',
+            'email': f'{first[0].lower()}{suffix}{i}@uw.edu',
+            'account_type': 'student',
+            'status': 'active',
+        })
+    db.session.execute(insert(User), rows)
+    db.session.commit()
+
+# run every query through search, returning the per-query times in ms, sorted
+def time_queries(search, queries):
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)
+
+def report(label, times):
+    print(f"{label:<8} p50 {times[len(times) // 2]:>8.3f} ms  p99 {times[int(len(times) * 0.99)]:>8.3f} ms  "
+          f"max {times[-1]:>8.3f} ms")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    random.seed(0)
+
+    app = create_test_app()
+    with app.app_context():
+        seed_users(count)
+
+        start = time.perf_counter()
+        user_search_index.search('warm up')
+        print(f"index of {count} users built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        names = FIRST_NAMES + LAST_NAMES
+        queries = [random.choice(names)[:random.randint(1, 4)] for _ in range(1000)]
+
+        report('index', time_queries(lambda query: user_search_index.search(query, 10), queries))
+        report('like', time_queries(lambda query: db.session.execute(
+            filter_users(select(User.id, User.name, User.email), prefix=query).order_by(User.name).limit(10)
+        ).all(), queries[:100]))
+
+
+if __name__ == '__main__':
+    main()
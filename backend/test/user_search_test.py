@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import User
+from api.user_search import normalize, user_search_index
+from test.db_helpers import create_test_app, seed_course, login_client, count_queries
+
+
+class UserSearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.admin = User.query.filter_by(account_type='admin').first()
+        self.client = login_client(self.app, self.instructor)
+
+        db.session.add_all([
+            User(name='José Núñez', email='jnunez@uw.edu', account_type='student', status='active'),
+            User(name='Ada Lovelace', email='ada@uw.edu', account_type='student', status='active'),
+            User(name='Adam Smith', email='asmith@uw.edu', account_type='instructor', status='active'),
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def search(self, query, client=None):
+        response = (client or self.client).get(f'/users/search?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [user['name'] for user in response.get_json()['users']]
+
+    def test_normalize(self):
+        self.assertEqual(normalize('  José   NÚÑEZ '), 'jose nunez')
+        self.assertEqual(normalize(None), '')
+
+    def test_prefix_search(self):
+        self.assertEqual(self.search('q=ada'), ['Ada Lovelace', 'Adam Smith'])
+        self.assertEqual(self.search('q=ada&account_type=student'), ['Ada Lovelace'])
+        self.assertEqual(self.search('q=ada&limit=1'), ['Ada Lovelace'])
+
+        # later name words, emails, and accents
+        self.assertEqual(self.search('q=love'), ['Ada Lovelace'])
+        self.assertEqual(self.search('q=asmith@'), ['Adam Smith'])
+        self.assertEqual(self.search('q=nun'), ['José Núñez'])
+        self.assertEqual(self.search('q=JOSÉ N'), ['José Núñez'])
+
+        self.assertEqual(self.search('q=zz'), [])
+        self.assertEqual(self.search('q='), [])
+
+    def test_index_is_built_once(self):
+        self.search('q=ada')
+        with count_queries() as statements:
+            self.search('q=love')
+            self.search('q=smith')
+        self.assertEqual(statements, [])
+
+    def test_changes_refresh_the_index(self):
+        self.assertEqual(self.search('q=ada'), ['Ada Lovelace', 'Adam Smith'])
+
+        admin_client = login_client(self.app, self.admin)
+        ada = User.query.filter_by(email='ada@uw.edu').first()
+        response = admin_client.post(f'/profile/update/{ada.id}', json={'name': 'Augusta King'})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.app.test_client().post('/sign-up', json={
+            'email': 'adele@uw.edu', 'name': 'Adele Goldberg', 'password': 'password123',
+            'verifyPassword': 'password123', 'userType': 'student',
+        })
+        self.assertEqual(response.status_code, 201)
+
+        # only the two changed users are reloaded
+        with count_queries() as statements:
+            self.assertEqual(self.search('q=ad'), ['Augusta King', 'Adam Smith', 'Adele Goldberg', 'admin'])
+        self.assertEqual(len(statements), 1)
+
+        # the old name is gone, the email still matches
+        self.assertEqual(self.search('q=lovelace'), [])
+        self.assertEqual(self.search('q=king'), ['Augusta King'])
+
+    def test_students_cannot_search(self):
+        response = login_client(self.app, self.student).get('/users/search?q=ada')
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,162 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api import db
+from api.models import Appointment
+from api.virtual_slots import get_slot_times, make_slot_id, parse_slot_id, compact_slots
+from test.db_helpers import create_test_app, seed_course, login_client
+
+
+class VirtualSlotsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_test_app()
+        self.app.config['LAZY_APPOINTMENT_SLOTS'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.instructor, self.student, self.course, self.program = seed_course()
+        self.instructor_client = login_client(self.app, self.instructor)
+        self.student_client = login_client(self.app, self.student)
+        self.date = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
+
+        response = self.instructor_client.post(f'/instructor/availability/{self.course.id}', json={
+            'availabilities': [{'id': self.program.id, 'date': self.date, 'start_time': '10:00', 'end_time': '11:00'}],
+            'duration': 15,
+            'physical_location': 'UW1-121',
+            'meeting_url': 'https://zoom.us/j/1',
+            'isDropins': False,
+            'program_id': self.program.id,
+        })
+        self.assertEqual(response.status_code, 201)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def get_available(self):
+        response = self.student_client.get(f'/student/appointments/available/{self.program.id}/{self.course.id}')
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()['available_appointments']
+
+    def test_slot_times(self):
+        self.assertEqual(get_slot_times('10:00', '10:45', 15), [('10:00', '10:15'), ('10:15', '10:30'), ('10:30', '10:45')])
+        self.assertEqual(get_slot_times('10:00', '11:00', None), [('10:00', '11:00')])
+
+    def test_slot_id_round_trip(self):
+        self.assertEqual(parse_slot_id(make_slot_id(12, '09:30')), (12, '09:30'))
+        self.assertIsNone(parse_slot_id('42'))
+        self.assertIsNone(parse_slot_id('slot-12-9:30'))
+
+    def test_no_posted_rows_are_stored(self):
+        self.assertEqual(Appointment.query.count(), 0)
+
+        slots = self.get_available()
+        self.assertEqual([slot['start_time'] for slot in slots], ['10:00', '10:15', '10:30', '10:45'])
+        self.assertEqual(slots[0]['date'], self.date)
+        self.assertEqual(slots[0]['physical_location'], 'UW1-121')
+
+    @patch('api.student.send_confirmation_email', return_value=True)
+    def test_reserve_creates_single_appointment(self, mock_send_email):
+        slot = self.get_available()[1]
+
+        response = self.student_client.post(f"/student/appointments/reserve/{slot['appointment_id']}/{self.course.id}", json={'notes': 'hi'})
+        self.assertEqual(response.status_code, 201)
+
+        appointment = Appointment.query.one()
+        self.assertEqual((appointment.start_time, appointment.end_time, appointment.status), ('10:15', '10:30', 'reserved'))
+        self.assertEqual(appointment.attendee_id, self.student.id)
+        self.assertNotIn('10:15', [slot['start_time'] for slot in self.get_available()])
+
+        # the same slot can't be reserved twice
+        response = self.student_client.post(f"/student/appointments/reserve/{slot['appointment_id']}/{self.course.id}", json={})
+        self.assertEqual(response.status_code, 400)
+
+    @patch('api.student.send_confirmation_email', return_value=True)
+    def test_cancelled_slot_is_listed_again(self, mock_send_email):
+        slot = self.get_available()[0]
+        self.student_client.post(f"/student/appointments/reserve/{slot['appointment_id']}/{self.course.id}", json={})
+        appointment = Appointment.query.one()
+
+        response = self.student_client.post(f'/student/appointments/cancel/{appointment.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(appointment.id, [slot['appointment_id'] for slot in self.get_available()])
+
+    def test_rejects_slot_outside_availability(self):
+        availability_id = parse_slot_id(self.get_available()[0]['appointment_id'])[0]
+        response = self.student_client.post(f"/student/appointments/reserve/{make_slot_id(availability_id, '10:05')}/{self.course.id}", json={})
+        self.assertEqual(response.status_code, 400)
+
+    @patch('api.student.send_confirmation_email', return_value=True)
+    def test_compact_format(self, mock_send_email):
+        # the first availability and another one of eight hours on the next day
+        date = (datetime.now() + timedelta(days=8)).strftime('%Y-%m-%d')
+        response = self.instructor_client.post(f'/instructor/availability/{self.course.id}', json={
+            'availabilities': [{'id': self.program.id, 'date': self.date, 'start_time': '10:00', 'end_time': '11:00'},
+                               {'id': self.program.id, 'date': date, 'start_time': '09:00', 'end_time': '17:00'}],
+            'duration': 15, 'physical_location': 'UW1-121', 'meeting_url': 'https://zoom.us/j/1',
+            'isDropins': False, 'program_id': self.program.id,
+        })
+        self.assertEqual(response.status_code, 201)
+
+        slot = self.get_available()[0]
+        self.student_client.post(f"/student/appointments/reserve/{slot['appointment_id']}/{self.course.id}", json={})
+        url = f'/student/appointments/available/{self.program.id}/{self.course.id}'
+
+        full = self.student_client.get(url)
+        compact = self.student_client.get(url + '?format=compact')
+        self.assertEqual(compact.status_code, 200)
+        data = compact.get_json()
+        self.assertEqual(data['program_id'], self.program.id)
+        self.assertEqual([availability['date'] for availability in data['availabilities']], [self.date, date])
+        self.assertEqual(data['availabilities'][0]['start_times'], [615, 630, 645])
+        self.assertEqual(data['availabilities'][0]['end_times'], [630, 645, 660])
+        self.assertEqual(len(data['availabilities'][1]['appointment_ids']), 32)
+
+        # decoding the compact form gives back the full listing
+        decoded = [
+            {'appointment_id': appointment_id, 'availability_id': availability['availability_id'],
+             'physical_location': availability['physical_location'],
+             'date': availability['date'], 'program_id': data['program_id'],
+             'start_time': f'{start // 60:02d}:{start % 60:02d}', 'end_time': f'{end // 60:02d}:{end % 60:02d}',
+             'status': availability['status'], 'meeting_url': availability['meeting_url']}
+            for availability in data['availabilities']
+            for appointment_id, start, end in zip(availability['appointment_ids'], availability['start_times'], availability['end_times'])
+        ]
+        self.assertEqual(decoded, full.get_json()['available_appointments'])
+        self.assertLess(len(compact.data) * 3, len(full.data))
+
+        self.assertEqual(self.student_client.get(url + '?format=columns').status_code, 400)
+
+    def test_compact_format_groups_by_availability(self):
+        # a second availability on the same date with the same location and meeting url
+        response = self.instructor_client.post(f'/instructor/availability/{self.course.id}', json={
+            'availabilities': [{'id': self.program.id, 'date': self.date, 'start_time': '10:00', 'end_time': '11:00'},
+                               {'id': self.program.id, 'date': self.date, 'start_time': '13:00', 'end_time': '13:30'}],
+            'duration': 15, 'physical_location': 'UW1-121', 'meeting_url': 'https://zoom.us/j/1',
+            'isDropins': False, 'program_id': self.program.id,
+        })
+        self.assertEqual(response.status_code, 201)
+
+        url = f'/student/appointments/available/{self.program.id}/{self.course.id}?format=compact'
+        availabilities = self.student_client.get(url).get_json()['availabilities']
+        self.assertEqual([availability['date'] for availability in availabilities], [self.date, self.date])
+        self.assertNotEqual(availabilities[0]['availability_id'], availabilities[1]['availability_id'])
+        self.assertEqual(availabilities[0]['start_times'], [600, 615, 630, 645])
+        self.assertEqual(availabilities[1]['start_times'], [780, 795])
+
+        # stored posted appointments are grouped the same way
+        slots = [
+            {'appointment_id': appointment_id, 'availability_id': availability_id, 'physical_location': 'UW1-121',
+             'date': self.date, 'program_id': self.program.id, 'start_time': start_time, 'end_time': end_time,
+             'status': 'posted', 'meeting_url': 'https://zoom.us/j/1'}
+            for appointment_id, availability_id, start_time, end_time in
+            [(1, 7, '10:00', '10:15'), (2, 7, '10:15', '10:30'), (3, 8, '10:30', '10:45')]
+        ]
+        compact = compact_slots(self.program.id, slots)
+        self.assertEqual([(availability['availability_id'], availability['appointment_ids']) for availability in compact['availabilities']],
+                         [(7, [1, 2]), (8, [3])])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -49,6 +49,7 @@ export default function AppointmentsTable({ courseId, reloadTable }) {
   const [feedbackPresent, setFeedbackPresent] = useState(false);
   const [isProvidingFeedback, setIsProvidingFeedback] = useState(false);
   const [appointments, setAppointments] = useState([]);
+  const [nextPage, setNextPage] = useState(null); // next page of the past tab, null when there is none
   const [formData, setFormData] = useState({
     notes: "",
     meeting_url: "",
@@ -63,7 +64,8 @@ export default function AppointmentsTable({ courseId, reloadTable }) {
   ////////////////////////////////////////////////////////
 
   // fetch the appointments for upcoming, pending, past tabs
-  const fetchAppointments = async () => {
+  // the past tab is paged, newest first, and later pages are added to the ones already shown
+  const fetchAppointments = async (page = 1) => {
     // If there's no user or course, return
     if (isnt_Student_Or_Instructor(user) || courseId === "") return;
 
@@ -72,8 +74,11 @@ export default function AppointmentsTable({ courseId, reloadTable }) {
         ? `/instructor/appointments`
         : `/student/appointments`;
 
+    const params = new URLSearchParams({ type: activeTab });
+    if (activeTab === "past") params.append("page", page);
+
     try {
-      const response = await fetch(`${apiEndpoint}?type=${activeTab}`, {
+      const response = await fetch(`${apiEndpoint}?${params}`, {
         credentials: "include",
       });
 
@@ -84,8 +89,12 @@ export default function AppointmentsTable({ courseId, reloadTable }) {
           ? "instructor_appointments"
           : "student_appointments";
 
+      const fetchedAppointments = fetchedData[key] || [];
+      const allAppointments =
+        page > 1 ? [...appointments, ...fetchedAppointments] : fetchedAppointments;
+
       // sort the appointments by date and time
-      const sortedData = (fetchedData[key] || []).sort((a, b) => {
+      const sortedData = allAppointments.sort((a, b) => {
         const dateComparison = new Date(a.date) - new Date(b.date);
         if (dateComparison === 0) {
           return (
@@ -98,6 +107,7 @@ export default function AppointmentsTable({ courseId, reloadTable }) {
 
       // set data to sorted data
       setAppointments(sortedData);
+      setNextPage(fetchedData.next_page || null);
     } catch (error) {
       console.error("Error fetching appointment data for user:", error);
     }
@@ -1043,6 +1053,14 @@ export default function AppointmentsTable({ courseId, reloadTable }) {
             )}
           </table>
         )}
+        {!selectedAppointment && activeTab === "past" && nextPage !== null && (
+          <button
+            className="bg-purple text-white rounded-md px-3 py-1 my-3 hover:text-gold"
+            onClick={() => fetchAppointments(nextPage)}
+          >
+            Load More
+          </button>
+        )}
       </div>
     </div>
   );
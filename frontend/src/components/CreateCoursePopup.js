@@ -26,6 +26,7 @@ const CreateCoursePopup = ({ onClose, user_id, loadFunction }) => {
   const [courseTitle, setCourseTitle] = useState("");
   const [selectedStudentIds, setSelectedStudentIds] = useState([]);
   const [allStudents, setAllStudents] = useState([])
+  const [studentQuery, setStudentQuery] = useState("");
   const [csrfToken, setCsrfToken] = useState("");
 
 
@@ -33,9 +34,14 @@ const CreateCoursePopup = ({ onClose, user_id, loadFunction }) => {
   //               Fetch Post Functions                 //
   ////////////////////////////////////////////////////////
 
+  // fetch the first students, or the typeahead matches of the search
   const fetchAllStudents = async () => {
     try {
-      const response = await fetch("/students", {
+      const url = studentQuery
+        ? `/users/search?${new URLSearchParams({ q: studentQuery, account_type: "student", limit: 50 })}`
+        : "/students?limit=50";
+
+      const response = await fetch(url, {
         method: "GET",
         headers: {
           "Content-Type": "application/json",
@@ -47,7 +53,7 @@ const CreateCoursePopup = ({ onClose, user_id, loadFunction }) => {
         throw new Error("Error fetching students");
       }
       const data = await response.json();
-      setAllStudents(data);  // Assuming the response is an array of students
+      setAllStudents(studentQuery ? data.users : data.students);
     } catch (error) {
       console.error("Error:", error);
     }
@@ -89,11 +95,15 @@ const CreateCoursePopup = ({ onClose, user_id, loadFunction }) => {
   ////////////////////////////////////////////////////////
   //               Handler Functions                    //
   ////////////////////////////////////////////////////////
-  // Handle student selection
+  // Handle student selection, keeping students selected under an earlier search
   const handleStudentSelection = (event) => {
     const selectedOptions = Array.from(event.target.selectedOptions);
     const selectedIds = selectedOptions.map(option => option.value);
-    setSelectedStudentIds(selectedIds);
+    const shownIds = allStudents.map(student => String(student.id));
+    setSelectedStudentIds((prevIds) => [
+      ...prevIds.filter(id => !shownIds.includes(id)),
+      ...selectedIds,
+    ]);
   };
 
   ////////////////////////////////////////////////////////
@@ -111,10 +121,13 @@ const CreateCoursePopup = ({ onClose, user_id, loadFunction }) => {
 
   useEffect(() => {
     setCsrfToken(getCookie("csrfToken"));
-    // Fetch all students
-    fetchAllStudents();
   }, []);
 
+  // Fetch the students matching the search
+  useEffect(() => {
+    fetchAllStudents();
+  }, [studentQuery]);
+
   ////////////////////////////////////////////////////////
   //                 Render Functions                   //
   ////////////////////////////////////////////////////////
@@ -148,13 +161,20 @@ const CreateCoursePopup = ({ onClose, user_id, loadFunction }) => {
 
       <div className="flex flex-col items-center mt-3">
         <label className="font-bold text-lg">Select Students</label>
-        <select multiple className="border border-light-gray rounded ml-2 mt-1 w-full" onChange={handleStudentSelection}>
+        <input
+          className="border border-light-gray w-full mt-1"
+          type="text"
+          placeholder="Search by name or email"
+          onChange={(e) => setStudentQuery(e.target.value.trim())}
+        />
+        <select multiple className="border border-light-gray rounded ml-2 mt-1 w-full" value={selectedStudentIds} onChange={handleStudentSelection}>
           {allStudents.map(student => (
             <option key={student.id} value={student.id}>
               {student.name}
             </option>
           ))}
         </select>
+        <p className="mt-1">{selectedStudentIds.length} selected</p>
       </div>
 
 
@@ -15,12 +15,18 @@ import UserProfile from "./UserProfile";
 import { UserContext } from "../context/UserContext";
 import { isnt_Admin } from "../utils/CheckUserType.js";
 
+// account types an admin can manage, and the number of users fetched per page
+const accountTypes = ["admin", "instructor", "student"];
+const usersPerPage = 50;
+
 export default function ManageUsers() {
   // General Variables
   const { user } = useContext(UserContext);
 
   // User Data Variables
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [userCount, setUserCount] = useState(null);
   const [selectedUserType, setSelectedUserType] = useState("");
   const [selectedUser, setSelectedUser] = useState(null);
   const [query, setQuery] = useState("");
@@ -29,12 +35,23 @@ export default function ManageUsers() {
   //               Fetch Get Functions                  //
   ////////////////////////////////////////////////////////
 
-  // fetch all users in system
-  const fetchUsers = () => {
+  // filters of the selected user type and name or email prefix
+  const userFilters = () => {
+    const params = new URLSearchParams({ account_type: selectedUserType });
+    if (query) params.append("q", query);
+    return params;
+  };
+
+  // fetch a page of users of the selected type, starting over unless after is given
+  const fetchUsers = (after = null) => {
     // user isn't an admin
-    if (isnt_Admin(user)) return;
+    if (isnt_Admin(user) || !selectedUserType) return;
 
-    fetch("/admin/all-users")
+    const params = userFilters();
+    params.append("limit", usersPerPage);
+    if (after !== null) params.append("after", after);
+
+    fetch(`/admin/all-users?${params}`)
       .then((response) => {
         if (response.ok) {
           return response.json();
@@ -43,13 +60,37 @@ export default function ManageUsers() {
         }
       })
       .then((data) => {
-        setUsers(data.user_list);
+        setUsers((prevUsers) =>
+          after !== null ? [...prevUsers, ...data.user_list] : data.user_list
+        );
+        setNextCursor(data.next_cursor);
       })
       .catch((error) => {
         console.error("Error fetching users:", error);
       });
   };
 
+  // fetch the number of users matching the filters
+  const fetchUserCount = () => {
+    // user isn't an admin
+    if (isnt_Admin(user) || !selectedUserType) return;
+
+    fetch(`/admin/users/count?${userFilters()}`)
+      .then((response) => {
+        if (response.ok) {
+          return response.json();
+        } else {
+          throw new Error("Failed to fetch user count");
+        }
+      })
+      .then((data) => {
+        setUserCount(data.count);
+      })
+      .catch((error) => {
+        console.error("Error fetching user count:", error);
+      });
+  };
+
   ////////////////////////////////////////////////////////
   //               Fetch Post Functions                 //
   ////////////////////////////////////////////////////////
@@ -150,29 +191,20 @@ export default function ManageUsers() {
     setSelectedUserType(event.target.value);
   };
 
-  // filter users by query
+  // filter users by a name or email prefix
   const handleFilter = (event) => {
-    setQuery(event.target.value);
+    setQuery(event.target.value.trim());
   };
 
-  // Group users by account type
-  const groupUsersByAccountType = users.reduce((acc, user) => {
-    const { account_type } = user;
-    if (!acc[account_type]) {
-      acc[account_type] = [];
-    }
-    acc[account_type].push(user);
-    return acc;
-  }, {});
-
   ////////////////////////////////////////////////////////
   //                 UseEffect Functions                //
   ////////////////////////////////////////////////////////
 
-  // fetch users on page load
+  // fetch the first page of users whenever the filters change
   useEffect(() => {
     fetchUsers();
-  }, []);
+    fetchUserCount();
+  }, [selectedUserType, query]);
 
   ////////////////////////////////////////////////////////
   //                 Render Functions                   //
@@ -187,7 +219,7 @@ export default function ManageUsers() {
         <UserProfile
           user={selectedUser}
           onClose={() => setSelectedUser(null)}
-          onUserUpdate={fetchUsers}
+          onUserUpdate={() => fetchUsers()}
         />
       ) : (
         // Admins can choose which users to manage based on user account type
@@ -201,7 +233,7 @@ export default function ManageUsers() {
           >
             {/* User account type options */}
             <option value="">Select User Type</option>
-            {Object.keys(groupUsersByAccountType).map((account_type) => (
+            {accountTypes.map((account_type) => (
               <option key={account_type} value={account_type}>
                 {account_type.charAt(0).toUpperCase() + account_type.slice(1)}
               </option>
@@ -215,10 +247,17 @@ export default function ManageUsers() {
               <input
                 className="border border-light-gray w-1/3 my-5"
                 type="text"
-                placeholder="Filter"
+                placeholder="Filter by name or email"
                 onChange={handleFilter}
               />
 
+              {/* Number of users shown out of all matching users */}
+              {userCount !== null && (
+                <p className="mb-2">
+                  Showing {users.length} of {userCount} users
+                </p>
+              )}
+
               {/* Table to display Canvas Meeting Scheduler users */}
               <table className="border w-full">
                 {/* Table headers to display user account information categories */}
@@ -234,82 +273,83 @@ export default function ManageUsers() {
 
                 {/* Table body to display existing Canvas Meeting Scheduler users */}
                 <tbody>
-                  {/* Call function to group users by selected user account type */}
-                  {groupUsersByAccountType[selectedUserType]
-                    .filter(
-                      (user) =>
-                        user.id.toString().includes(query) ||
-                        user.name.toLowerCase().includes(query) ||
-                        user.email.toLowerCase().includes(query) ||
-                        user.account_type.toLowerCase().includes(query) ||
-                        user.status.toLowerCase().includes(query)
-                    )
-                    .map((user) => (
-                      // Table row to display user account information
-                      <tr className="border-b" key={user.id}>
-                        {/* Table cell to display user id */}
-                        <td className="border-r w-[75px]">{user.id}</td>
-
-                        {/* Table cell to display user name */}
-                        <td
-                          className="border-r text-blue underline cursor-pointer"
-                          onClick={() => handleUserNameClick(user)}
-                        >
-                          {user.name}
-                        </td>
-
-                        {/* Table cell to display user email */}
-                        <td className="border-r">{user.email}</td>
-
-                        {/* Table cell for display and edit user account type */}
-                        <td className="border-r w-[125px]">
-                          <div>
-                            <select
-                              onChange={(e) =>
-                                handleAccountTypeChange(
-                                  user.id,
-                                  e.target.value,
-                                  user.name
-                                )
-                              }
-                            >
-                              {/* Account type options: Admin, Instructor, or student  */}
-                              <option value="">
-                                {capitalizeFirstLetter(user.account_type)}
-                              </option>
-                              <option value="admin">Admin</option>
-                              <option value="instructor">Instructor</option>
-                              <option value="student">Student</option>
-                            </select>
-                          </div>
-                        </td>
-
-                        {/* Table Cell to display and edit user account status */}
-                        <td className="border-r w-[125px]">
-                          <div>
-                            {/* Account status selection */}
-                            <select
-                              onChange={(e) =>
-                                handleAccountStatusChange(
-                                  user.id,
-                                  e.target.value,
-                                  user.name
-                                )
-                              }
-                            >
-                              {/* Account status options: Active or Inactive */}
-                              <option value="">
-                                {capitalizeFirstLetter(user.status)}
-                              </option>
-                              <option value="active">Active</option>
-                              <option value="inactive">Inactive</option>
-                            </select>
-                          </div>
-                        </td>
-                      </tr>
-                    ))}
+                  {/* Users of the selected account type matching the filter, fetched a page at a time */}
+                  {users.map((user) => (
+                    // Table row to display user account information
+                    <tr className="border-b" key={user.id}>
+                      {/* Table cell to display user id */}
+                      <td className="border-r w-[75px]">{user.id}</td>
+
+                      {/* Table cell to display user name */}
+                      <td
+                        className="border-r text-blue underline cursor-pointer"
+                        onClick={() => handleUserNameClick(user)}
+                      >
+                        {user.name}
+                      </td>
+
+                      {/* Table cell to display user email */}
+                      <td className="border-r">{user.email}</td>
+
+                      {/* Table cell for display and edit user account type */}
+                      <td className="border-r w-[125px]">
+                        <div>
+                          <select
+                            onChange={(e) =>
+                              handleAccountTypeChange(
+                                user.id,
+                                e.target.value,
+                                user.name
+                              )
+                            }
+                          >
+                            {/* Account type options: Admin, Instructor, or student  */}
+                            <option value="">
+                              {capitalizeFirstLetter(user.account_type)}
+                            </option>
+                            <option value="admin">Admin</option>
+                            <option value="instructor">Instructor</option>
+                            <option value="student">Student</option>
+                          </select>
+                        </div>
+                      </td>
+
+                      {/* Table Cell to display and edit user account status */}
+                      <td className="border-r w-[125px]">
+                        <div>
+                          {/* Account status selection */}
+                          <select
+                            onChange={(e) =>
+                              handleAccountStatusChange(
+                                user.id,
+                                e.target.value,
+                                user.name
+                              )
+                            }
+                          >
+                            {/* Account status options: Active or Inactive */}
+                            <option value="">
+                              {capitalizeFirstLetter(user.status)}
+                            </option>
+                            <option value="active">Active</option>
+                            <option value="inactive">Inactive</option>
+                          </select>
+                        </div>
+                      </td>
+                    </tr>
+                  ))}
                 </tbody>
               </table>
+
+              {/* Button to fetch the next page of users */}
+              {nextCursor !== null && (
+                <button
+                  className="bg-purple text-white rounded-md px-3 py-1 my-3 hover:text-gold"
+                  onClick={() => fetchUsers(nextCursor)}
+                >
+                  Load More
+                </button>
+              )}
             </div>
           )}
         </div>
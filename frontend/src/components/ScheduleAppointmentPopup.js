@@ -18,6 +18,7 @@ import { getCookie } from "../utils/GetCookie.js";
 import Appointment from "./Appointment.js";
 import { isnt_Student } from "../utils/CheckUserType.js";
 import { toDate, formatInTimeZone } from 'date-fns-tz';
+import { dateAtMinutes } from "../utils/FormatDatetime.js";
 
 const ScheduleAppointmentPopup = ({ onClose, functions }) => {
   // General Variables
@@ -116,24 +117,23 @@ const ScheduleAppointmentPopup = ({ onClose, functions }) => {
       fetch(
         `/student/appointments/available/${encodeURIComponent(
           selectedProgramId
-        )}/${encodeURIComponent(selectedCourseId)}`
+        )}/${encodeURIComponent(selectedCourseId)}?format=compact`
       )
         .then((response) => response.json())
         .then((data) => {
-          // if there is real data
-          if (data.available_appointments.length > 0) {
-            const timeslots = data.available_appointments
-              .filter((appointment) => appointment.status === "posted")
-              .map((appointment) => ({
-                startTime: new Date(
-                  `${appointment.date}T${appointment.start_time}`
-                ),
-                endTime: new Date(
-                  `${appointment.date}T${appointment.end_time}`
-                ),
-                id: appointment.appointment_id,
-              }));
+          // slots come grouped by availability, with times in minutes since midnight
+          const timeslots = data.availabilities
+            .filter((availability) => availability.status === "posted")
+            .flatMap((availability) =>
+              availability.appointment_ids.map((id, index) => ({
+                startTime: dateAtMinutes(availability.date, availability.start_times[index]),
+                endTime: dateAtMinutes(availability.date, availability.end_times[index]),
+                id: id,
+              }))
+            );
 
+          // if there is real data
+          if (timeslots.length > 0) {
             // set available timeslots to all available appointments
             setAvailableTimeslots(timeslots);
 
@@ -57,3 +57,9 @@ export function capitalizeFirstLetter(string) {
   if (typeof string !== "string") return string;
   return string.charAt(0).toUpperCase() + string.slice(1);
 }
+
+// local Date of a "YYYY-MM-DD" date at a number of minutes since midnight, e.g. ("2026-10-20", 630) -> Oct 20 10:30
+export function dateAtMinutes(dateString, minutes) {
+  const [year, month, day] = dateString.split("-").map(Number);
+  return new Date(year, month - 1, day, Math.floor(minutes / 60), minutes % 60);
+}